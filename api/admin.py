@@ -0,0 +1,56 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import HTTPException, Request
+from config.settings import settings
+from services.cache_backends import default_cache_directory, ensure_private_directory
+
+# Header carrying the admin token
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+# Header requesting a profile of the request, sent along with the admin token
+PROFILE_HEADER = "X-Profile"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """
+    Check a token against settings.admin_token.
+
+    Args:
+        token: Token sent by the client
+
+    Returns:
+        True if admin access is configured and the token matches it
+    """
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+async def require_admin(request: Request) -> None:
+    """
+    Dependency restricting an endpoint to admin token holders.
+
+    Raises:
+        HTTPException: 404 while no admin token is configured, 401 for a missing or wrong token
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(request.headers.get(ADMIN_TOKEN_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def profile_directory() -> str:
+    """
+    Get the directory request profiles are written to and served from.
+
+    Returns:
+        settings.profile_dir, or the profiles directory of the per-user cache directory,
+        created if missing
+
+    Raises:
+        ValueError: If the directory is owned by another user or accessible to group or others
+    """
+    directory = settings.profile_dir or os.path.join(default_cache_directory(), "profiles")
+    ensure_private_directory(directory)
+    return directory
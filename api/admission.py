@@ -0,0 +1,238 @@
+import asyncio
+import math
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from api.responses import FastJSONResponse
+from config.settings import settings
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted to its lane"""
+
+    def __init__(self, lane: str, retry_after: float):
+        super().__init__(f"Too many concurrent {lane} requests")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class AdmissionLane:
+    """
+    Concurrency limit with a bounded wait queue.
+
+    Counters are guarded by a thread lock and waiters are woken through their
+    own event loop, so a lane can be shared by requests served on different loops.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float, retry_after: float):
+        """
+        Initialize an admission lane.
+
+        Args:
+            name: Lane name, reported in 503 responses and stats
+            concurrency: Maximum number of requests running at once, 0 for unbounded
+            queue_size: Maximum number of requests waiting for a slot
+            queue_timeout: Seconds a request waits for a slot before being rejected
+            retry_after: Seconds clients are told to wait before retrying
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot in the lane.
+
+        Raises:
+            Overloaded: If the wait queue is full or no slot frees up in time
+        """
+        if not self.concurrency:
+            return
+
+        with self.lock:
+            if self.active < self.concurrency and not self.waiters:
+                self.active += 1
+                self.admitted += 1
+                return
+            if len(self.waiters) >= self.queue_size:
+                self.rejected += 1
+                raise Overloaded(self.name, self.retry_after)
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self.waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1], self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                    self.rejected += 1
+                    raise Overloaded(self.name, self.retry_after)
+            # The slot was handed over as the wait timed out: keep it
+        except asyncio.CancelledError:
+            with self.lock:
+                granted = waiter not in self.waiters
+                if not granted:
+                    self.waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it directly to the longest waiting request if any."""
+        if not self.concurrency:
+            return
+
+        with self.lock:
+            if not self.waiters:
+                self.active -= 1
+                return
+            loop, future = self.waiters.popleft()
+            self.admitted += 1
+
+        try:
+            loop.call_soon_threadsafe(self._grant, future)
+        except RuntimeError:
+            # The waiter's loop is closed: pass the slot on
+            self.release()
+
+    @staticmethod
+    def _grant(future: asyncio.Future) -> None:
+        """Wake a waiter, unless it already gave up."""
+        if not future.done():
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot in the lane for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get lane usage statistics.
+
+        Returns:
+            Dictionary with limits, active and waiting requests, and admission counters
+        """
+        with self.lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue_size": self.queue_size,
+                "active": self.active,
+                "waiting": len(self.waiters),
+                "admitted": self.admitted,
+                "rejected": self.rejected
+            }
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding an admission slot until it's sent.
+
+    The slot is released however the response ends: after the last chunk,
+    on an error, or when the client disconnects, even before the first chunk.
+    """
+
+    def __init__(self, lane: AdmissionLane, content: Any, **kwargs: Any):
+        """
+        Initialize the response.
+
+        Args:
+            lane: Lane in which a slot was acquired for this response
+            content: Body iterator, as for StreamingResponse
+            kwargs: Other StreamingResponse arguments, ex: media_type and headers
+        """
+        super().__init__(content, **kwargs)
+        self.lane = lane
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.lane.release()
+
+
+class AdmissionController:
+    """Admission lanes for the expensive endpoints"""
+
+    def __init__(self, lanes: Optional[Dict[str, AdmissionLane]] = None):
+        """
+        Initialize the admission controller.
+
+        Args:
+            lanes: Lanes by name. If not provided, the search, search_expensive and
+                relations lanes are created from settings.
+        """
+        if lanes is None:
+            limits = {
+                "search": (settings.admission_search_concurrency, settings.admission_search_queue),
+                "search_expensive": (settings.admission_expensive_concurrency, settings.admission_expensive_queue),
+                "relations": (settings.admission_relations_concurrency, settings.admission_relations_queue),
+            }
+            lanes = {
+                name: AdmissionLane(
+                    name,
+                    concurrency if settings.admission_enabled else 0,
+                    queue_size,
+                    settings.admission_queue_timeout,
+                    settings.admission_retry_after
+                )
+                for name, (concurrency, queue_size) in limits.items()
+            }
+        self.lanes = lanes
+
+    def lane(self, name: str) -> AdmissionLane:
+        """
+        Get a lane by name.
+
+        Args:
+            name: Lane name
+
+        Returns:
+            The admission lane
+        """
+        return self.lanes[name]
+
+    def search_lane(self, cost: int) -> AdmissionLane:
+        """
+        Get the lane for a search of the given estimated cost.
+
+        Args:
+            cost: Estimated cost, from SearchService.prepare
+
+        Returns:
+            The search_expensive lane for costs of at least settings.admission_expensive_cost,
+            the search lane otherwise
+        """
+        if cost >= settings.admission_expensive_cost:
+            return self.lanes["search_expensive"]
+        return self.lanes["search"]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the statistics of every lane."""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+async def overloaded_handler(request: Request, exc: Overloaded) -> FastJSONResponse:
+    """Turn an admission rejection into a 503 with Retry-After."""
+    return FastJSONResponse(
+        {"detail": str(exc), "lane": exc.lane},
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
@@ -0,0 +1,135 @@
+import gzip
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from api.http_cache import encoded_etag, if_none_match_tags
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional speedup
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best supported content coding accepted by the client.
+    
+    Args:
+        accept_encoding: Accept-Encoding request header value
+        
+    Returns:
+        "br", "gzip" or None if neither is acceptable
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress complete responses above a size threshold with brotli or gzip.
+    
+    Streaming responses (sent in several body messages) pass through untouched so
+    their events reach the client as soon as they are produced. Complete responses
+    always carry Vary: Accept-Encoding, and compressed ones get an ETag per coding.
+    """
+    
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Initialize compression middleware.
+        
+        Args:
+            app: ASGI application
+            minimum_size: Smallest body size in bytes worth compressing
+            gzip_level: gzip compression level
+            brotli_quality: brotli compression quality
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        start_message: List[Message] = []
+        passthrough = False
+        
+        async def send_compressed(message: Message) -> None:
+            nonlocal passthrough
+            if passthrough:
+                await send(message)
+                return
+            
+            if message["type"] == "http.response.start":
+                start_message.append(message)
+                return
+            
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+            
+            start = start_message.pop()
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            
+            if message.get("more_body", False) or "content-encoding" in headers:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            
+            # Caches must key the response on Accept-Encoding even when this copy isn't compressed
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or len(body) < self.minimum_size or start["status"] in (204, 304):
+                if start["status"] == 304 and encoding is not None and "etag" in headers:
+                    # Confirm the compressed copy the client revalidated
+                    etag = encoded_etag(headers["etag"], encoding)
+                    if if_none_match_tags(etag)[0] in if_none_match_tags(request_headers.get("if-none-match", "")):
+                        headers["ETag"] = etag
+                await send(start)
+                await send(message)
+                return
+            
+            body, coding = self.compress(body, encoding)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], coding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+    
+    def compress(self, body: bytes, encoding: str) -> Tuple[bytes, str]:
+        """
+        Compress a response body.
+        
+        Args:
+            body: Uncompressed body
+            encoding: Negotiated content coding
+            
+        Returns:
+            Tuple of (compressed body, content coding)
+        """
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality), "br"
+        return gzip.compress(body, compresslevel=self.gzip_level), "gzip"
@@ -5,6 +5,10 @@ from services.cache_service import CacheService
 from services.dashboard_service import DashboardService
 from services.search_service import SearchService
 from services.document_service import DocumentService
+from services.relationship_warmer import RelationshipWarmer
+from api.admission import AdmissionController
+from config.settings import settings
+from utils.slow_queries import SlowQueryLog
 
 
 @lru_cache()
@@ -44,5 +48,27 @@ def get_search_service() -> SearchService:
 def get_document_service() -> DocumentService:
     """Get document service instance (singleton)."""
     api_client = get_query_api_client()
-    return DocumentService(api_client)
+    repository = get_document_repository()
+    cache_service = get_cache_service()
+    return DocumentService(api_client, repository, cache_service)
+
+
+@lru_cache()
+def get_relationship_warmer() -> RelationshipWarmer:
+    """Get relationship warmer instance (singleton)."""
+    document_service = get_document_service()
+    repository = get_document_repository()
+    return RelationshipWarmer(document_service, repository)
 
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """Get admission controller instance (singleton)."""
+    return AdmissionController()
+
+
+@lru_cache()
+def get_slow_query_log() -> SlowQueryLog:
+    """Get slow query log instance (singleton)."""
+    return SlowQueryLog(settings.slow_query_log_size, settings.slow_query_threshold)
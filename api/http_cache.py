@@ -0,0 +1,104 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List
+from fastapi import Request
+from config.settings import settings
+
+# Content codings the compression middleware may send a response in
+CONTENT_CODINGS = ("br", "gzip")
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Build a strong ETag from the values a response depends on.
+    
+    Args:
+        parts: Values identifying the response (ex: dataset version, normalized query)
+        
+    Returns:
+        Quoted ETag value
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """
+    Get the ETag of a response sent in a content coding.
+    
+    Each coding gets its own suffix, as the bytes of the representations differ.
+    
+    Args:
+        etag: Quoted ETag of the uncompressed response, possibly weak
+        coding: Content coding, ex: "gzip"
+        
+    Returns:
+        Quoted ETag value, ex: "abc-gzip"
+    """
+    return f'{etag[:-1]}-{coding}"'
+
+
+def if_none_match_tags(if_none_match: str) -> List[str]:
+    """
+    Get the entity tags of an If-None-Match header, for the weak comparison.
+    
+    Args:
+        if_none_match: If-None-Match header value
+        
+    Returns:
+        Quoted tags without their W/ prefix
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def cache_headers(etag: str, last_modified: float) -> Dict[str, str]:
+    """
+    Get the HTTP caching headers of a response.
+    
+    Args:
+        etag: Response ETag
+        last_modified: Unix timestamp of the last metadata refresh
+        
+    Returns:
+        Dictionary with ETag, Last-Modified and Cache-Control headers
+    """
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(int(last_modified), usegmt=True),
+        "Cache-Control": f"public, max-age={settings.http_cache_max_age}"
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float, check_modified_since: bool = True) -> bool:
+    """
+    Evaluate the conditional request headers against the current representation.
+    
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+    
+    Args:
+        request: Incoming request
+        etag: Current ETag
+        last_modified: Unix timestamp of the last metadata refresh
+        check_modified_since: Evaluate If-Modified-Since, False when the response can
+            change without a metadata refresh
+        
+    Returns:
+        True if the client copy is still valid and a 304 can be returned
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison; a compressed copy is valid as long as the response is
+        candidates = if_none_match_tags(if_none_match)
+        return "*" in candidates or any(
+            candidate in candidates for candidate in [etag] + [encoded_etag(etag, coding) for coding in CONTENT_CODINGS]
+        )
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and check_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    
+    return False
@@ -0,0 +1,42 @@
+import json
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from utils.metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize plain JSON data to compact UTF-8 bytes with the fastest available encoder.
+    
+    Args:
+        content: JSON compatible data (dicts, lists, strings, numbers, booleans, None)
+        
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            # Values orjson can't handle natively (ex: numpy scalars)
+            content = jsonable_encoder(content)
+            return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available.
+    
+    Returning it directly from a route also skips FastAPI's jsonable_encoder pass
+    over the plain dicts produced by the services.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return dumps(content)
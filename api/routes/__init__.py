@@ -2,6 +2,8 @@ from fastapi import APIRouter
 from .documents import router as documents_router
 from .search import router as search_router
 from .dashboard import router as dashboard_router
+from .metrics import router as metrics_router
+from .admin import router as admin_router
 
 # Create main API router
 api_router = APIRouter()
@@ -10,6 +12,8 @@ api_router = APIRouter()
 api_router.include_router(documents_router)
 api_router.include_router(search_router)
 api_router.include_router(dashboard_router)
+api_router.include_router(metrics_router)
+api_router.include_router(admin_router)
 
 __all__ = ["api_router"]
 
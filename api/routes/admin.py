@@ -0,0 +1,73 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from api.admin import profile_directory, require_admin
+from api.dependencies import get_slow_query_log
+from api.responses import FastJSONResponse
+from utils.profiling import profile_path
+from utils.slow_queries import SlowQueryLog
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, description="Maximum number of entries"),
+    slow_log: SlowQueryLog = Depends(get_slow_query_log)
+):
+    """
+    Get the most recent slow requests.
+
+    Each entry has the request, its duration and stage timings, the rows scanned
+    and matched, the normalized queries with their compiled plans, and the id of
+    its profile if one was written.
+
+    Args:
+        limit: Maximum number of entries
+        slow_log: Slow query log instance (injected)
+
+    Returns:
+        Dictionary with the log settings and its entries, most recent first
+    """
+    return FastJSONResponse({
+        "threshold_ms": slow_log.threshold * 1000,
+        "capacity": slow_log.capacity,
+        "recorded": slow_log.recorded,
+        "entries": slow_log.recent(limit)
+    })
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(slow_log: SlowQueryLog = Depends(get_slow_query_log)):
+    """
+    Empty the slow query log.
+
+    Args:
+        slow_log: Slow query log instance (injected)
+
+    Returns:
+        Confirmation message
+    """
+    slow_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """
+    Download a request profile, in the cProfile format (readable with pstats or snakeviz).
+
+    Args:
+        profile_id: Profile id, from the X-Profile-Id header or a slow query log entry
+
+    Returns:
+        The profile file
+    """
+    try:
+        path = profile_path(profile_directory(), profile_id)
+    except ValueError as e:
+        logging.error(f"Not serving profiles: {e}")
+        path = None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
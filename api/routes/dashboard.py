@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from api.responses import FastJSONResponse
 from services.dashboard_service import DashboardService
 from api.dependencies import get_dashboard_service
+from api.http_cache import cache_headers, is_not_modified, make_etag
 
 router = APIRouter(prefix="/dashboard-status", tags=["dashboard"])
 
 
 @router.get("")
 async def get_dashboard_status(
+    request: Request,
     dashboard_service: DashboardService = Depends(get_dashboard_service)
 ):
     """
     Get dashboard status with caching and parallel processing.
     
+    Responses carry an ETag derived from the dataset version, so conditional
+    requests get a 304 without rebuilding the statistics.
+    
     Args:
+        request: Incoming request
         dashboard_service: Dashboard service instance (injected)
         
     Returns:
         Dictionary with dashboard statistics
     """
-    return await dashboard_service.get_dashboard_status()
-
+    repository = dashboard_service.repository
+    etag = make_etag("dashboard", repository.dataset_version)
+    headers = cache_headers(etag, repository.last_modified)
+    
+    if is_not_modified(request, etag, repository.last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    dashboard_data = await dashboard_service.get_dashboard_status()
+    return FastJSONResponse(dashboard_data, headers=headers)
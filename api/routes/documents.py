@@ -1,6 +1,14 @@
-from fastapi import APIRouter, Depends
+from typing import Optional, Dict, Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from services.document_service import DocumentService
-from api.dependencies import get_document_service
+from services.search_service import SearchService
+from api.dependencies import get_admission_controller, get_document_service, get_search_service
+from api.admission import AdmissionController, AdmittedStreamingResponse
+from api.responses import FastJSONResponse
+from api.streaming import STREAM_MEDIA_TYPES, stream_events
+from config.settings import settings
+from utils.profiling import profiled
 
 router = APIRouter(tags=["documents"])
 
@@ -27,18 +35,121 @@ async def search_document(
 @router.post("/document-rel/{documentId}")
 async def search_document_rel(
     documentId: str,
-    document_service: DocumentService = Depends(get_document_service)
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream results as ndjson or sse"),
+    document_service: DocumentService = Depends(get_document_service),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
     """
     Get relationships for a document.
     
     Args:
         documentId: Document entity ID
+        stream: Optional streaming format. When set, the raw relationships are sent
+            first followed by one event per related entity as its name resolves
         document_service: Document service instance (injected)
+        admission: Admission controller, limiting concurrent relationship lookups (injected)
         
     Returns:
         List of relationships with document numbers, or error information
     """
-    relationship_response = document_service.get_document_relationships(documentId)
+    lane = admission.lane("relations")
+    if stream:
+        # The slot is held until the stream ends
+        await lane.acquire()
+        return AdmittedStreamingResponse(
+            lane,
+            stream_events(document_service.iter_document_relationships(documentId), stream),
+            media_type=STREAM_MEDIA_TYPES[stream],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    async with lane.slot():
+        relationship_response = await run_in_threadpool(profiled, document_service.get_document_relationships, documentId)
     return relationship_response
 
+
+
+@router.post("/document-graph/{documentId}")
+async def search_document_graph(
+    documentId: str,
+    depth: int = Query(2, ge=1, description="Maximum number of hops from the document"),
+    max_nodes: int = Query(50, ge=1, description="Maximum number of nodes to return"),
+    document_service: DocumentService = Depends(get_document_service),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """
+    Get the multi-hop relationship graph around a document.
+    
+    Args:
+        documentId: Document entity ID to start from
+        depth: Maximum traversal depth (capped by settings)
+        max_nodes: Maximum number of nodes (capped by settings)
+        document_service: Document service instance (injected)
+        admission: Admission controller, limiting concurrent relationship lookups (injected)
+        
+    Returns:
+        Graph of nodes with document numbers and edges, or error information
+    """
+    async with admission.lane("relations").slot():
+        graph_response = await run_in_threadpool(
+            profiled, document_service.get_relationship_graph, documentId, depth, max_nodes
+        )
+    return graph_response
+
+
+@router.get("/documents/{documentId}")
+async def get_document(
+    documentId: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """
+    Get the metadata of a document by its exact document number.
+    
+    Args:
+        documentId: Document number (ex: 2153-12)
+        fields: Comma-separated fields to return, defaults to all listing fields
+        search_service: Search service instance (injected)
+        
+    Returns:
+        The document metadata
+    """
+    try:
+        lookup = search_service.get_documents([documentId], fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not lookup["documents"]:
+        raise HTTPException(status_code=404, detail=f"Document not found: {documentId}")
+    return FastJSONResponse(lookup["documents"][0])
+
+
+@router.post("/documents")
+async def get_documents(
+    payload: Dict[str, Any] = Body(...),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """
+    Get the metadata of several documents by exact document number in one call.
+    
+    Args:
+        payload: Request payload containing ids and an optional fields list
+        search_service: Search service instance (injected)
+        
+    Returns:
+        Dictionary with the found documents in request order and the missing IDs
+    """
+    document_ids = payload.get("ids")
+    if not isinstance(document_ids, list):
+        raise HTTPException(status_code=400, detail="ids must be a list of document numbers")
+    if len(document_ids) > settings.documents_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.documents_batch_max} ids can be requested at once"
+        )
+    
+    try:
+        lookup = search_service.get_documents(document_ids, payload.get("fields"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(lookup)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from database.repository import DocumentRepository
+from services.cache_service import CacheService
+from api.admission import AdmissionController
+from api.dependencies import get_admission_controller, get_cache_service, get_document_repository
+from utils.metrics import metrics, render_samples
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(
+    repository: DocumentRepository = Depends(get_document_repository),
+    cache_service: CacheService = Depends(get_cache_service),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """
+    Expose metrics in the Prometheus text format.
+    
+    Args:
+        repository: Document repository instance (injected)
+        cache_service: Cache service instance (injected)
+        admission: Admission controller instance (injected)
+        
+    Returns:
+        Stage, request and upstream latency histograms, cache, admission and dataset metrics
+    """
+    lines = metrics.render()
+    
+    cache_stats = cache_service.stats()
+    backend = {"backend": cache_stats["backend"]}
+    lines += render_samples("cache_entries", "gauge", "Entries in the cache", [(backend, cache_stats["entries"])])
+    lines += render_samples(
+        "cache_bytes", "gauge", "Estimated size of the cached values", [(backend, cache_stats["bytes"])]
+    )
+    for counter in ("hits", "misses", "evictions", "expirations"):
+        lines += render_samples(
+            f"cache_{counter}_total", "counter", f"Cache {counter}", [(backend, cache_stats[counter])]
+        )
+    lines += render_samples("cache_hit_ratio", "gauge", "Cache hits over lookups", [(backend, cache_stats["hit_ratio"])])
+    
+    lane_stats = admission.stats()
+    for name, help_text in (
+        ("active", "Requests running in the lane"),
+        ("waiting", "Requests waiting for a slot in the lane"),
+    ):
+        lines += render_samples(
+            f"admission_{name}", "gauge", help_text,
+            [({"lane": lane}, stats[name]) for lane, stats in lane_stats.items()]
+        )
+    for name in ("admitted", "rejected"):
+        lines += render_samples(
+            f"admission_{name}_total", "counter", f"Requests {name} by the lane",
+            [({"lane": lane}, stats[name]) for lane, stats in lane_stats.items()]
+        )
+    
+    lines += render_samples(
+        "dataset_documents", "gauge", "Documents in the metadata store", [({}, len(repository.store.documents))]
+    )
+    lines += render_samples("dataset_info", "gauge", "Version of the metadata dataset", [({"version": repository.dataset_version}, 1)])
+    lines += render_samples(
+        "dataset_refreshed_timestamp_seconds", "gauge", "Unix time of the last metadata refresh",
+        [({}, repository.last_modified)]
+    )
+    
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=METRICS_MEDIA_TYPE)
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Body, Depends
-from typing import Dict, Any
+from datetime import date
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from api.responses import FastJSONResponse
+from api.streaming import EXPORT_MEDIA_TYPES, export_rows
+from typing import Dict, Any, Optional
 from services.search_service import SearchService
-from api.dependencies import get_search_service
+from api.dependencies import get_admission_controller, get_search_service
+from api.admission import AdmissionController, AdmittedStreamingResponse
+from api.http_cache import cache_headers, is_not_modified, make_etag
+from config.settings import settings
+from core.query_ast import has_relative_dates
+from core.text_index import MAX_SUGGESTIONS
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -9,14 +17,17 @@ router = APIRouter(prefix="/search", tags=["search"])
 @router.post("")
 async def search_documents(
     payload: Dict[str, Any] = Body(...),
-    search_service: SearchService = Depends(get_search_service)
+    search_service: SearchService = Depends(get_search_service),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
     """
     Search documents with pagination.
     
     Args:
-        payload: Request payload containing query, page, and limit
+        payload: Request payload containing query, page, limit and optional fields list,
+            fuzzy flag and count_mode
         search_service: Search service instance (injected)
+        admission: Admission controller, picking a lane from the query cost (injected)
         
     Returns:
         Dictionary with results and pagination info
@@ -24,6 +35,182 @@ async def search_documents(
     query = payload.get("query", "")
     page = payload.get("page", 1)
     limit = payload.get("limit", 50)
+    fields = payload.get("fields")
+    fuzzy = bool(payload.get("fuzzy", False))
+    count_mode = payload.get("count_mode")
+    
+    try:
+        plan = await search_service.prepare(query, fuzzy)
+        async with admission.search_lane(plan["cost"] if plan else 0).slot():
+            search_results = await search_service.search_documents(
+                query, page, limit, fields, fuzzy, count_mode, plan=plan
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(search_results)
+
+
+@router.get("")
+async def search_documents_cacheable(
+    request: Request,
+    query: str = Query(""),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    fuzzy: bool = Query(False, description="Also match words with typos or spelling variants"),
+    count_mode: Optional[str] = Query(None, pattern="^(exact|estimated|capped)$"),
+    search_service: SearchService = Depends(get_search_service),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """
+    Search documents with pagination, with HTTP conditional caching.
+    
+    Responses carry an ETag derived from the dataset version and the normalized
+    query, so browsers and CDNs can revalidate with a 304 without running the search.
+    Queries with relative dates are also tagged with the day they resolve on, and
+    only revalidate through If-None-Match.
+    
+    Args:
+        request: Incoming request
+        query: Search query string
+        page: Page number (1-based)
+        limit: Number of results per page
+        fields: Comma-separated fields to return, defaults to all listing fields
+        fuzzy: Also match free text words with typos or transliteration variants
+        count_mode: How total_count is computed, defaults to the configured mode
+        search_service: Search service instance (injected)
+        admission: Admission controller, picking a lane from the query cost (injected)
+        
+    Returns:
+        Dictionary with results and pagination info
+    """
+    try:
+        result_fields = search_service.resolve_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    repository = search_service.repository
+    etag_parts = [
+        "search", repository.dataset_version, " ".join(query.split()), page, limit,
+        ",".join(result_fields), fuzzy, count_mode or settings.search_count_mode
+    ]
+    # Relative dates (ex: date:this-year) resolve against today, so the results
+    # change at midnight without a metadata refresh
+    relative_dates = has_relative_dates(query)
+    if relative_dates:
+        etag_parts.append(date.today().isoformat())
+    etag = make_etag(*etag_parts)
+    headers = cache_headers(etag, repository.last_modified)
+    
+    if is_not_modified(request, etag, repository.last_modified, check_modified_since=not relative_dates):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        plan = await search_service.prepare(query, fuzzy)
+        async with admission.search_lane(plan["cost"] if plan else 0).slot():
+            search_results = await search_service.search_documents(
+                query, page, limit, result_fields, fuzzy, count_mode, plan=plan
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(search_results, headers=headers)
+
+
+@router.post("/batch")
+async def search_documents_batch(
+    payload: Dict[str, Any] = Body(...),
+    search_service: SearchService = Depends(get_search_service),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """
+    Run several searches in one request.
+    
+    Args:
+        payload: Request payload containing a queries list of {query, page, limit, fields, fuzzy} objects
+        search_service: Search service instance (injected)
+        admission: Admission controller, picking a lane from the total cost of the queries (injected)
+        
+    Returns:
+        Dictionary with one search response per query, in request order
+    """
+    searches = payload.get("queries")
+    if not isinstance(searches, list):
+        raise HTTPException(status_code=400, detail="queries must be a list")
+    if len(searches) > settings.search_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.search_batch_max} queries can be sent at once"
+        )
     
-    return await search_service.search_documents(query, page, limit)
+    try:
+        prepared = await search_service.prepare_many(searches)
+        async with admission.search_lane(prepared["cost"]).slot():
+            search_results = await search_service.search_many(searches, prepared)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"results": search_results})
+
 
+@router.get("/export")
+async def export_search_results(
+    query: str = Query(..., min_length=1),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export"),
+    fuzzy: bool = Query(False, description="Also match words with typos or spelling variants"),
+    search_service: SearchService = Depends(get_search_service),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """
+    Stream every document matching a search query, newest first.
+    
+    Rows are produced lazily from a single scan, so memory use stays constant
+    regardless of the result size; the stream stops when the client disconnects.
+    Exports hold a slot of the search_expensive lane until the stream ends, and
+    the scan is bounded by the query time budget.
+    
+    Args:
+        query: Search query string
+        export_format: Export format, ndjson or csv
+        fields: Comma-separated fields to export, defaults to all listing fields
+        fuzzy: Also match free text words with typos or transliteration variants
+        search_service: Search service instance (injected)
+        admission: Admission controller, limiting concurrent exports (injected)
+        
+    Returns:
+        Streaming NDJSON or CSV response
+    """
+    try:
+        result_fields = search_service.resolve_fields(fields)
+        plan = await search_service.prepare(query, fuzzy)
+        rows = search_service.iter_search_results(query, result_fields, fuzzy, plan=plan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    lane = admission.lane("search_expensive")
+    await lane.acquire()
+    return AdmittedStreamingResponse(
+        lane,
+        export_rows(rows, result_fields, export_format, settings.export_chunk_rows),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="gazettes.{export_format}"'}
+    )
+
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query("", description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """
+    Get typeahead suggestions for gazette numbers, document types and description terms.
+    
+    Args:
+        q: Text typed so far
+        limit: Maximum number of suggestions
+        search_service: Search service instance (injected)
+        
+    Returns:
+        Dictionary with the query and its suggestions
+    """
+    return FastJSONResponse(search_service.suggest(q, limit))
@@ -0,0 +1,100 @@
+import io
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from api.responses import dumps
+
+# Supported streaming formats and their media types
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+# Supported export formats and their media types
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def format_ndjson(event: str, data: Any) -> str:
+    """
+    Format an event as a newline-delimited JSON line.
+    
+    Args:
+        event: Event name
+        data: JSON serializable event payload
+        
+    Returns:
+        A single NDJSON line
+    """
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Format an event as a Server-Sent Event.
+    
+    Args:
+        event: Event name
+        data: JSON serializable event payload
+        
+    Returns:
+        A single SSE message
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_events(events: Iterable[Tuple[str, Any]], stream_format: str) -> Iterator[str]:
+    """
+    Encode (event, data) tuples in the requested streaming format.
+    
+    Args:
+        events: Iterable of (event name, data) tuples
+        stream_format: "ndjson" or "sse"
+        
+    Yields:
+        Encoded messages
+    """
+    formatter = format_sse if stream_format == "sse" else format_ndjson
+    for event, data in events:
+        yield formatter(event, data)
+
+
+def export_rows(rows: Iterable[Dict[str, Any]], fields: List[str], export_format: str, chunk_rows: int = 500) -> Iterator[bytes]:
+    """
+    Encode result rows as NDJSON or CSV, a chunk of rows at a time.
+    
+    Args:
+        rows: Iterable of result dictionaries
+        fields: Fields of each row, used as the CSV header
+        export_format: "ndjson" or "csv"
+        chunk_rows: Number of rows encoded per yielded chunk
+        
+    Yields:
+        Encoded chunks
+    """
+    rows = iter(rows)
+    
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            writer.writerows(chunk)
+            data = buffer.getvalue()
+            if data:
+                yield data.encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            if len(chunk) < chunk_rows:
+                return
+    
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if chunk:
+            yield b"".join(dumps(row) + b"\n" for row in chunk)
+        if len(chunk) < chunk_rows:
+            return
@@ -0,0 +1,97 @@
+import logging
+import random
+import uuid
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from api.admin import ADMIN_TOKEN_HEADER, PROFILE_HEADER, is_admin_token, profile_directory
+from config.settings import settings
+from utils.metrics import StageTimer, current_timer, metrics
+from utils.profiling import RequestProfile, current_profile
+from utils.slow_queries import SlowQueryLog
+
+
+class TimingMiddleware:
+    """Time each request, reporting its stages in a Server-Timing header.
+
+    The stages recorded while handling the request (parse, find, upstream, ...)
+    are sent with the response headers, and the request duration is added to the
+    http_request_duration_seconds histogram by route template. Slow requests are
+    added to the slow query log.
+
+    A request is profiled when it sends X-Profile with a valid X-Admin-Token (its
+    profile id is returned in the X-Profile-Id header), or when it is picked by
+    settings.profile_sample_rate, in which case the profile is only kept if the
+    request turns out slow.
+    """
+
+    def __init__(self, app: ASGIApp, slow_log: Optional[SlowQueryLog] = None):
+        """
+        Initialize timing middleware.
+
+        Args:
+            app: ASGI application
+            slow_log: Log to record slow requests in, if any
+        """
+        self.app = app
+        self.slow_log = slow_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+        token = current_timer.set(timer)
+        status = 500
+
+        headers = Headers(scope=scope)
+        requested = PROFILE_HEADER in headers and is_admin_token(headers.get(ADMIN_TOKEN_HEADER))
+        profile = None
+        if requested or (settings.profile_sample_rate and random.random() < settings.profile_sample_rate):
+            profile = RequestProfile(uuid.uuid4().hex)
+        profile_token = current_profile.set(profile)
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timer.server_timing())
+                if requested:
+                    headers.append("X-Profile-Id", profile.profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timer.reset(token)
+            current_profile.reset(profile_token)
+            # Label by route template, not raw path, to bound the number of series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            duration = timer.elapsed()
+            metrics.observe(
+                "http_request_duration_seconds",
+                duration,
+                method=scope["method"],
+                route=route,
+                status=str(status)
+            )
+
+            slow = self.slow_log is not None and self.slow_log.is_slow(duration)
+            profile_path = None
+            if profile is not None and (requested or slow):
+                try:
+                    profile_path = profile.dump(profile_directory(), settings.profile_max_files)
+                except (OSError, ValueError) as e:
+                    logging.error(f"Error writing profile {profile.profile_id}: {e}")
+            if slow:
+                self.slow_log.record(
+                    scope["method"],
+                    scope["path"],
+                    scope.get("query_string", b"").decode("latin-1"),
+                    route,
+                    status,
+                    timer,
+                    profile.profile_id if profile_path else None
+                )
@@ -0,0 +1,189 @@
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+# Document types and their share of the archive; gazettes without a copy are UNAVAILABLE
+DOCUMENT_TYPES = (
+    ("LEGAL_REGULATORY", 0.34),
+    ("ORGANISATIONAL", 0.20),
+    ("LAND_ACQUISITION", 0.14),
+    ("PEOPLE_APPOINTMENTS", 0.12),
+    ("ELECTIONS", 0.05),
+    ("PUBLIC_NOTICES", 0.07),
+    ("UNAVAILABLE", 0.08),
+)
+
+# First year of the corpus; later years publish more gazettes
+FIRST_YEAR = 2000
+LAST_YEAR = 2025
+
+# Gazette number of the first issue of 2015, ex: 1895-18 is from 2015-01-01
+ISSUE_2015 = 1895
+
+MINISTRIES = (
+    "Ministry of Finance", "Ministry of Public Administration", "Ministry of Health",
+    "Ministry of Education", "Ministry of Lands", "Ministry of Transport and Highways",
+    "Ministry of Agriculture", "Ministry of Justice", "Ministry of Defence",
+    "Ministry of Fisheries and Aquatic Resources", "Ministry of Power and Energy",
+)
+
+AUTHORITIES = (
+    "Central Bank of Sri Lanka", "Department of Census and Statistics", "Elections Commission",
+    "Department of Excise", "Sri Lanka Customs", "Public Utilities Commission of Sri Lanka",
+    "Urban Development Authority", "Consumer Affairs Authority", "Department of Motor Traffic",
+)
+
+ACTS = (
+    "Registered Stock and Securities Ordinance", "Excise Ordinance", "Customs Ordinance",
+    "Land Acquisition Act", "Consumer Affairs Authority Act", "Motor Traffic Act",
+    "Urban Development Authority Law", "Fisheries and Aquatic Resources Act", "Local Authorities Elections Ordinance",
+)
+
+# District names, some with the transliteration variants found in gazette titles
+DISTRICTS = (
+    "Colombo", "Gampaha", "Kalutara", "Kandy", "Matale", "Nuwara Eliya", "Galle", "Matara",
+    "Hambanthota", "Hambantota", "Jaffna", "Kilinochchi", "Mannar", "Vavuniya", "Mullaitivu",
+    "Batticaloa", "Ampara", "Trincomalee", "Kurunegala", "Puttalam", "Anuradhapura",
+    "Polonnaruwa", "Badulla", "Monaragala", "Ratnapura", "Kegalle",
+)
+
+VILLAGES = (
+    "Aarabokka", "Thalawa", "Meegahawatta", "Kottawa", "Pannipitiya", "Weliweriya", "Kahawatta",
+    "Udugama", "Akuressa", "Kalmunai", "Chavakachcheri", "Madhu", "Nedunkerni", "Dambulla",
+)
+
+ROLES = (
+    "Justice of the Peace", "Commissioner of Inquiry", "Notary Public", "Registrar of Marriages",
+    "Board of Directors", "Secretary", "Additional Secretary", "Director General",
+)
+
+NOTICES = (
+    "and {count} other notices (S only)",
+    "published in Sinhala, Tamil and English",
+    "with effect from the date of publication",
+    "rescinding the notification published in the Gazette No. {issue}",
+    "under section {section} of the said Act",
+    "in respect of the lands described in the schedule hereto",
+    "as amended by Act No. {section} of {year}",
+)
+
+CATEGORISATIONS = {
+    "LEGAL_REGULATORY": "This gazette content primarily involves the exercise of regulatory powers under an Act or Ordinance.",
+    "ORGANISATIONAL": "This gazette notification announces organisational decisions or statistics of a public body.",
+    "LAND_ACQUISITION": "This gazette notification concerns the acquisition of land for a public purpose.",
+    "PEOPLE_APPOINTMENTS": "This gazette notification announces appointments to public offices.",
+    "ELECTIONS": "This gazette notification concerns the conduct or results of elections.",
+    "PUBLIC_NOTICES": "This gazette publishes notices for the information of the public.",
+    "UNAVAILABLE": "NOT-FOUND",
+}
+
+
+def _title(document_type: str, rng: random.Random, year: int) -> str:
+    """Get the opening sentence of a description for a document type."""
+    if document_type == "LEGAL_REGULATORY":
+        return (
+            f"{rng.choice(AUTHORITIES)} - Order under the {rng.choice(ACTS)} "
+            f"No. {rng.randint(1, 60)} of {rng.randint(1950, year)}"
+        )
+    if document_type == "ORGANISATIONAL":
+        return (
+            f"Department of Census and Statistics - The Colombo Consumer's Price Index for the Month of "
+            f"{date(year, rng.randint(1, 12), 1):%B %Y} was {rng.uniform(100, 250):.1f}"
+            if rng.random() < 0.3 else
+            f"{rng.choice(MINISTRIES)} - Assignment of subjects and functions to departments and institutions"
+        )
+    if document_type == "LAND_ACQUISITION":
+        district = rng.choice(DISTRICTS)
+        return f"Land Acquisition - {rng.choice(VILLAGES)}, {district} D/S Division, {district} District"
+    if document_type == "PEOPLE_APPOINTMENTS":
+        return f"{rng.choice(MINISTRIES)} - Appointment of {rng.choice(ROLES)} for the {rng.choice(DISTRICTS)} District"
+    if document_type == "ELECTIONS":
+        return f"Elections Commission - Local Authorities Elections {year} - {rng.choice(DISTRICTS)} District results"
+    if document_type == "PUBLIC_NOTICES":
+        return f"{rng.choice(AUTHORITIES)} - Notice to the public regarding {rng.choice(ACTS)}"
+    return f"{rng.choice(MINISTRIES)} - Notification"
+
+
+def _description(document_type: str, rng: random.Random, year: int, issue: int) -> str:
+    """Get a description of about 60 to 350 characters: a title followed by notice clauses."""
+    parts = [_title(document_type, rng, year)]
+    for notice in rng.sample(NOTICES, rng.randint(1, 5)):
+        parts.append(notice.format(
+            count=rng.randint(1, 9), issue=f"{max(1, issue - rng.randint(1, 400))}/{rng.randint(1, 40)}",
+            section=rng.randint(2, 80), year=rng.randint(1950, year)
+        ))
+    return " ".join(parts)
+
+
+def _dates(size: int, rng: random.Random) -> List[date]:
+    """Draw publication dates, later years weighted up, in ascending order."""
+    years = list(range(FIRST_YEAR, LAST_YEAR + 1))
+    weights = [1 + (year - FIRST_YEAR) / 5 for year in years]
+    dates = []
+    for year in rng.choices(years, weights, k=size):
+        start = date(year, 1, 1)
+        dates.append(start + timedelta(days=rng.randrange((date(year + 1, 1, 1) - start).days)))
+    dates.sort()
+    return dates
+
+
+def generate_corpus(size: int, seed: int = 1895) -> List[Dict[str, str]]:
+    """
+    Generate raw gazette metadata, in the global metadata JSON format.
+
+    The same size and seed always produce the same documents. Gazette numbers
+    follow the weekly issue numbering (ex: 2056-34 is the 34th gazette of issue
+    2056), and descriptions mix the titles and clauses of real gazettes.
+
+    Args:
+        size: Number of documents
+        seed: Random seed
+
+    Returns:
+        List of raw documents with the Docs fields
+    """
+    rng = random.Random(seed)
+    types, type_weights = zip(*DOCUMENT_TYPES)
+    documents = []
+    issue_sequence: Dict[int, int] = {}
+
+    for published in _dates(size, rng):
+        issue = ISSUE_2015 + (published - date(2015, 1, 1)).days // 7
+        issue_sequence[issue] = issue_sequence.get(issue, 0) + 1
+        document_id = f"{issue}-{issue_sequence[issue]}"
+        document_type = rng.choices(types, type_weights)[0]
+        available = document_type != "UNAVAILABLE"
+        documents.append({
+            "document_id": document_id,
+            "description": _description(document_type, rng, published.year, issue),
+            "document_date": published.isoformat(),
+            "document_type": document_type,
+            "categorisation": CATEGORISATIONS[document_type],
+            "source": (
+                f"https://documents.gov.lk/files/egz/{published:%Y/%m}/{document_id}_E.pdf" if available else "N/A"
+            ),
+            "availability": "Available" if available else "Unavailable",
+            "file_path": f"archive/{published:%Y/%m}/{document_id}",
+        })
+
+    # The metadata JSON isn't sorted by date
+    rng.shuffle(documents)
+    return documents
+
+
+def corpus_stats(documents: List[Dict[str, str]]) -> Dict[str, Tuple[int, int]]:
+    """
+    Summarize a corpus, to check the generator's distributions.
+
+    Args:
+        documents: Raw documents
+
+    Returns:
+        Dictionary with the (minimum, maximum) description length and date year
+    """
+    lengths = [len(doc["description"]) for doc in documents]
+    years = [int(doc["document_date"][:4]) for doc in documents]
+    return {
+        "description_length": (min(lengths), max(lengths)) if lengths else (0, 0),
+        "year": (min(years), max(years)) if years else (0, 0),
+    }
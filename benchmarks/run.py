@@ -0,0 +1,172 @@
+"""
+Run the benchmark suite over generated corpora and check it against thresholds.
+
+    python -m benchmarks.run --sizes 10000,100000 --output results.json
+    python -m benchmarks.run --baseline results.json --tolerance 0.25
+
+Exits with status 1 when a result exceeds its threshold in benchmarks/thresholds.json
+(or the file given with --thresholds), or regresses past the tolerance from a baseline.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import main  # noqa: F401 (imports the services in dependency order)
+from benchmarks.corpus import generate_corpus
+from benchmarks.scenarios import BenchmarkContext, SCENARIOS, run_scenarios
+from config.settings import settings
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+# Metrics compared with a baseline run: durations and memory, lower is better
+COMPARED_METRICS = ("median_ms", "bytes_per_document")
+
+logger = logging.getLogger(__name__)
+
+
+def run_suite(sizes: List[int], seed: int, repeat: int, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Generate a corpus of each size and run the scenarios against it.
+
+    Args:
+        sizes: Corpus sizes, in documents
+        seed: Corpus generator seed
+        repeat: Number of timed runs of each scenario
+        names: Scenarios to run, defaults to all of them
+
+    Returns:
+        Dictionary with the run's environment and the results by corpus size and scenario
+    """
+    results = {}
+    for size in sizes:
+        logger.info(f"Generating {size} documents")
+        context = BenchmarkContext(generate_corpus(size, seed))
+        try:
+            logger.info(f"Running scenarios over {size} documents")
+            results[str(size)] = run_scenarios(context, repeat, names)
+        finally:
+            context.close()
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def check_thresholds(results: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Compare results with absolute limits.
+
+    Args:
+        results: Results by corpus size and scenario, from run_suite
+        thresholds: Limits by corpus size, scenario and metric,
+            ex: {"10000": {"search_type": {"median_ms": 25}}}
+
+    Returns:
+        Description of each exceeded limit
+    """
+    failures = []
+    for size, scenarios in thresholds.items():
+        for name, limits in scenarios.items():
+            result = results.get(size, {}).get(name)
+            if result is None:
+                continue
+            for metric, limit in limits.items():
+                if metric in result and result[metric] > limit:
+                    failures.append(f"{name} at {size} documents: {metric} {result[metric]} exceeds {limit}")
+    return failures
+
+
+def check_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare results with a previous run.
+
+    Args:
+        results: Results by corpus size and scenario, from run_suite
+        baseline: Results of the previous run, in the same format
+        tolerance: Allowed relative increase, ex: 0.25 for 25%
+
+    Returns:
+        Description of each regression past the tolerance
+    """
+    failures = []
+    for size, scenarios in results.items():
+        for name, result in scenarios.items():
+            previous = baseline.get(size, {}).get(name, {})
+            for metric in COMPARED_METRICS:
+                if metric in result and previous.get(metric) and result[metric] > previous[metric] * (1 + tolerance):
+                    failures.append(
+                        f"{name} at {size} documents: {metric} {result[metric]} regressed "
+                        f"from {previous[metric]} (tolerance {tolerance:.0%})"
+                    )
+    return failures
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark search, dashboard and refresh over synthetic gazettes")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated corpus sizes, up to 1000000")
+    parser.add_argument("--seed", type=int, default=1895, help="Corpus generator seed")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs of each scenario")
+    parser.add_argument(
+        "--scenarios", default="",
+        help=f"Comma-separated scenarios, defaults to all: {', '.join(s.name for s in SCENARIOS)}, memory"
+    )
+    parser.add_argument("--output", default="", help="File to write the JSON results to, defaults to stdout")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="JSON file of limits, empty to skip")
+    parser.add_argument("--baseline", default="", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression from the baseline")
+    return parser.parse_args(argv)
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks from the command line.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv
+
+    Returns:
+        Exit status: 0 if every check passed, 1 otherwise
+    """
+    args = parse_args(argv)
+    # Measure the whole work of each query, without the production time budget
+    settings.query_time_budget = 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()] or None
+    report = run_suite(sizes, args.seed, args.repeat, names)
+
+    failures = []
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures += check_thresholds(report["results"], json.load(f))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += check_baseline(report["results"], json.load(f)["results"], args.tolerance)
+    report["failures"] = failures
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for failure in failures:
+        logger.error(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
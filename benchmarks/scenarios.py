@@ -0,0 +1,174 @@
+import asyncio
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from database.repository import DocumentRepository
+from services.cache_backends import MemoryCacheBackend
+from services.cache_service import CacheService
+from services.dashboard_service import DashboardService
+from services.metadata_store import MetadataStore, compute_aggregates
+from services.search_service import SearchService
+
+
+class BenchmarkContext:
+    """Services loaded with a generated corpus"""
+
+    def __init__(self, corpus: List[Dict[str, str]]):
+        """
+        Load a corpus into the metadata store and build the services over it.
+
+        Args:
+            corpus: Raw documents, from generate_corpus
+        """
+        self.corpus = corpus
+        self.store = MetadataStore()
+        self.store.load_documents(corpus)
+        self.repository = DocumentRepository()
+        self.search_service = SearchService(self.repository)
+        self.dashboard_service = DashboardService(
+            self.repository, CacheService(sweep_interval=0, backend=MemoryCacheBackend())
+        )
+        self.loop = asyncio.new_event_loop()
+
+    def search(self, query: str, page: int = 1, limit: int = 50, **options: Any) -> Dict[str, Any]:
+        """Run a search through the search service, as the /search endpoint does."""
+        return self.loop.run_until_complete(
+            self.search_service.search_documents(query, page, limit, **options)
+        )
+
+    def close(self) -> None:
+        """Release the event loop."""
+        self.loop.close()
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A timed operation, run repeatedly against a loaded corpus"""
+    name: str
+    description: str
+    run: Callable[[BenchmarkContext], Any]
+    # Timed runs, as a fraction of the suite's repeat count (ex: fewer for refreshes)
+    repeat_factor: float = 1.0
+
+
+def _search(query: str, **options: Any) -> Callable[[BenchmarkContext], Any]:
+    """Get a scenario body running one search."""
+    return lambda context: context.search(query, **options)
+
+
+SCENARIOS = (
+    Scenario("search_type", "Type filter pattern, first page", _search("type:legal")),
+    Scenario("search_type_exact", "Exact type value, first page", _search('type:"LAND_ACQUISITION"')),
+    Scenario("search_date_year", "Year filter, narrowed by the date index", _search("date:2019")),
+    Scenario("search_date_range", "Date range over three years", _search("date:2015..2017")),
+    Scenario("search_free_text", "Common free text word", _search("acquisition")),
+    Scenario("search_free_text_rare", "Rare free text word, scanning the whole corpus", _search("aarabokka")),
+    Scenario("search_regex", "Pattern needing the regex engine", _search("type:legal order.*act")),
+    Scenario("search_fuzzy", "Free text with a typo, expanded through the term index", _search("hambantotta", fuzzy=True)),
+    Scenario("search_estimated_count", "Common word with an estimated total", _search("notice", count_mode="estimated")),
+    Scenario("search_page_deep", "Page 100 of a type filter", _search("type:legal", page=100)),
+    Scenario(
+        "search_page_last", "Last page of an unfiltered listing",
+        lambda context: context.search("date:..2100", page=max(1, len(context.corpus) // 50))
+    ),
+    Scenario("dashboard", "Dashboard response from the precomputed aggregates",
+             lambda context: context.dashboard_service.compute_dashboard_status()),
+    Scenario("dashboard_aggregates", "Dashboard aggregates over the whole corpus",
+             lambda context: compute_aggregates(context.store.documents)),
+    Scenario("refresh", "Validate, encode and index the corpus, as a metadata refresh does",
+             lambda context: context.store.load_documents(context.corpus), repeat_factor=0.2),
+)
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time a function.
+
+    Args:
+        func: Function to time
+        repeat: Number of timed runs
+        warmup: Number of untimed runs first (ex: to fill caches)
+
+    Returns:
+        Dictionary with the number of runs and the min, median, p95 and max durations in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+
+    durations.sort()
+    return {
+        "runs": len(durations),
+        "min_ms": round(durations[0], 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+        "max_ms": round(durations[-1], 3),
+    }
+
+
+def measure_memory(context: BenchmarkContext) -> Dict[str, Any]:
+    """
+    Measure the memory held by the store for the corpus: records with their strings,
+    indexes and aggregates.
+
+    Args:
+        context: Benchmark context; its store is reloaded
+
+    Returns:
+        Dictionary with the retained and peak bytes, and the retained bytes per document
+    """
+    context.store.load_documents([])
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        # Load a fresh copy, as a refresh does, so the strings kept from it are counted
+        context.store.load_documents(json.loads(json.dumps(context.corpus)))
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    retained = current - baseline
+    return {
+        "retained_bytes": retained,
+        "peak_bytes": peak - baseline,
+        "bytes_per_document": round(retained / max(1, len(context.corpus)), 1),
+    }
+
+
+def run_scenarios(
+    context: BenchmarkContext,
+    repeat: int,
+    names: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the benchmark scenarios against a loaded corpus.
+
+    Args:
+        context: Benchmark context
+        repeat: Number of timed runs of each scenario
+        names: Scenarios to run, including "memory", defaults to all of them
+
+    Returns:
+        Results by scenario name
+    """
+    results = {}
+    for scenario in SCENARIOS:
+        if names is None or scenario.name in names:
+            results[scenario.name] = {
+                "description": scenario.description,
+                **measure(lambda: scenario.run(context), max(1, round(repeat * scenario.repeat_factor)))
+            }
+    if names is None or "memory" in names:
+        results["memory"] = {"description": "Memory held by the loaded corpus", **measure_memory(context)}
+    return results
@@ -1,7 +1,14 @@
+import re
+import time
+import logging
 import requests
 from typing import Dict, Any, Optional, List
 from config.settings import settings
 from utils.protobuf_decoder import decode_protobuf
+from utils.metrics import metrics, stage
+
+# Entity IDs in endpoint paths, replaced to label upstream latency by endpoint
+ENTITY_PATH = re.compile(r"(?<=/entities/)(?!search$)[^/]+")
 
 
 class QueryAPIClient:
@@ -32,14 +39,26 @@ class QueryAPIClient:
             Response JSON as dictionary, or None on error
         """
         url = f"{self.base_url}{endpoint}"
+        outcome = "error"
+        started = time.perf_counter()
         
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            with stage("upstream"):
+                response = requests.post(url, json=payload, headers=self.headers, timeout=settings.request_timeout)
+                response.raise_for_status()
+                result = response.json()
+            outcome = "ok"
+            return result
         except Exception as e:
             logging.error(f"Error making request to {url}: {str(e)}")
             return None
+        finally:
+            metrics.observe(
+                "upstream_request_duration_seconds",
+                time.perf_counter() - started,
+                endpoint=ENTITY_PATH.sub("{id}", endpoint),
+                outcome=outcome
+            )
     
     def search_entity(self, document_id: str, kind_major: str = "Document", kind_minor: str = "") -> Optional[str]:
         """
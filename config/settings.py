@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 import os
 from dotenv import load_dotenv
 
@@ -18,9 +18,114 @@ class Settings:
         
         # Cache settings
         self.cache_ttl: int = int(os.getenv("CACHE_TTL", 300))
+        self.cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+        self.cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.cache_sweep_interval: float = float(os.getenv("CACHE_SWEEP_INTERVAL", 60))
+        self.cache_stale_ttl: int = int(os.getenv("CACHE_STALE_TTL", 3600))
+
+        # Cache storage: "memory" (per worker) or "sqlite" (shared by the workers on a node).
+        # The SQLite file must be in a directory only the app's user can access, by
+        # default ~/.cache/gztarchiver.
+        self.cache_backend: str = os.getenv("CACHE_BACKEND", "memory").lower()
+        self.cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "")
+
+        # Maximum number of document IDs in a single multi-get request
+        self.documents_batch_max: int = int(os.getenv("DOCUMENTS_BATCH_MAX", 500))
+
+        # Default counting of search totals: "exact", "estimated" or "capped", with the
+        # count at which capped counts stop and the sample size of estimated counts
+        self.search_count_mode: str = os.getenv("SEARCH_COUNT_MODE", "exact").lower()
+        self.search_count_cap: int = int(os.getenv("SEARCH_COUNT_CAP", 1000))
+        self.search_count_sample: int = int(os.getenv("SEARCH_COUNT_SAMPLE", 1000))
+
+        # Admission control: concurrent requests and wait queue per lane. Searches whose
+        # estimated cost (candidate documents x pattern weight) reaches
+        # ADMISSION_EXPENSIVE_COST run in the smaller search_expensive lane.
+        self.admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.admission_search_concurrency: int = int(os.getenv("ADMISSION_SEARCH_CONCURRENCY", 8))
+        self.admission_search_queue: int = int(os.getenv("ADMISSION_SEARCH_QUEUE", 32))
+        self.admission_expensive_concurrency: int = int(os.getenv("ADMISSION_EXPENSIVE_CONCURRENCY", 2))
+        self.admission_expensive_queue: int = int(os.getenv("ADMISSION_EXPENSIVE_QUEUE", 4))
+        self.admission_relations_concurrency: int = int(os.getenv("ADMISSION_RELATIONS_CONCURRENCY", 4))
+        self.admission_relations_queue: int = int(os.getenv("ADMISSION_RELATIONS_QUEUE", 16))
+        self.admission_queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 5))
+        self.admission_retry_after: float = float(os.getenv("ADMISSION_RETRY_AFTER", 2))
+        self.admission_expensive_cost: int = int(os.getenv("ADMISSION_EXPENSIVE_COST", 200000))
+
+        # Maximum number of searches in a single batch search request
+        self.search_batch_max: int = int(os.getenv("SEARCH_BATCH_MAX", 20))
+
+        # Number of rows encoded per chunk of a streamed export
+        self.export_chunk_rows: int = int(os.getenv("EXPORT_CHUNK_ROWS", 500))
+
+        # Minimum number of documents a description term must appear in to be suggested
+        self.suggest_min_term_frequency: int = int(os.getenv("SUGGEST_MIN_TERM_FREQUENCY", 2))
+
+        # Guards on user supplied patterns: maximum regex length and per-query scan time in seconds (0 disables)
+        self.query_regex_max_length: int = int(os.getenv("QUERY_REGEX_MAX_LENGTH", 256))
+        self.query_time_budget: float = float(os.getenv("QUERY_TIME_BUDGET", 2.0))
+
+        # Bounds of typo-tolerant free text search: words per query and variants per word
+        self.fuzzy_max_terms: int = int(os.getenv("FUZZY_MAX_TERMS", 8))
+        self.fuzzy_max_expansions: int = int(os.getenv("FUZZY_MAX_EXPANSIONS", 20))
+
+        # Token expected in the X-Admin-Token header by the /admin endpoints and the
+        # profiling header; the admin endpoints are disabled while it is empty
+        self.admin_token: str = os.getenv("ADMIN_TOKEN", "")
+
+        # Slow query log: requests taking at least SLOW_QUERY_THRESHOLD seconds are kept
+        # in a ring buffer of SLOW_QUERY_LOG_SIZE entries (0 disables the log)
+        self.slow_query_threshold: float = float(os.getenv("SLOW_QUERY_THRESHOLD", 1.0))
+        self.slow_query_log_size: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", 100))
+
+        # Request profiling: fraction of requests profiled at random (their profile is
+        # kept when they are slow), where profiles are written and how many are kept
+        self.profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+        # (defaults to the profiles directory of the per-user cache directory, ex: ~/.cache/gztarchiver/profiles)
+        self.profile_dir: str = os.getenv("PROFILE_DIR", "")
+        self.profile_max_files: int = int(os.getenv("PROFILE_MAX_FILES", 50))
+
+        # Cache-Control max-age of dashboard and search responses
+        self.http_cache_max_age: int = int(os.getenv("HTTP_CACHE_MAX_AGE", 60))
+
+        # Response compression
+        self.compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        self.compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+        self.compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
 
         # Request timeout
         self.request_timeout: int = int(os.getenv("REQUEST_TIMEOUT", 10))
+
+        # Maximum number of concurrent requests made to the Query API per operation
+        self.upstream_concurrency: int = int(os.getenv("UPSTREAM_CONCURRENCY", 8))
+
+        # Cache TTL for Query API entity lookups (search, relations)
+        self.entity_cache_ttl: int = int(os.getenv("ENTITY_CACHE_TTL", 3600))
+
+        # Per-namespace cache TTLs, ex: CACHE_NAMESPACE_TTLS="entity_search=3600,entity_relations=600"
+        self.cache_namespace_ttls: Dict[str, int] = {
+            "entity_search": self.entity_cache_ttl,
+            "entity_relations": self.entity_cache_ttl,
+            # Keyed by dataset version, so it only has to outlive a refresh
+            "dashboard_data": 24 * 3600,
+        }
+        for item in os.getenv("CACHE_NAMESPACE_TTLS", "").split(","):
+            namespace, separator, ttl = item.partition("=")
+            if separator and ttl.strip().isdigit():
+                self.cache_namespace_ttls[namespace.strip()] = int(ttl)
+
+        # Relationship warmup after each metadata refresh
+        self.warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.warmup_newest: int = int(os.getenv("WARMUP_NEWEST", 50))
+        self.warmup_top: int = int(os.getenv("WARMUP_TOP", 50))
+        self.warmup_concurrency: int = int(os.getenv("WARMUP_CONCURRENCY", 2))
+        self.warmup_rate: float = float(os.getenv("WARMUP_RATE", 5))
+        # Distinct document numbers whose lookups are counted to pick the most requested ones
+        self.warmup_tracked_documents: int = int(os.getenv("WARMUP_TRACKED_DOCUMENTS", 1000))
+
+        # Relationship graph traversal limits
+        self.graph_max_depth: int = int(os.getenv("GRAPH_MAX_DEPTH", 3))
+        self.graph_max_nodes: int = int(os.getenv("GRAPH_MAX_NODES", 100))
     
     @property
     def cors_origins(self) -> List[str]:
@@ -1,5 +1,7 @@
 from .query_parser import QueryParser
 from .query_builder import QueryBuilder
+from .errors import QueryError
+from .query_ast import parse_query
+from .text_index import SuggestIndex, TermIndex, tokenize
 
-__all__ = ["QueryParser", "QueryBuilder"]
-
+__all__ = ["QueryParser", "QueryBuilder", "QueryError", "parse_query", "SuggestIndex", "TermIndex", "tokenize"]
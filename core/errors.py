@@ -0,0 +1,2 @@
+class QueryError(ValueError):
+    """Raised when a search query is invalid or too expensive to run"""
@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Tuple
+from core.errors import QueryError
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Pattern kinds, from cheapest to most expensive to match
+EXACT = "exact"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+LITERAL = "literal"
+REGEX = "regex"
+
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+# Repeat opcodes of the regex parser
+REPEATS = frozenset(
+    op for op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+    if op is not None
+)
+
+
+def _unescape_literal(body: str) -> Optional[str]:
+    """Return the text a pattern body matches literally, or None if it uses regex syntax."""
+    chars = []
+    escaped = False
+    for char in body:
+        if escaped:
+            if char.isalnum():
+                # Character classes and escapes like \d or \b
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in REGEX_METACHARACTERS:
+            return None
+        else:
+            chars.append(char)
+    return None if escaped else "".join(chars)
+
+
+def classify_pattern(pattern: str) -> Tuple[str, str]:
+    """
+    Classify a regex pattern by the cheapest way it can be matched.
+    
+    Args:
+        pattern: Regex pattern
+        
+    Returns:
+        Tuple of (kind, text): the literal text for EXACT, PREFIX, SUFFIX and
+        LITERAL patterns, the pattern itself for REGEX
+    """
+    body = pattern
+    anchored_start = body.startswith("^")
+    if anchored_start:
+        body = body[1:]
+    anchored_end = body.endswith("$") and not body.endswith("\\$")
+    if anchored_end:
+        body = body[:-1]
+
+    literal = _unescape_literal(body)
+    if literal is None:
+        return REGEX, pattern
+    if anchored_start and anchored_end:
+        return EXACT, literal
+    if anchored_start:
+        return PREFIX, literal
+    if anchored_end:
+        return SUFFIX, literal
+    return LITERAL, literal
+
+
+def _children(argument: Any) -> Iterator[Any]:
+    """Yield the subpatterns nested in the argument of a parsed regex item."""
+    if isinstance(argument, sre_parse.SubPattern):
+        yield argument
+    elif isinstance(argument, (tuple, list)):
+        for item in argument:
+            yield from _children(item)
+
+
+def _is_backreference(op: Any) -> bool:
+    """Check whether an opcode refers back to a group, which can't be matched in linear time."""
+    return str(op).startswith("GROUPREF")
+
+
+def _is_variable(subpattern: Any) -> bool:
+    """Check whether a subpattern can match in several ways: alternation, optional or unbounded items."""
+    for op, argument in subpattern:
+        if op is sre_parse.BRANCH or _is_backreference(op):
+            return True
+        if op in REPEATS and argument[0] != argument[1]:
+            return True
+        if any(_is_variable(child) for child in _children(argument)):
+            return True
+    return False
+
+
+def _backtracks(subpattern: Any) -> bool:
+    """
+    Check whether a parsed pattern is prone to catastrophic backtracking.
+    
+    A repeated subpattern that can itself match in several ways, ex: (a|a)*,
+    (a+)+, (.*a){12} or (a?){25}, makes the number of ways to split a subject
+    grow exponentially with its length. Backreferences are rejected as well.
+    """
+    for op, argument in subpattern:
+        if _is_backreference(op):
+            return True
+        if op in REPEATS:
+            _, high, body = argument
+            if high > 1 and _is_variable(body):
+                return True
+        if any(_backtracks(child) for child in _children(argument)):
+            return True
+    return False
+
+
+class CompiledPattern:
+    """A regex pattern compiled to string operations when it has no regex syntax"""
+
+    __slots__ = ("kind", "text", "lowercase", "regex")
+
+    def __init__(self, kind: str, text: str, ignore_case: bool):
+        """
+        Initialize a compiled pattern.
+        
+        Args:
+            kind: Pattern kind, from classify_pattern
+            text: Literal text, or the regex pattern for REGEX
+            ignore_case: Match case insensitively
+        """
+        self.kind = kind
+        # Literal patterns run against lowercased values when matching case insensitively
+        self.lowercase = ignore_case and kind != REGEX
+        self.text = text.lower() if self.lowercase else text
+        self.regex = re.compile(text, re.IGNORECASE if ignore_case else 0) if kind == REGEX else None
+
+    def test(self, value: str) -> bool:
+        """
+        Test a value against the pattern.
+        
+        Args:
+            value: Value to test, already lowercased when self.lowercase is set
+            
+        Returns:
+            True if the pattern is found in the value
+        """
+        if self.kind == LITERAL:
+            return self.text in value
+        if self.kind == PREFIX:
+            return value.startswith(self.text)
+        if self.kind == EXACT:
+            return value == self.text
+        if self.kind == SUFFIX:
+            return value.endswith(self.text)
+        return self.regex.search(value) is not None
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, ignore_case: bool = False, max_length: int = 256) -> CompiledPattern:
+    """
+    Compile a user supplied regex pattern, guarding against expensive ones.
+    
+    Args:
+        pattern: Regex pattern
+        ignore_case: Match case insensitively
+        max_length: Maximum length of a pattern that needs the regex engine, 0 for unbounded
+        
+    Returns:
+        The compiled pattern
+        
+    Raises:
+        QueryError: If the pattern is invalid, too long or prone to catastrophic backtracking
+    """
+    kind, text = classify_pattern(pattern)
+    try:
+        if kind == REGEX:
+            if max_length and len(pattern) > max_length:
+                raise QueryError(f"Pattern is longer than {max_length} characters")
+            if _backtracks(sre_parse.parse(pattern)):
+                raise QueryError(f"Pattern is too complex: {pattern}")
+        return CompiledPattern(kind, text, ignore_case)
+    except re.error as e:
+        raise QueryError(f"Invalid pattern {pattern!r}: {e}") from e
+
+
+def escape_pattern(text: str) -> str:
+    """
+    Escape the regex metacharacters of a literal, leaving other characters as they are.
+    
+    Args:
+        text: Literal text
+        
+    Returns:
+        Regex pattern matching the text, classified as a literal by classify_pattern
+    """
+    return "".join("\\" + char if char in REGEX_METACHARACTERS else char for char in text)
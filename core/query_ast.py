@@ -0,0 +1,339 @@
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from core.patterns import REGEX_METACHARACTERS, escape_pattern
+from core.query_builder import QueryBuilder
+
+# Query syntax field names and the document fields they filter
+FIELDS = {
+    "type": "document_type",
+    "id": "document_id",
+    "source": "source",
+    "status": "availability",
+    "date": "document_date",
+}
+
+# One token: an optionally negated field filter, quoted phrase or word
+TOKEN_PATTERN = re.compile(r'''
+    (?P<negate>-(?=\S))?
+    (?:
+        (?P<field>\w+):(?:"(?P<field_quoted>[^"]*)"|(?P<field_value>\S+))
+      | "(?P<phrase>[^"]*)"
+      | (?P<word>\S+)
+    )
+''', re.VERBOSE)
+
+
+@dataclass(frozen=True)
+class Term:
+    """A free text word, matched as a case-insensitive pattern"""
+    text: str
+
+
+@dataclass(frozen=True)
+class Phrase:
+    """A quoted phrase, matched literally"""
+    text: str
+
+
+@dataclass(frozen=True)
+class FieldEquals:
+    """A field equal to a value, ex: type:"LEGAL_REGULATORY" """
+    field: str
+    value: str
+
+
+@dataclass(frozen=True)
+class FieldPrefix:
+    """A field starting with a value, ex: id:1895*"""
+    field: str
+    value: str
+
+
+@dataclass(frozen=True)
+class FieldPattern:
+    """A field containing a case-insensitive pattern, ex: type:legal"""
+    field: str
+    pattern: str
+
+
+@dataclass(frozen=True)
+class Range:
+    """A field within an inclusive range of prefixes, ex: date:2015..2017"""
+    field: str
+    low: Optional[str]
+    high: Optional[str]
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a clause, ex: -type:legal or NOT colombo"""
+    child: "Node"
+
+
+@dataclass(frozen=True)
+class Or:
+    """Any of several clauses, ex: colombo OR kandy"""
+    children: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class And:
+    """All of several clauses, the implicit combination of a query's clauses"""
+    children: Tuple["Node", ...]
+
+
+Node = Union[Term, Phrase, FieldEquals, FieldPrefix, FieldPattern, Range, Not, Or, And]
+
+
+def date_node(value: str, today: date) -> Optional["Node"]:
+    """
+    Parse the value of a date: filter.
+
+    Args:
+        value: Date filter value (e.g., "2015", "2015-01", "2015-01-31", "this-year", "last-year", "last-x-days")
+        today: Date relative values are resolved against
+
+    Returns:
+        The date clause, or None if the value isn't a date
+    """
+    lowered = value.lower()
+    if lowered == "this-year":
+        return FieldPrefix("document_date", str(today.year))
+    if lowered == "last-year":
+        return FieldPrefix("document_date", str(today.year - 1))
+    if lowered.startswith("last-") and lowered.endswith("-days"):
+        try:
+            days = int(lowered.split("-")[1])
+        except (ValueError, IndexError):
+            return None
+        return Range("document_date", (today - timedelta(days=days)).isoformat(), today.isoformat())
+    # Specific year or year-month: every document within it
+    if re.match(r"^\d{4}(-\d{2})?$", value):
+        return FieldPrefix("document_date", value)
+    # Full date: documents from that exact date
+    if re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+        return FieldEquals("document_date", value)
+    return None
+
+
+def field_node(key: str, value: str, quoted: bool, today: date) -> Optional["Node"]:
+    """
+    Parse a key:value filter.
+
+    Args:
+        key: Filter name, as typed
+        value: Filter value, without quotes
+        quoted: The value was quoted, requesting an exact match
+        today: Date relative values are resolved against
+
+    Returns:
+        The filter clause, or None for unknown filters and values
+    """
+    key = key.lower()
+    if key == "available":
+        if value.lower() in ["yes", "true", "available"]:
+            return FieldEquals("availability", "Available")
+        if value.lower() in ["no", "false", "unavailable"]:
+            return Not(FieldEquals("availability", "Available"))
+        return None
+
+    field = FIELDS.get(key)
+    if field is None:
+        return None
+    if quoted:
+        return FieldEquals(field, value)
+
+    low, separator, high = value.partition("..")
+    if separator and (low or high) and not set(low + high) & REGEX_METACHARACTERS:
+        return Range(field, low or None, high or None)
+    prefix = value[:-1]
+    if value.endswith("*") and prefix and not set(prefix) & REGEX_METACHARACTERS:
+        return FieldPrefix(field, prefix)
+    if field == "document_date":
+        return date_node(value, today)
+    return FieldPattern(field, value)
+
+
+def tokenize_query(query: str, today: date) -> List[Tuple[Optional["Node"], Optional[str]]]:
+    """
+    Split a query into clauses.
+
+    Args:
+        query: Search query string
+        today: Date relative values are resolved against
+
+    Returns:
+        List of (clause, keyword) pairs: keyword is "OR" or "NOT" for operators,
+        clause is None for operators and unknown filters
+    """
+    tokens: List[Tuple[Optional[Node], Optional[str]]] = []
+    for match in TOKEN_PATTERN.finditer(query):
+        word = match.group("word")
+        if word in ("OR", "NOT") and not match.group("negate"):
+            tokens.append((None, word))
+            continue
+
+        if match.group("field"):
+            quoted = match.group("field_quoted") is not None
+            value = match.group("field_quoted") if quoted else match.group("field_value")
+            node = field_node(match.group("field"), value, quoted, today)
+        elif match.group("phrase") is not None:
+            node = Phrase(match.group("phrase")) if match.group("phrase").strip() else None
+        else:
+            node = Term(word)
+
+        if node is not None and match.group("negate"):
+            node = Not(node)
+        tokens.append((node, None))
+    return tokens
+
+
+@lru_cache(maxsize=1024)
+def _parse(query: str, today: date) -> "Node":
+    """Parse a query, cached by query and by the day relative dates resolve to."""
+    clauses: List[Node] = []
+    pending_or = False
+    pending_not = False
+    for node, keyword in tokenize_query(query, today):
+        if keyword == "OR" and clauses and not pending_or and not pending_not:
+            pending_or = True
+            continue
+        if keyword == "NOT":
+            pending_not = not pending_not
+            continue
+        if keyword is not None:
+            # OR without a left-hand clause is a plain word
+            node = Term(keyword)
+        if node is None:
+            continue
+
+        if pending_not:
+            node = Not(node)
+            pending_not = False
+        if pending_or:
+            previous = clauses.pop()
+            node = Or((previous.children if isinstance(previous, Or) else (previous,)) + (node,))
+            pending_or = False
+        clauses.append(node)
+
+    # Dangling operators at the end of the query are plain words
+    if pending_or:
+        clauses.append(Term("OR"))
+    if pending_not:
+        clauses.append(Term("NOT"))
+    return And(tuple(clauses))
+
+
+def parse_query(query: str) -> "Node":
+    """
+    Parse a search query into a typed syntax tree.
+
+    Supported syntax: words, "quoted phrases", field filters (type:legal),
+    exact field values (type:"LEGAL_REGULATORY"), field prefixes (id:1895*),
+    ranges (date:2015..2017), negation (-word, NOT word) and OR.
+
+    Args:
+        query: Search query string
+
+    Returns:
+        And node of the query's clauses
+    """
+    return _parse(" ".join((query or "").split()), date.today())
+
+
+def has_relative_dates(query: str) -> bool:
+    """
+    Check whether a query has date filters resolved against today (ex: date:this-year).
+
+    Args:
+        query: Search query string
+
+    Returns:
+        True if the query's results can change from one day to the next
+    """
+    for match in TOKEN_PATTERN.finditer(query or ""):
+        value = (match.group("field_value") or "").lower()
+        if not value or FIELDS.get(match.group("field").lower()) != "document_date":
+            continue
+        if value in ("this-year", "last-year") or (value.startswith("last-") and value.endswith("-days")):
+            return True
+    return False
+
+
+def successor(prefix: str) -> str:
+    """Return the smallest string sorting after every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def lower(node: "Node") -> Dict[str, Any]:
+    """
+    Lower a syntax tree into a MongoDB-style query.
+
+    Exact values become equality conditions and prefixes become anchored
+    literal patterns, which the repository matches without the regex engine.
+
+    Args:
+        node: Syntax tree
+
+    Returns:
+        MetadataStore query dictionary
+    """
+    if isinstance(node, Term):
+        return QueryBuilder.build_text_search(node.text)
+    if isinstance(node, Phrase):
+        return QueryBuilder.build_text_search(escape_pattern(node.text))
+    if isinstance(node, FieldEquals):
+        return {node.field: node.value}
+    if isinstance(node, FieldPrefix):
+        return {node.field: {"$regex": "^" + escape_pattern(node.value), "$options": "i"}}
+    if isinstance(node, FieldPattern):
+        return {node.field: {"$regex": node.pattern, "$options": "i"}}
+    if isinstance(node, Range):
+        condition = {}
+        if node.low:
+            condition["$gte"] = node.low
+        if node.high:
+            condition["$lt"] = successor(node.high)
+        return {node.field: condition}
+    if isinstance(node, Not):
+        if isinstance(node.child, FieldEquals):
+            return {node.child.field: {"$ne": node.child.value}}
+        return {"$nor": [lower(node.child)]}
+    if isinstance(node, Or):
+        return {"$or": [lower(child) for child in node.children]}
+    if not node.children:
+        return {}
+    if len(node.children) == 1:
+        return lower(node.children[0])
+    return {"$and": [lower(child) for child in node.children]}
+
+
+def to_filters(node: "Node") -> Tuple[Dict[str, Any], str]:
+    """
+    Convert a syntax tree to the (metadatastore_filters, free_text) form.
+
+    Top-level words are joined into the free text, matched as one contiguous
+    pattern. Field clauses become per-field filters, a later filter on a field
+    replacing an earlier one; other clauses are listed under "$and".
+
+    Args:
+        node: Syntax tree from parse_query
+
+    Returns:
+        Tuple of (metadatastore_filters, free_text)
+    """
+    words = []
+    filters: Dict[str, Any] = {}
+    for child in node.children if isinstance(node, And) else (node,):
+        if isinstance(child, Term):
+            words.append(child.text)
+        elif isinstance(child, (FieldEquals, FieldPrefix, FieldPattern, Range)) or (
+            isinstance(child, Not) and isinstance(child.child, FieldEquals)
+        ):
+            filters.update(lower(child))
+        else:
+            filters.setdefault("$and", []).append(lower(child))
+    return filters, " ".join(words)
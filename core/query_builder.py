@@ -1,17 +1,22 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Iterable
 
 
 class QueryBuilder:
     """Builder for MetadataStore queries combining filters and free text search"""
     
     @staticmethod
-    def build_metadatastore_query(metadatastore_filters: Dict[str, Any], free_text: str) -> Dict[str, Any]:
+    def build_metadatastore_query(
+        metadatastore_filters: Dict[str, Any],
+        free_text: str,
+        fuzzy_document_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """
         Build the final MetadataStore query combining filters and free text search.
         
         Args:
             metadatastore_filters: Dictionary of MetadataStore filter conditions
             free_text: Free text search string
+            fuzzy_document_ids: Documents matching the free text with typos, also accepted
             
         Returns:
             MetadataStore query dictionary
@@ -20,26 +25,15 @@ class QueryBuilder:
         
         # Add structured filters
         for field, filter_condition in metadatastore_filters.items():
-            query_parts.append({field: filter_condition})
+            if field == "$and":
+                # Conditions without a field of their own (phrases, OR, negations)
+                query_parts.extend(filter_condition)
+            else:
+                query_parts.append({field: filter_condition})
         
         # Add free text search if present
         if free_text:
-            text_search = {
-                "$or": [
-                    {"document_type": {"$regex": free_text, "$options": "i"}},
-                    {"description": {"$regex": free_text, "$options": "i"}},
-                    {"document_id": {"$regex": free_text, "$options": "i"}}
-
-                ]
-            }
-            
-            # If free text looks like a date pattern, add partial date matching
-            if free_text.replace("-", "").isdigit() and len(free_text) >= 4:
-                text_search["$or"].append({
-                    "document_date": {"$regex": f"^{free_text}", "$options": "i"}
-                })
-            
-            query_parts.append(text_search)
+            query_parts.append(QueryBuilder.build_text_search(free_text, fuzzy_document_ids))
         
         # Combine all parts with AND logic
         if len(query_parts) == 0:
@@ -48,4 +42,41 @@ class QueryBuilder:
             return query_parts[0]
         else:
             return {"$and": query_parts}
+    
+    @staticmethod
+    def build_text_search(
+        free_text: str,
+        fuzzy_document_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the query matching free text against the searchable fields.
+        
+        Args:
+            free_text: Free text regex pattern
+            fuzzy_document_ids: Documents matching the free text with typos, also accepted
+            
+        Returns:
+            MetadataStore query dictionary
+        """
+        text_search = {
+            "$or": [
+                {"document_type": {"$regex": free_text, "$options": "i"}},
+                {"description": {"$regex": free_text, "$options": "i"}},
+                {"document_id": {"$regex": free_text, "$options": "i"}}
 
+            ]
+        }
+        
+        # If free text looks like a date pattern, add partial date matching
+        if free_text.replace("-", "").isdigit() and len(free_text) >= 4:
+            text_search["$or"].append({
+                "document_date": {"$regex": f"^{free_text}", "$options": "i"}
+            })
+        
+        # Documents found through the typo-tolerant term index
+        if fuzzy_document_ids is not None:
+            text_search["$or"].append({
+                "document_id": {"$in": frozenset(fuzzy_document_ids)}
+            })
+        
+        return text_search
@@ -0,0 +1,302 @@
+import re
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Words of free text, without punctuation or underscores
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Prefixes up to this length have their top completions precomputed
+PRECOMPUTED_PREFIX_LENGTH = 3
+
+# Largest number of suggestions a request may ask for
+MAX_SUGGESTIONS = 50
+
+
+def tokenize(text: str, min_length: int = 1) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    
+    Args:
+        text: Text to tokenize
+        min_length: Minimum token length to keep
+        
+    Returns:
+        List of tokens, in order
+    """
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if len(token) >= min_length]
+
+
+def count_terms(docs: Iterable[Dict[str, Any]], field: str = "description", min_length: int = 3) -> Counter:
+    """
+    Count the documents each term of a text field appears in.
+    
+    Args:
+        docs: Documents to scan
+        field: Text field to tokenize
+        min_length: Minimum term length
+        
+    Returns:
+        Counter of term -> document frequency
+    """
+    frequencies: Counter = Counter()
+    for doc in docs:
+        frequencies.update({token for token in tokenize(doc.get(field), min_length) if not token.isdigit()})
+    return frequencies
+
+
+class SortedPrefixIndex:
+    """Sorted array of (key, value, weight) supporting top-k prefix completion"""
+    
+    def __init__(self, entries: Iterable[Tuple[str, str, int]], top_k: int = MAX_SUGGESTIONS, max_scan: int = 2000):
+        """
+        Initialize the prefix index.
+        
+        Args:
+            entries: Tuples of (lowercase key, display value, weight)
+            top_k: Number of completions precomputed for short prefixes, the most
+                that can be returned for them
+            max_scan: Maximum number of entries scanned for longer prefixes
+        """
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.values = [value for _, value, _ in entries]
+        self.weights = [weight for _, _, weight in entries]
+        self.top_k = top_k
+        self.max_scan = max_scan
+        
+        # Short prefixes match huge ranges, so their best completions are kept ready
+        candidates: Dict[str, List[Tuple[int, int]]] = {}
+        for position, key in enumerate(self.keys):
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                candidates.setdefault(key[:length], []).append((self.weights[position], -position))
+        self.top_by_prefix = {
+            prefix: [-position for _, position in heapq.nlargest(top_k, ranked)]
+            for prefix, ranked in candidates.items()
+        }
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def complete(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """
+        Get the highest weighted entries whose key starts with a prefix.
+        
+        Args:
+            prefix: Lowercase prefix
+            limit: Maximum number of completions
+            
+        Returns:
+            List of (value, weight), best first. Short prefixes match too many keys
+            to rank them all, so they return at most top_k completions.
+        """
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            positions = self.top_by_prefix.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", start, min(len(self.keys), start + self.max_scan))
+            positions = heapq.nlargest(limit, range(start, end), key=lambda position: self.weights[position])
+        return [(self.values[position], self.weights[position]) for position in positions]
+
+
+class SuggestIndex:
+    """Typeahead index over document numbers, document types and frequent description terms"""
+    
+    def __init__(self, docs: List[Dict[str, Any]], min_term_frequency: int = 2):
+        """
+        Build the suggestion index.
+        
+        Args:
+            docs: Documents to index
+            min_term_frequency: Minimum number of documents a term must appear in
+        """
+        type_counts = Counter(doc.get("document_type") for doc in docs if doc.get("document_type"))
+        term_counts = count_terms(docs)
+        
+        # Newer gazettes rank first among document numbers sharing a prefix
+        self.document_ids = SortedPrefixIndex(
+            (str(doc.get("document_id")).lower(), doc.get("document_id"), position)
+            for position, doc in enumerate(
+                sorted(docs, key=lambda doc: doc.get("document_date") or "")
+            )
+            if doc.get("document_id")
+        )
+        self.document_types = SortedPrefixIndex(
+            (document_type.lower(), document_type, count) for document_type, count in type_counts.items()
+        )
+        self.terms = SortedPrefixIndex(
+            (term, term, count) for term, count in term_counts.items() if count >= min_term_frequency
+        )
+    
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get completions for a typed prefix.
+        
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+            
+        Returns:
+            List of suggestions with value, kind and weight: document types first,
+            then document numbers, then description terms
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit < 1:
+            return []
+        
+        suggestions = []
+        for kind, index in (("document_type", self.document_types),
+                            ("document_id", self.document_ids),
+                            ("term", self.terms)):
+            remaining = limit - len(suggestions)
+            if remaining <= 0:
+                break
+            suggestions.extend(
+                {"value": value, "kind": kind, "weight": weight}
+                for value, weight in index.complete(prefix, remaining)
+            )
+        return suggestions
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> int:
+    """
+    Compute the optimal string alignment distance (Levenshtein with transpositions), bounded.
+    
+    Args:
+        first: First string
+        second: Second string
+        max_distance: Distance above which computation stops early
+        
+    Returns:
+        The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    
+    previous_row = None
+    row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before_previous_row, previous_row = previous_row, row
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if (i > 1 and j > 1 and first[i - 1] == second[j - 2]
+                    and first[i - 2] == second[j - 1]):
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+    return row[-1]
+
+
+def deletes(term: str, distance: int) -> set:
+    """
+    Get every string obtained by deleting up to distance characters from a term.
+    
+    Args:
+        term: Term to derive deletions from
+        distance: Maximum number of deleted characters
+        
+    Returns:
+        Set of deletions, including the term itself
+    """
+    results = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        results |= frontier
+    return results
+
+
+def max_edit_distance(term: str) -> int:
+    """Get the typo tolerance of a term: none for short terms, more for long ones."""
+    if len(term) <= 4:
+        return 0
+    if len(term) <= 8:
+        return 1
+    return 2
+
+
+class TermIndex:
+    """Inverted index of description terms with a SymSpell-style deletion index for typo tolerance"""
+    
+    def __init__(self, docs: List[Dict[str, Any]], field: str = "description", min_length: int = 3):
+        """
+        Build the term index.
+        
+        Args:
+            docs: Documents to index
+            field: Text field to index
+            min_length: Minimum indexed term length
+        """
+        self.min_length = min_length
+        self.document_ids = [doc.get("document_id") for doc in docs]
+        
+        # Term -> positions of the documents containing it, as 4-byte integers
+        postings: Dict[str, List[int]] = {}
+        for position, doc in enumerate(docs):
+            for token in set(tokenize(doc.get(field), min_length)):
+                postings.setdefault(token, []).append(position)
+        self.postings = {term: array("I", positions) for term, positions in postings.items()}
+        
+        # Deletion variant -> terms it was derived from
+        self.deletions: Dict[str, List[str]] = {}
+        for term in self.postings:
+            for variant in deletes(term, max_edit_distance(term)):
+                self.deletions.setdefault(variant, []).append(term)
+    
+    def expand(self, word: str, max_expansions: int = 20) -> List[str]:
+        """
+        Get the indexed terms within the typo tolerance of a word.
+        
+        Args:
+            word: Lowercase word
+            max_expansions: Maximum number of terms returned
+            
+        Returns:
+            Matching terms, closest and most frequent first
+        """
+        distance = max_edit_distance(word)
+        candidates = set()
+        for variant in deletes(word, distance):
+            candidates.update(self.deletions.get(variant, ()))
+        
+        ranked = []
+        for term in candidates:
+            term_distance = edit_distance(word, term, max(distance, max_edit_distance(term)))
+            if term_distance <= max(distance, max_edit_distance(term)):
+                ranked.append((term_distance, -len(self.postings[term]), term))
+        return [term for _, _, term in sorted(ranked)[:max_expansions]]
+    
+    def match_text(self, text: str, max_terms: int = 8, max_expansions: int = 20) -> Tuple[set, Dict[str, List[str]]]:
+        """
+        Find documents containing every word of a text, allowing typos in each word.
+        
+        Words shorter than the indexed terms (ex: "of", "D/S") aren't required, and
+        numbers are matched exactly: a number with a typo is another number.
+        
+        Args:
+            text: Free text
+            max_terms: Maximum number of words considered
+            max_expansions: Maximum number of indexed terms per word
+            
+        Returns:
+            Tuple of (matching document IDs, word -> expanded terms)
+        """
+        positions = None
+        expansions = {}
+        for word in list(dict.fromkeys(tokenize(text, self.min_length)))[:max_terms]:
+            if word.isdigit():
+                terms = [word] if word in self.postings else []
+            else:
+                terms = self.expand(word, max_expansions)
+            expansions[word] = terms
+            word_positions = set()
+            for term in terms:
+                word_positions.update(self.postings[term])
+            positions = word_positions if positions is None else positions & word_positions
+            if not positions:
+                break
+        return {self.document_ids[position] for position in positions or ()}, expansions
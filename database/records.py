@@ -0,0 +1,160 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+from database.models import Docs
+
+# Fields with few distinct values, stored once and shared between records
+CATEGORICAL_FIELDS = ("document_date", "document_type", "categorisation", "availability")
+
+# URL and path fields whose values share a few prefixes, stored as (shared prefix, own suffix)
+PREFIX_FIELDS = ("source", "file_path")
+
+# Free text fields stored with a lowercased copy, for case insensitive matching
+LOWERCASE_FIELDS = ("document_id", "description")
+
+# Whether every Docs field is a plain string, so documents can be checked without building models
+STRING_MODEL = all(field.annotation is str for field in Docs.model_fields.values())
+
+
+def validate_fields(item: Any) -> Dict[str, Any]:
+    """
+    Validate a raw document against the Docs model fields.
+
+    Args:
+        item: Raw document, as decoded from JSON
+
+    Returns:
+        Dictionary of the Docs fields, defaults filled in and unknown keys dropped
+
+    Raises:
+        ValueError: If the document isn't an object, misses a required field or has a non-string value
+    """
+    if not STRING_MODEL:
+        return Docs(**item).model_dump()
+
+    if not isinstance(item, dict):
+        raise ValueError("Document must be an object")
+
+    fields = {}
+    for name, field in Docs.model_fields.items():
+        if name not in item:
+            if field.is_required():
+                raise ValueError(f"Missing field: {name}")
+            fields[name] = field.default
+            continue
+        value = item[name]
+        if not isinstance(value, str):
+            raise ValueError(f"Field {name} must be a string, got {type(value).__name__}")
+        fields[name] = value
+    return fields
+
+
+class DocumentRecord(Mapping):
+    """Read-only gazette document storing its fields in slots instead of a dict"""
+
+    __slots__ = (
+        "document_id",
+        "description",
+        "document_date",
+        "document_type",
+        "categorisation",
+        "source_prefix",
+        "source_suffix",
+        "availability",
+        "file_path_prefix",
+        "file_path_suffix",
+        "document_id_lower",
+        "description_lower",
+    )
+
+    FIELDS = tuple(Docs.model_fields)
+    FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, fields: Dict[str, str], intern: Optional[Callable[[str], str]] = None):
+        """
+        Initialize a record.
+
+        Args:
+            fields: Validated document fields
+            intern: Function returning the shared copy of a string, for the
+                categorical fields and the source and file path prefixes
+        """
+        intern = intern or (lambda value: value)
+        self.document_id = fields["document_id"]
+        self.description = fields["description"]
+        for name in CATEGORICAL_FIELDS:
+            setattr(self, name, intern(fields[name]))
+
+        # ex: https://example.com/ + 1895-18_E.pdf
+        for name in PREFIX_FIELDS:
+            prefix, separator, suffix = fields[name].rpartition("/")
+            setattr(self, f"{name}_prefix", intern(prefix + separator))
+            setattr(self, f"{name}_suffix", suffix)
+
+        # Values already in lowercase (ex: most gazette numbers) aren't copied
+        for name in LOWERCASE_FIELDS:
+            value = fields[name]
+            lowered = value.lower()
+            setattr(self, f"{name}_lower", value if lowered == value else lowered)
+
+    @property
+    def source(self) -> str:
+        """Get the source URL"""
+        return self.source_prefix + self.source_suffix
+
+    @property
+    def file_path(self) -> str:
+        """Get the archive file path"""
+        return self.file_path_prefix + self.file_path_suffix
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field value, or default for unknown fields."""
+        return getattr(self, key) if key in self.FIELD_SET else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"DocumentRecord({dict(self)!r})"
+
+
+class RecordEncoder:
+    """Builds records sharing one string object per distinct categorical value and path prefix"""
+
+    def __init__(self):
+        """Initialize an encoder with an empty value table."""
+        self.values: Dict[str, str] = {}
+
+    def intern(self, value: str) -> str:
+        """
+        Get the shared copy of a string.
+
+        Args:
+            value: String to share
+
+        Returns:
+            The first string equal to value seen by this encoder
+        """
+        return self.values.setdefault(value, value)
+
+    def encode(self, item: Any) -> DocumentRecord:
+        """
+        Validate a raw document and encode it as a record.
+
+        Args:
+            item: Raw document, as decoded from JSON
+
+        Returns:
+            The document record
+
+        Raises:
+            ValueError: If the document doesn't match the Docs model
+        """
+        return DocumentRecord(validate_fields(item), self.intern)
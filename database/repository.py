@@ -1,8 +1,26 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Iterable, Callable, Tuple
 from services.metadata_store import MetadataStore
-import re
+from database.records import CATEGORICAL_FIELDS, LOWERCASE_FIELDS
+from core.errors import QueryError
+from core.patterns import EXACT, PREFIX, REGEX, compile_pattern, classify_pattern
+from config.settings import settings
+from utils.metrics import count, stage
+import time
 import logging
-import pandas as pd
+
+# Number of documents matched between two checks of the query time budget
+BUDGET_CHECK_INTERVAL = 256
+
+# Sorts after any character a document_date can contain
+MAX_DATE_SUFFIX = "\uffff"
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Relative cost of matching a document against a pattern needing the regex engine
+REGEX_COST = 8
+
+# How search totals are counted: a full scan, an estimate from a sample, or stopping at a cap
+COUNT_MODES = ("exact", "estimated", "capped")
 
 class DocumentRepository:
     """Repository for document operations using global metadata store"""
@@ -13,29 +31,54 @@ class DocumentRepository:
         """
         self.store = MetadataStore()
     
+    @property
+    def dataset_version(self) -> str:
+        """Get the version of the documents served by the repository"""
+        return self.store.version
+    
+    @property
+    def last_modified(self) -> float:
+        """Get the Unix timestamp of the last metadata refresh"""
+        return self.store.refreshed_at
+    
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """
-        Get statistics for documents.
+        Get statistics for documents, precomputed when the metadata store is loaded.
             
         Returns:
-            Dictionary with total_docs, available_docs, and document_types
+            Dictionary with total_docs, available_docs, document_types and the
+            per-type, per-year, per-month and availability breakdowns
         """
         try:
-            document_data_frame = pd.DataFrame(self.store.documents)
-            
-            total_docs = len(document_data_frame)
-            available_docs = len(document_data_frame[document_data_frame["availability"] == "Available"])
-            document_types = (document_data_frame["document_type"].dropna().unique().tolist())
-            
-            return {
-                "total_docs": total_docs,
-                "available_docs": available_docs,
-                "document_types": document_types
-            }
+            return self.store.aggregates
         except Exception as e:
             logging.error(f"Error getting stats: {e}")
             return {"total_docs": 0, "available_docs": 0, "document_types": []}
     
+    def get_documents(
+        self,
+        document_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get documents by exact document_id using the store's hash index.
+        
+        Args:
+            document_ids: Document numbers to fetch (ex: ["2153-12", "1895-18"])
+            projection: Fields to include (simple inclusion only for now)
+            
+        Returns:
+            One entry per requested ID, in order: the document or None if it doesn't exist
+        """
+        fields = [k for k, v in projection.items() if v == 1] if projection else None
+        documents = []
+        for document_id in document_ids:
+            doc = self.store.get_document(document_id)
+            if doc is not None:
+                doc = {field: doc.get(field) for field in fields} if fields else dict(doc)
+            documents.append(doc)
+        return documents
+    
     def count_documents(self, query: Dict[str, Any]) -> int:
         """
         Count documents matching a query.
@@ -47,12 +90,11 @@ class DocumentRepository:
             Number of matching documents
         """
         try:
-            document_data_frame = pd.DataFrame(self.store.documents)
-            count = document_data_frame.apply(
-                lambda row: self._match_document(row.to_dict(), query),
-                axis=1
-            ).sum()
-            return int(count)
+            predicate = self._compile_query(query)
+            with stage("count"):
+                return sum(1 for _ in self._scan(predicate, self._candidates(query), settings.query_time_budget))
+        except QueryError:
+            raise
         except Exception as e:
             logging.error(f"Error counting documents: {e}")
             return 0
@@ -69,93 +111,489 @@ class DocumentRepository:
         """
         Find documents matching a query.
         
+        Only the sort key is read while matching and sorting; the projected fields
+        are read for the returned page alone.
+        
         Args:
             query: Query dictionary
             projection: Fields to include (simple inclusion only for now)
             skip: Number to skip
             limit: Max to return
+            sort_key: Field to sort by
+            reverse: Sort in descending order
             
         Returns:
             List of documents
+            
+        Raises:
+            QueryError: If a pattern is rejected or the query runs out of its time budget
         """
         try:
-            document_data_frame = pd.DataFrame(self.store.documents)
-            
-            filtered_docs = document_data_frame[document_data_frame.apply(
-                lambda row: self._match_document(row.to_dict(), query),
-                axis=1
-            )]
+            predicate = self._compile_query(query)
+            candidates = self._candidates(query)
+            if sort_key == "document_date" and reverse:
+                # Walk the date index and stop as soon as the page is filled
+                paginated_docs = []
+                with stage("find"):
+                    matches = self._scan(predicate, candidates, settings.query_time_budget)
+                    for position, doc in enumerate(matches):
+                        if position >= skip + limit:
+                            break
+                        if position >= skip:
+                            paginated_docs.append(doc)
+                return self.project_documents(paginated_docs, projection)
+
+            with stage("find"):
+                matched_docs = list(self._scan(predicate, candidates, settings.query_time_budget))
 
-            # sorting
             # sorting
             if sort_key:
-                sorted_data_frame = filtered_docs.sort_values(by=sort_key, ascending=not reverse)
-            else:
-                sorted_data_frame = filtered_docs
+                with stage("sort"):
+                    matched_docs.sort(key=lambda doc: doc.get(sort_key) or "", reverse=reverse)
                 
             # pagination
-            paginated_docs = sorted_data_frame[skip : skip + limit]
+            paginated_docs = matched_docs[skip : skip + limit]
 
-            # Filter fields based on the projection dictionary.
-            # If a projection is provided, only fields with value 1 are included in the result.
-            if projection:
-                fields = [k for k, v in projection.items() if v == 1]
-                paginated_docs = paginated_docs[fields]
+            return self.project_documents(paginated_docs, projection)
 
-            return paginated_docs.to_dict(orient="records")
+        except QueryError:
+            raise
+        except Exception as e:
+            logging.error(f"Error finding documents: {e}")
+            return []
 
+    def find_page(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 50,
+        count_mode: str = "exact",
+        count_cap: int = 1000,
+        sample_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Find a page of documents matching a query, newest first, and count the matches
+        in the same scan.
+        
+        With "exact", the scan covers every candidate. With "capped", it stops once
+        more than count_cap matches (or the page, if further) are found. With
+        "estimated", it stops as soon as the page is filled, and the rest of the
+        candidates are counted from an evenly spaced sample of sample_size documents.
+        
+        Args:
+            query: Query dictionary
+            projection: Fields to include (simple inclusion only for now)
+            skip: Number to skip
+            limit: Max to return
+            count_mode: One of COUNT_MODES
+            count_cap: Count at which a capped count stops
+            sample_size: Number of remaining documents sampled for an estimated count
+            
+        Returns:
+            Dictionary with the page of documents, total_count, count_exact (False when
+            total_count is a lower bound or an estimate) and has_more (whether matches
+            exist after the page)
+            
+        Raises:
+            QueryError: If a pattern is rejected or the query runs out of its time budget
+        """
+        try:
+            predicate = self._compile_query(query)
+            candidates = self._candidates(query)
+            page_end = skip + limit
+            if count_mode == "capped":
+                stop = max(page_end, count_cap) + 1
+            elif count_mode == "estimated":
+                stop = page_end + 1
+            else:
+                stop = None
+            
+            with stage("find"):
+                page = []
+                matched = 0
+                position = -1
+                for position, doc in self._scan(
+                    lambda item: predicate(item[1]), enumerate(candidates), settings.query_time_budget
+                ):
+                    if skip <= matched < page_end:
+                        page.append(doc)
+                    matched += 1
+                    if matched == stop:
+                        break
+            
+            total_count, count_exact = matched, True
+            if matched == stop and count_mode == "capped":
+                total_count, count_exact = stop - 1, False
+            elif matched == stop:
+                with stage("estimate"):
+                    remaining = candidates[position + 1:]
+                    step = max(1, len(remaining) // max(1, sample_size))
+                    sample = remaining[::step]
+                    if sample:
+                        hits = sum(1 for doc in sample if predicate(doc))
+                        count("rows_sampled", len(sample))
+                        total_count += round(hits * len(remaining) / len(sample))
+                count_exact = False
+            
+            return {
+                "documents": self.project_documents(page, projection),
+                "total_count": total_count,
+                "count_exact": count_exact,
+                "has_more": matched > page_end
+            }
+        
+        except QueryError:
+            raise
         except Exception as e:
             logging.error(f"Error finding documents: {e}")
+            return {"documents": [], "total_count": 0, "count_exact": True, "has_more": False}
+
+    def iter_documents(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        time_budget: float = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every document matching a query, newest first.
+        
+        Matches are produced one at a time from the store's date index, so memory
+        use doesn't grow with the size of the result set. The query is compiled
+        up front, so invalid patterns are reported before the first document;
+        the candidates are looked up when the first document is requested.
+        
+        Args:
+            query: Query dictionary
+            projection: Fields to include (simple inclusion only for now)
+            time_budget: Seconds the scan may take, 0 for unbounded. Time spent
+                by the consumer between documents isn't counted.
+            
+        Returns:
+            Iterator over the matching documents
+            
+        Raises:
+            QueryError: If a pattern is rejected, or while iterating if the scan
+                runs longer than the time budget
+        """
+        fields = [k for k, v in projection.items() if v == 1] if projection else None
+        return self._iter_matches(query, self._compile_query(query), fields, time_budget)
+
+    def _iter_matches(
+        self,
+        query: Dict[str, Any],
+        predicate: Predicate,
+        fields: Optional[List[str]],
+        time_budget: float
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the projected documents matching a compiled query, newest first."""
+        for doc in self._scan(predicate, self._candidates(query), time_budget):
+            yield {field: doc.get(field) for field in fields} if fields else dict(doc)
+
+    def estimate_cost(self, query: Dict[str, Any]) -> int:
+        """
+        Estimate the cost of matching a query, for admission control.
+        
+        Args:
+            query: Query dictionary
+            
+        Returns:
+            Number of candidate documents times the cost of testing one of them
+            
+        Raises:
+            QueryError: If a pattern is rejected
+        """
+        return len(self._candidates(query)) * self._condition_cost(query)
+
+    @classmethod
+    def _condition_cost(cls, query: Any) -> int:
+        """Get the cost of testing one document against a query, REGEX_COST per regex pattern."""
+        if isinstance(query, list):
+            return sum(cls._condition_cost(subq) for subq in query)
+        if not isinstance(query, dict):
+            return 1
+        cost = 0
+        for key, condition in query.items():
+            if key in ("$and", "$or", "$nor"):
+                cost += cls._condition_cost(condition)
+            elif isinstance(condition, dict) and isinstance(condition.get("$regex"), str):
+                pattern = compile_pattern(
+                    condition["$regex"], condition.get("$options") == "i", settings.query_regex_max_length
+                )
+                cost += REGEX_COST if pattern.kind == REGEX else 1
+            else:
+                cost += 1
+        return max(cost, 1)
+
+    @staticmethod
+    def _scan(
+        predicate: Predicate,
+        docs: Iterable[Dict[str, Any]],
+        time_budget: float = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the documents matching a predicate, in order.
+        
+        Only the time spent scanning counts towards the budget: time the
+        consumer spends between documents (ex: streaming them to a slow
+        client) doesn't.
+        
+        Args:
+            predicate: Compiled query
+            docs: Documents to scan
+            time_budget: Seconds the scan may take, 0 for unbounded
+            
+        Yields:
+            Matching documents
+            
+        Raises:
+            QueryError: If the scan runs longer than the time budget
+        """
+        scanned = matched = 0
+        spent = 0.0
+        resumed = time.monotonic()
+        try:
+            for doc in docs:
+                if (
+                    time_budget and scanned % BUDGET_CHECK_INTERVAL == 0
+                    and spent + time.monotonic() - resumed > time_budget
+                ):
+                    raise QueryError(f"Query exceeded its time budget of {time_budget} seconds")
+                scanned += 1
+                if predicate(doc):
+                    matched += 1
+                    spent += time.monotonic() - resumed
+                    yield doc
+                    resumed = time.monotonic()
+        finally:
+            # Reported to the slow query log
+            count("rows_scanned", scanned)
+            count("rows_matched", matched)
+
+    def _candidates(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the documents that can match a query, newest first.
+        
+        A top-level document_id equality is answered from the store's hash index,
+        and a top-level condition on document_date (equality, prefix or range)
+        narrows the scan to a slice of the store's date index.
+        
+        Args:
+            query: Query dictionary
+            
+        Returns:
+            Candidate documents, a subset of documents_by_date
+        """
+        conditions = [query] + [subq for subq in query.get("$and", []) if isinstance(subq, dict)]
+        low, high = "", None
+        for condition in conditions:
+            if isinstance(condition.get("document_id"), str):
+                doc = self.store.get_document(condition["document_id"])
+                return [doc] if doc is not None else []
+        
+        for condition in conditions:
+            if "document_date" not in condition:
+                continue
+            bounds = self._date_bounds(condition["document_date"])
+            if bounds is None:
+                continue
+            low = max(low, bounds[0])
+            high = bounds[1] if high is None else min(high, bounds[1])
+        
+        if high is None:
+            return self.store.documents_by_date
+        if low > high:
             return []
+        return self.store.documents_between(low, high)
+
+    @staticmethod
+    def _date_bounds(condition: Any) -> Optional[Tuple[str, str]]:
+        """Get the inclusive document_date range a condition restricts matches to, if any."""
+        if isinstance(condition, str):
+            return condition, condition
+        if not isinstance(condition, dict):
+            return None
+        
+        low, high = "", MAX_DATE_SUFFIX
+        pattern = condition.get("$regex")
+        if isinstance(pattern, str):
+            kind, text = classify_pattern(pattern)
+            # Case insensitive prefixes only narrow when case can't change them (ex: digits)
+            if kind not in (EXACT, PREFIX) or text.lower() != text.upper():
+                return None
+            low, high = text, text if kind == EXACT else text + MAX_DATE_SUFFIX
+        for op in ("$eq", "$gt", "$gte"):
+            if isinstance(condition.get(op), str):
+                low = max(low, condition[op])
+        for op in ("$eq", "$lt", "$lte"):
+            if isinstance(condition.get(op), str):
+                high = min(high, condition[op])
+        if (low, high) == ("", MAX_DATE_SUFFIX):
+            return None
+        return low, high
 
-    def _match_document(self, doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    def find_documents_many(
+        self,
+        queries: List[Dict[str, Any]],
+        sort_key: Optional[str] = None,
+        reverse: bool = False
+    ) -> List[List[Dict[str, Any]]]:
         """
-        Match a document against a MongoDB-style query.
-        Supports: equality, $regex, $gt, $gte, $lt, $lte, $ne, $and, $or
+        Find the documents matching each of several queries in a single pass.
+        
+        Args:
+            queries: Query dictionaries
+            sort_key: Field to sort each result list by
+            reverse: Sort in descending order
+            
+        Returns:
+            One list of matching documents per query, in the same order
+            
+        Raises:
+            QueryError: If a pattern is rejected or the queries run out of their time budget
+        """
+        try:
+            predicates = [self._compile_query(query) for query in queries]
+            deadline = time.monotonic() + settings.query_time_budget if settings.query_time_budget else None
+            
+            # Walking the date index yields newest-first matches without sorting
+            presorted = sort_key == "document_date" and reverse
+            docs = self.store.documents_by_date if presorted else self.store.documents
+
+            matched_docs: List[List[Dict[str, Any]]] = [[] for _ in queries]
+            scanned = 0
+            with stage("find"):
+                try:
+                    for doc in docs:
+                        if deadline is not None and scanned % BUDGET_CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+                            raise QueryError(f"Query exceeded its time budget of {settings.query_time_budget} seconds")
+                        scanned += 1
+                        for predicate, matches in zip(predicates, matched_docs):
+                            if predicate(doc):
+                                matches.append(doc)
+                finally:
+                    count("rows_scanned", scanned)
+                    count("rows_matched", sum(len(matches) for matches in matched_docs))
+
+            if sort_key and not presorted:
+                with stage("sort"):
+                    for matches in matched_docs:
+                        matches.sort(key=lambda doc: doc.get(sort_key) or "", reverse=reverse)
+
+            return matched_docs
+
+        except QueryError:
+            raise
+        except Exception as e:
+            logging.error(f"Error finding documents: {e}")
+            return [[] for _ in queries]
+
+    @staticmethod
+    def project_documents(
+        docs: List[Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Copy documents keeping only the projected fields.
+        
+        Args:
+            docs: Documents to project
+            projection: Fields to include (simple inclusion only for now)
+            
+        Returns:
+            List of projected documents
         """
-        if not query:
-            return True
+        # If a projection is provided, only fields with value 1 are included in the result.
+        with stage("project"):
+            if projection:
+                fields = [k for k, v in projection.items() if v == 1]
+                return [{field: doc.get(field) for field in fields} for doc in docs]
+            return [dict(doc) for doc in docs]
+
+    def _compile_query(self, query: Dict[str, Any]) -> Predicate:
+        """
+        Compile a MongoDB-style query into a predicate over documents.
+        Supports: equality, $regex, $in, $gt, $gte, $lt, $lte, $ne, $and, $or, $nor
+        
+        Regex patterns without regex syntax run as substring, prefix or equality
+        tests, against the records' lowercased copies of the free text fields when
+        case insensitive.
+        
+        Args:
+            query: Query dictionary
             
+        Returns:
+            Function returning True for the documents matching the query
+            
+        Raises:
+            QueryError: If a pattern is invalid or too expensive
+        """
+        predicates: List[Predicate] = []
         for key, condition in query.items():
             if key == "$and":
-                if not all(self._match_document(doc, subq) for subq in condition):
-                    return False
+                subqueries = [self._compile_query(subq) for subq in condition]
+                predicates.append(lambda doc, subqueries=subqueries: all(p(doc) for p in subqueries))
             elif key == "$or":
-                if not any(self._match_document(doc, subq) for subq in condition):
-                    return False
+                subqueries = [self._compile_query(subq) for subq in condition]
+                predicates.append(lambda doc, subqueries=subqueries: any(p(doc) for p in subqueries))
+            elif key == "$nor":
+                subqueries = [self._compile_query(subq) for subq in condition]
+                predicates.append(lambda doc, subqueries=subqueries: not any(p(doc) for p in subqueries))
+            elif isinstance(condition, dict):
+                # Operator match
+                predicates.extend(self._compile_condition(key, condition))
             else:
-                # Field match
-                doc_val = doc.get(key)
-                if isinstance(condition, dict):
-                    # Operator match
-                    for op, val in condition.items():
-                        if op == "$regex":
-                            flags = 0
-                            if condition.get("$options") == "i":
-                                flags = re.IGNORECASE
-                            if not re.search(val, str(doc_val or ""), flags):
-                                return False
-                        elif op == "$eq":
-                            if doc_val != val:
-                                return False
-                        elif op == "$ne":
-                            if doc_val == val:
-                                return False
-                        elif op == "$gt":
-                            if doc_val is None or doc_val <= val:
-                                return False
-                        elif op == "$gte":
-                            if doc_val is None or doc_val < val:
-                                return False
-                        elif op == "$lt":
-                            if doc_val is None or doc_val >= val:
-                                return False
-                        elif op == "$lte":
-                            if doc_val is None or doc_val > val:
-                                return False
+                # Direct equality
+                predicates.append(lambda doc, key=key, value=condition: doc.get(key) == value)
+        
+        if not predicates:
+            return lambda doc: True
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda doc: all(p(doc) for p in predicates)
+
+    def _compile_condition(self, field: str, condition: Dict[str, Any]) -> List[Predicate]:
+        """Compile the operators applied to a single field."""
+        predicates: List[Predicate] = []
+        for op, val in condition.items():
+            if op == "$regex":
+                pattern = compile_pattern(val, condition.get("$options") == "i", settings.query_regex_max_length)
+                if pattern.lowercase and field in LOWERCASE_FIELDS:
+                    attribute = f"{field}_lower"
+
+                    def match_lowercase(doc, pattern=pattern, attribute=attribute):
+                        # Plain dict documents have no lowercased copy
+                        value = getattr(doc, attribute, None)
+                        if value is None:
+                            value = str(doc.get(field) or "").lower()
+                        return pattern.test(value)
+                    predicates.append(match_lowercase)
+                elif pattern.lowercase and field in CATEGORICAL_FIELDS:
+                    # Few distinct values: lowercase each one once per query
+                    lowered: Dict[Any, str] = {}
+
+                    def match_categorical(doc, pattern=pattern, lowered=lowered):
+                        value = doc.get(field)
+                        if value not in lowered:
+                            lowered[value] = str(value or "").lower()
+                        return pattern.test(lowered[value])
+                    predicates.append(match_categorical)
+                elif pattern.lowercase:
+                    predicates.append(lambda doc, pattern=pattern: pattern.test(str(doc.get(field) or "").lower()))
                 else:
-                    # Direct equality
-                    if doc_val != condition:
-                        return False
-                        
-        return True
+                    predicates.append(lambda doc, pattern=pattern: pattern.test(str(doc.get(field) or "")))
+            elif op == "$eq":
+                predicates.append(lambda doc, val=val: doc.get(field) == val)
+            elif op == "$in":
+                predicates.append(lambda doc, val=val: doc.get(field) in val)
+            elif op == "$ne":
+                predicates.append(lambda doc, val=val: doc.get(field) != val)
+            elif op == "$gt":
+                predicates.append(lambda doc, val=val: doc.get(field) is not None and doc.get(field) > val)
+            elif op == "$gte":
+                predicates.append(lambda doc, val=val: doc.get(field) is not None and doc.get(field) >= val)
+            elif op == "$lt":
+                predicates.append(lambda doc, val=val: doc.get(field) is not None and doc.get(field) < val)
+            elif op == "$lte":
+                predicates.append(lambda doc, val=val: doc.get(field) is not None and doc.get(field) <= val)
+        return predicates
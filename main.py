@@ -1,7 +1,13 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
 from api.routes import api_router
+from api.dependencies import get_relationship_warmer, get_slow_query_log
+from api.compression import CompressionMiddleware
+from api.timing import TimingMiddleware
+from api.responses import FastJSONResponse
+from api.admission import Overloaded, overloaded_handler
 import logging
 
 logging.basicConfig(
@@ -10,11 +16,28 @@ logging.basicConfig(
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background warmup of relationship lookups."""
+    get_relationship_warmer().attach()
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="GZT Archiver UI Backend",
     description="Backend API for GZT Archiver",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
+
+# Compress large responses (brotli or gzip, as accepted by the client)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality
 )
 
 # Configure CORS
@@ -26,6 +49,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time each request: Server-Timing header, request duration histograms and slow query log
+app.add_middleware(TimingMiddleware, slow_log=get_slow_query_log())
+
+# Shed load with a 503 when an admission lane is full
+app.add_exception_handler(Overloaded, overloaded_handler)
+
 # Register API routes
 app.include_router(api_router)
 
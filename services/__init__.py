@@ -1,12 +1,18 @@
 from .cache_service import CacheService
+from .cache_backends import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
 from .dashboard_service import DashboardService
 from .search_service import SearchService
 from .document_service import DocumentService
+from .relationship_warmer import RelationshipWarmer
 
 __all__ = [
     "CacheService",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
     "DashboardService",
     "SearchService",
-    "DocumentService"
+    "DocumentService",
+    "RelationshipWarmer"
 ]
 
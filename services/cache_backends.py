@@ -0,0 +1,307 @@
+import os
+import sys
+import pickle
+import sqlite3
+import stat
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+
+# Recency window of SQLite caches without an entry limit, in accesses
+RECENCY_WINDOW = 1024
+
+
+class CacheEntry(NamedTuple):
+    """Cached value with its expiry time, stale grace deadline and estimated size"""
+    value: Any
+    expires_at: float
+    stale_until: float
+    size: int
+
+
+def estimate_size(value: Any, depth: int = 4) -> int:
+    """
+    Roughly estimate the memory used by a value and its contents.
+    
+    Args:
+        value: Value to measure
+        depth: Maximum container nesting to follow
+        
+    Returns:
+        Estimated size in bytes
+    """
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, depth - 1) + estimate_size(v, depth - 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, depth - 1) for item in value)
+    return size
+
+
+class CacheBackend(ABC):
+    """Storage behind CacheService. Implementations must be thread-safe."""
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry and mark it as recently used, None if missing."""
+    
+    @abstractmethod
+    def set(self, key: str, value: Any, expires_at: float, stale_until: float) -> int:
+        """Store an entry, evicting least recently used entries over the limits. Returns the eviction count."""
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+    
+    @abstractmethod
+    def sweep(self, now: float) -> int:
+        """Remove entries whose stale grace period ended before now. Returns the removal count."""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Get the number of entries and their total size in bytes."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU storage, private to each worker"""
+    
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0):
+        """
+        Initialize memory backend.
+        
+        Args:
+            max_entries: Maximum number of entries, 0 for unbounded
+            max_bytes: Maximum estimated size of all values, 0 for unbounded
+        """
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry. Caller must hold the lock."""
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry.size
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+    
+    def set(self, key: str, value: Any, expires_at: float, stale_until: float) -> int:
+        size = estimate_size(value) if self.max_bytes else 0
+        evictions = 0
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = CacheEntry(value, expires_at, stale_until, size)
+            self.total_bytes += size
+            
+            while self.entries and (
+                (self.max_entries and len(self.entries) > self.max_entries)
+                or (self.max_bytes and self.total_bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self.entries)))
+                evictions += 1
+        return evictions
+    
+    def delete(self, key: str) -> None:
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+    
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+    
+    def sweep(self, now: float) -> int:
+        with self.lock:
+            expired_keys = [key for key, entry in self.entries.items() if entry.stale_until <= now]
+            for key in expired_keys:
+                self._remove(key)
+        return len(expired_keys)
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.total_bytes}
+
+
+def default_cache_directory() -> str:
+    """Get the per-user directory of the shared cache: $XDG_CACHE_HOME/gztarchiver, or ~/.cache/gztarchiver."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "gztarchiver")
+
+
+def ensure_private_directory(directory: str) -> None:
+    """
+    Create a directory only the current user can access, or check an existing one is.
+    
+    Cached values are unpickled and request profiles are served to admins, so
+    files other users can write to would let them run code in the API process
+    or tamper with the profiles.
+    
+    Args:
+        directory: Directory path
+        
+    Raises:
+        ValueError: If the directory is owned by another user or accessible to group or others
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.name != "posix":
+        return
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise ValueError(f"Directory {directory} must be owned by the current user with mode 0700")
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite storage in WAL mode, shared by all workers on a node through a local file"""
+    
+    def __init__(self, path: str, max_entries: int = 0, max_bytes: int = 0):
+        """
+        Initialize SQLite backend.
+        
+        Args:
+            path: Database file path, shared by every worker using the same cache,
+                in a directory private to the current user
+            max_entries: Maximum number of entries, 0 for unbounded
+            max_bytes: Maximum total size of the pickled values, 0 for unbounded
+            
+        Raises:
+            ValueError: If the database directory is accessible to other users
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        # Hits only write their recency when the entry is older than this many accesses
+        self.recency_window = max(1, max_entries // 4) if max_entries else RECENCY_WINDOW
+        
+        ensure_private_directory(os.path.dirname(os.path.abspath(path)))
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+            "stale_until REAL NOT NULL, size INTEGER NOT NULL, accessed_at INTEGER NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_stale_until ON cache (stale_until)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+    
+    def _next_access(self, connection: sqlite3.Connection) -> int:
+        """Get a monotonically increasing access counter used for LRU ordering."""
+        row = connection.execute("SELECT COALESCE(MAX(accessed_at), 0) + 1 FROM cache").fetchone()
+        return row[0]
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expires_at, stale_until, size, accessed_at, (SELECT MAX(accessed_at) FROM cache) "
+            "FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        # Entries among the most recently used keep their place, so most hits don't
+        # take the database write lock shared by the workers
+        if row[5] - row[4] >= self.recency_window:
+            connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (row[5] + 1, key))
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            self.delete(key)
+            return None
+        return CacheEntry(value, row[1], row[2], row[3])
+    
+    def set(self, key: str, value: Any, expires_at: float, stale_until: float) -> int:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        connection = self._connection()
+        evictions = 0
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, stale_until, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, expires_at, stale_until, len(payload), self._next_access(connection))
+            )
+            if self.max_entries:
+                count = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                if count > self.max_entries:
+                    evictions += connection.execute(
+                        "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    ).rowcount
+            if self.max_bytes:
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+                while total > self.max_bytes:
+                    row = connection.execute(
+                        "SELECT key, size FROM cache WHERE key != ? ORDER BY accessed_at LIMIT 1", (key,)
+                    ).fetchone()
+                    if row is None:
+                        break
+                    connection.execute("DELETE FROM cache WHERE key = ?", (row[0],))
+                    total -= row[1]
+                    evictions += 1
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return evictions
+    
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+    
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM cache")
+    
+    def sweep(self, now: float) -> int:
+        return self._connection().execute("DELETE FROM cache WHERE stale_until <= ?", (now,)).rowcount
+    
+    def stats(self) -> Dict[str, int]:
+        entries, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        return {"entries": entries, "bytes": total}
+
+
+def create_cache_backend(name: str, max_entries: int = 0, max_bytes: int = 0, path: Optional[str] = None) -> CacheBackend:
+    """
+    Create a cache backend by name.
+    
+    Args:
+        name: "memory" or "sqlite"
+        max_entries: Maximum number of entries, 0 for unbounded
+        max_bytes: Maximum size of all values, 0 for unbounded
+        path: Database file path for the sqlite backend, defaults to cache.sqlite3
+            in default_cache_directory()
+        
+    Returns:
+        The cache backend
+    """
+    if name == "sqlite":
+        path = path or os.path.join(default_cache_directory(), "cache.sqlite3")
+        return SQLiteCacheBackend(path, max_entries, max_bytes)
+    if name != "memory":
+        raise ValueError(f"Unknown cache backend: {name}")
+    return MemoryCacheBackend(max_entries, max_bytes)
@@ -1,20 +1,75 @@
 import time
-from typing import Dict, Any, Optional, Tuple
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+from services.cache_backends import CacheBackend, CacheEntry, create_cache_backend
 from config.settings import settings
 
 
 class CacheService:
-    """Service for managing cache with TTL"""
+    """Service for managing a bounded LRU cache with TTL"""
     
-    def __init__(self, ttl: Optional[int] = None):
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        namespace_ttls: Optional[Dict[str, int]] = None,
+        sweep_interval: Optional[float] = None,
+        stale_ttl: Optional[int] = None,
+        backend: Optional[CacheBackend] = None
+    ):
         """
         Initialize cache service.
         
         Args:
             ttl: Time to live in seconds. If not provided, uses settings.
+            max_entries: Maximum number of entries, 0 for unbounded. If not provided, uses settings.
+            max_bytes: Maximum estimated size of all values, 0 for unbounded. If not provided, uses settings.
+            namespace_ttls: TTL overrides by key namespace (the part of the key before ":").
+                If not provided, uses settings.
+            sweep_interval: Seconds between background sweeps of expired entries, 0 to disable.
+                If not provided, uses settings.
+            stale_ttl: Seconds an expired entry is kept to be served stale by get_or_compute
+                while it is recomputed. If not provided, uses settings.
+            backend: Storage backend. If not provided, created from settings with the
+                max_entries and max_bytes limits.
         """
-        self.cache: Dict[str, Tuple[Any, float]] = {}
         self.ttl = ttl or settings.cache_ttl
+        self.backend = backend or create_cache_backend(
+            settings.cache_backend,
+            settings.cache_max_entries if max_entries is None else max_entries,
+            settings.cache_max_bytes if max_bytes is None else max_bytes,
+            settings.cache_sqlite_path
+        )
+        self.namespace_ttls = settings.cache_namespace_ttls if namespace_ttls is None else namespace_ttls
+        self.sweep_interval = settings.cache_sweep_interval if sweep_interval is None else sweep_interval
+        self.stale_ttl = settings.cache_stale_ttl if stale_ttl is None else stale_ttl
+        self.lock = threading.Lock()
+        # Computations in progress, shared by concurrent misses on the same key
+        self.inflight: Dict[str, Future] = {}
+        self.refresh_executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.sweeper: Optional[threading.Thread] = None
+    
+    def ttl_for(self, key: str) -> int:
+        """
+        Get the TTL applied to a key.
+        
+        Args:
+            key: Cache key, optionally prefixed by "<namespace>:"
+            
+        Returns:
+            TTL in seconds
+        """
+        namespace, separator, _ = key.partition(":")
+        if separator:
+            return self.namespace_ttls.get(namespace, self.ttl)
+        return self.ttl
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -26,29 +81,109 @@ class CacheService:
         Returns:
             Cached value if exists and not expired, None otherwise
         """
-        if key not in self.cache:
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is None or entry.expires_at <= time.time():
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            return entry.value
+    
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Get an entry, fresh or stale, removing it once past its stale grace period.
+        Caller must hold the lock.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The cache entry, or None if missing or past its grace period
+        """
+        entry = self.backend.get(key)
+        if entry is not None and entry.stale_until <= time.time():
+            # Cache expired, remove it
+            self.backend.delete(key)
+            self.expirations += 1
             return None
+        return entry
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], stale_while_revalidate: bool = True) -> Any:
+        """
+        Get a value from cache, computing it at most once across concurrent misses.
+        
+        Concurrent callers missing the same key wait for a single computation. With
+        stale_while_revalidate, an expired entry still in its grace period is returned
+        immediately while exactly one background computation refreshes it.
         
-        cached_data, cache_time = self.cache[key]
-        current_time = time.time()
+        Args:
+            key: Cache key
+            compute: Function computing the value on a miss
+            stale_while_revalidate: Serve expired values while they are recomputed
+            
+        Returns:
+            The cached, stale or freshly computed value
+        """
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is not None and entry.expires_at > time.time():
+                self.hits += 1
+                return entry.value
+            
+            self.misses += 1
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+            serve_stale = stale_while_revalidate and entry is not None
         
-        if current_time - cache_time < self.ttl:
-            return cached_data
+        if serve_stale:
+            if owner:
+                self._ensure_refresh_executor().submit(self._compute_into, key, compute, future)
+            return entry.value
         
-        # Cache expired, remove it
-        del self.cache[key]
-        return None
+        if owner:
+            self._compute_into(key, compute, future)
+        return future.result()
+    
+    def _compute_into(self, key: str, compute: Callable[[], Any], future: Future) -> None:
+        """Compute a value, cache it and publish it to the waiting callers."""
+        try:
+            value = compute()
+            self.set(key, value)
+            future.set_result(value)
+        except Exception as e:
+            logging.error(f"Error computing cache value for {key}: {e}")
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+    
+    def _ensure_refresh_executor(self) -> ThreadPoolExecutor:
+        """Create the background refresh executor on first use."""
+        with self.lock:
+            if self.refresh_executor is None:
+                self.refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+            return self.refresh_executor
     
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
-        Set value in cache with current timestamp.
+        Set value in cache, evicting least recently used entries when over the limits.
         
         Args:
             key: Cache key
             value: Value to cache
+            ttl: Time to live in seconds. If not provided, uses the key namespace TTL.
         """
-        current_time = time.time()
-        self.cache[key] = (value, current_time)
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl_for(key))
+        evictions = self.backend.set(key, value, expires_at, expires_at + self.stale_ttl)
+        
+        with self.lock:
+            self.evictions += evictions
+        
+        self._ensure_sweeper()
     
     def clear(self, key: Optional[str] = None) -> None:
         """
@@ -58,9 +193,9 @@ class CacheService:
             key: Cache key to clear. If None, clears all cache.
         """
         if key is None:
-            self.cache.clear()
-        elif key in self.cache:
-            del self.cache[key]
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
     
     def exists(self, key: str) -> bool:
         """
@@ -73,4 +208,56 @@ class CacheService:
             True if key exists and not expired, False otherwise
         """
         return self.get(key) is not None
-
+    
+    def sweep(self) -> int:
+        """
+        Remove all entries past their stale grace period.
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = self.backend.sweep(time.time())
+        with self.lock:
+            self.expirations += removed
+        return removed
+    
+    def _ensure_sweeper(self) -> None:
+        """Start the background sweep thread on first use."""
+        if not self.sweep_interval or self.sweeper is not None:
+            return
+        with self.lock:
+            if self.sweeper is not None:
+                return
+            self.sweeper = threading.Thread(target=self._sweep_forever, name="cache-sweeper", daemon=True)
+            self.sweeper.start()
+    
+    def _sweep_forever(self) -> None:
+        """Periodically sweep expired entries."""
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(f"Error sweeping cache: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics.
+        
+        Returns:
+            Dictionary with entry count, size, hit/miss/eviction/expiration counters and hit ratio
+        """
+        backend_stats = self.backend.stats()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": backend_stats["entries"],
+                "bytes": backend_stats["bytes"],
+                "inflight": len(self.inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
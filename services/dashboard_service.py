@@ -1,9 +1,13 @@
 import asyncio
 from typing import Dict, Any
-from functools import lru_cache
 from database.repository import DocumentRepository
 from services.cache_service import CacheService
-from config.settings import settings
+from utils.metrics import stage
+
+
+def format_document_type(document_type: str) -> str:
+    """Format a raw document type for display (ex: LEGAL_REGULATORY -> Legal Regulatory)."""
+    return document_type.title().strip().replace("_", " ")
 
 
 class DashboardService:
@@ -25,57 +29,59 @@ class DashboardService:
         """
         Get years covered by metadatastore
         """
-        try:
-            docs = self.repository.store.documents
-            if not docs:
-                return {}
-            
-            years = set()
-            for doc in docs:
-                date_str = doc.get("document_date", "")
-                if date_str and len(date_str) >= 4 and date_str[:4].isdigit():
-                    years.add(int(date_str[:4]))
-            
-            if not years:
-                return {}
-                
-            sorted_years = sorted(list(years))
-            return {"from": sorted_years[0], "to": sorted_years[-1]}
-        except Exception:
-            return {}
+        return self.repository.get_dashboard_stats().get("years_covered", {})
 
     async def get_dashboard_status(self) -> Dict[str, Any]:
         """
-        Get dashboard status with caching.
+        Get dashboard status.
+        
+        The statistics are aggregated once when the metadata store is loaded, so the
+        response is cached per dataset version rather than on a TTL. A new version is
+        a new key with nothing stale to serve, so concurrent misses wait for the one
+        computation instead.
         
         Returns:
             Dictionary with dashboard statistics
         """
-        # Check cache first
-        cached_data = self.cache_service.get(self.cache_key)
-        if cached_data is not None:
-            return cached_data
+        version = self.repository.store.version
+        with stage("dashboard"):
+            # A miss may wait on another request's computation: don't block the event loop
+            return await asyncio.to_thread(
+                self.cache_service.get_or_compute,
+                f"{self.cache_key}:{version}",
+                self.compute_dashboard_status,
+                False
+            )
+    
+    def compute_dashboard_status(self) -> Dict[str, Any]:
+        """
+        Build the dashboard response from the precomputed aggregates.
         
+        Returns:
+            Dictionary with dashboard statistics
+        """
         stats = self.repository.get_dashboard_stats()
         
-        # Get years covered
-        years_covered = self.get_years_covered()
-        
         # Clean and format document types
         document_types = sorted([
-            doc_type.title().strip().replace("_", " ")
+            format_document_type(doc_type)
             for doc_type in stats.get("document_types", [])
             if doc_type
         ])
         
-        response_data = {
+        type_counts: Dict[str, int] = {}
+        for doc_type, count in stats.get("type_counts", {}).items():
+            label = format_document_type(doc_type)
+            type_counts[label] = type_counts.get(label, 0) + count
+        
+        return {
             "total_docs": stats.get("total_docs", 0),
             "available_docs": stats.get("available_docs", 0),
             "document_types": document_types,
-            "years_covered": years_covered
+            "years_covered": stats.get("years_covered", {}),
+            "type_counts": dict(sorted(type_counts.items())),
+            "year_counts": stats.get("year_counts", {}),
+            "month_counts": stats.get("month_counts", {}),
+            "availability_by_year": stats.get("availability_by_year", {}),
+            "dataset_version": self.repository.store.version
         }
-        
-        # Cache the result
-        self.cache_service.set(self.cache_key, response_data)
-        
-        return response_data
@@ -1,19 +1,180 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator, Tuple
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import contextvars
+import threading
 from clients.query_api_client import QueryAPIClient
+from database.repository import DocumentRepository
+from services.cache_service import CacheService
+from config.settings import settings
+from utils.profiling import profiled
 import logging
 
+# Local metadata copied onto resolved relationships and graph nodes
+RELATED_DOCUMENT_FIELDS = ("document_date", "document_type", "availability", "source")
+
 
 class DocumentService:
     """Service for document validation and relationship operations"""
     
-    def __init__(self, api_client: QueryAPIClient):
+    def __init__(self, api_client: QueryAPIClient, repository: DocumentRepository, cache_service: CacheService):
         """
         Initialize document service.
         
         Args:
             api_client: Query API client instance
+            repository: Document repository instance
+            cache_service: Cache service instance for Query API entity lookups
         """
         self.api_client = api_client
+        self.repository = repository
+        self.cache_service = cache_service
+        # Document number -> number of lookups, used to pick documents to warm up
+        self.access_counts: Counter = Counter()
+        self.access_counts_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.upstream_concurrency),
+            thread_name_prefix="query-api"
+        )
+    
+    def _fetch_concurrently(self, fetch: Callable[[str], Any], entity_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Call a Query API client method for several entity IDs in parallel.
+        
+        Args:
+            fetch: Client method taking a single entity ID
+            entity_ids: Entity IDs to fetch
+            
+        Returns:
+            Dictionary mapping each entity ID to the fetched result
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        futures = [self._submit(fetch, entity_id) for entity_id in entity_ids]
+        return {entity_id: future.result() for entity_id, future in zip(entity_ids, futures)}
+    
+    def _submit(self, fetch: Callable[[str], Any], entity_id: str) -> Future:
+        """Run a Query API call on the executor, in a copy of the caller's context (ex: its request timer)."""
+        return self.executor.submit(contextvars.copy_context().run, profiled, fetch, entity_id)
+    
+    def _record_access(self, document_number: Optional[str]) -> None:
+        """
+        Count a lookup of a known document number.
+        
+        At most settings.warmup_tracked_documents numbers are tracked: past that,
+        only the most requested half is kept, with halved counts so newly popular
+        documents can still overtake them.
+        
+        Args:
+            document_number: Document number that resolved to a document
+        """
+        if not document_number:
+            return
+        with self.access_counts_lock:
+            self.access_counts[document_number] += 1
+            if len(self.access_counts) > max(1, settings.warmup_tracked_documents):
+                self.access_counts = Counter({
+                    number: max(1, count // 2)
+                    for number, count in self.access_counts.most_common(max(1, settings.warmup_tracked_documents // 2))
+                })
+    
+    def most_requested_documents(self, limit: int) -> List[str]:
+        """
+        Get the most frequently requested document numbers.
+        
+        Args:
+            limit: Maximum number of document numbers to return
+            
+        Returns:
+            Document numbers, most requested first
+        """
+        with self.access_counts_lock:
+            return [document_number for document_number, _ in self.access_counts.most_common(limit)]
+    
+    def _search_entity(self, document_id: str, before_request: Optional[Callable[[], None]] = None) -> Optional[str]:
+        """Search the entity ID of a document number, using the entity cache."""
+        cache_key = f"entity_search:{document_id}"
+        entity_id = self.cache_service.get(cache_key)
+        if entity_id is None:
+            if before_request:
+                before_request()
+            entity_id = self.api_client.search_entity(document_id)
+            if entity_id:
+                self.cache_service.set(cache_key, entity_id)
+        return entity_id
+    
+    def _get_entity_relations(self, entity_id: str, before_request: Optional[Callable[[], None]] = None) -> Any:
+        """Get the relations of an entity, using the entity cache."""
+        cache_key = f"entity_relations:{entity_id}"
+        relations = self.cache_service.get(cache_key)
+        if relations is None:
+            if before_request:
+                before_request()
+            relations = self.api_client.get_entity_relations(entity_id)
+            if isinstance(relations, list):
+                self.cache_service.set(cache_key, relations)
+        return relations
+    
+    def _learn_document_number(self, entity_id: str, document_number: str) -> None:
+        """Remember which document number an entity ID belongs to, in the entity cache."""
+        self.cache_service.set(f"entity_document:{entity_id}", document_number)
+    
+    def _resolve_locally(self, entity_id: str) -> Optional[str]:
+        """
+        Resolve an entity ID to its document number without calling the Query API.
+        
+        Entity IDs follow the <document_number>_doc_<n> pattern (ex: 2153-12_doc_34),
+        so the prefix is trusted whenever the document exists in the metadata store.
+        Other IDs are looked up among the document numbers learned from earlier
+        Query API lookups, kept in the entity cache.
+        
+        Args:
+            entity_id: Entity ID to resolve
+            
+        Returns:
+            Document number if known locally, None otherwise
+        """
+        document_number, separator, _ = entity_id.rpartition("_doc_")
+        if separator and self.repository.store.get_document(document_number) is not None:
+            return document_number
+        
+        return self.cache_service.get(f"entity_document:{entity_id}")
+    
+    def resolve_document_numbers(self, entity_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve entity IDs to document numbers, asking the Query API only for unknown IDs.
+        
+        Args:
+            entity_ids: Entity IDs to resolve
+            
+        Returns:
+            Dictionary mapping each entity ID to its document number, or None if unresolved
+        """
+        document_numbers = {entity_id: self._resolve_locally(entity_id) for entity_id in entity_ids}
+        
+        unknown_entity_ids = [entity_id for entity_id, number in document_numbers.items() if not number]
+        if unknown_entity_ids:
+            fetched = self._fetch_concurrently(self.api_client.get_entity_by_id, unknown_entity_ids)
+            for entity_id, document_number in fetched.items():
+                if document_number:
+                    self._learn_document_number(entity_id, document_number)
+                document_numbers[entity_id] = document_number
+        
+        return document_numbers
+    
+    def _document_details(self, document_number: Optional[str]) -> Dict[str, Any]:
+        """
+        Get the local metadata shown alongside a related document.
+        
+        Args:
+            document_number: Document number, or None if unresolved
+            
+        Returns:
+            Dictionary of related document fields, empty if the document isn't in the store
+        """
+        document = self.repository.store.get_document(document_number) if document_number else None
+        if document is None:
+            return {}
+        return {field: document.get(field) for field in RELATED_DOCUMENT_FIELDS}
     
     def is_document_available(self, document_id: str) -> Optional[str]:
         """
@@ -29,32 +190,41 @@ class DocumentService:
         Returns:
             Entity ID if found and validated, False if not found, None on error
         """
-        entity_id = self.api_client.search_entity(document_id)
+        entity_id = self._search_entity(document_id)
         
+        # Only count documents that exist, so unknown ids can't fill the warmup candidates
+        if entity_id or self.repository.store.get_document(document_id) is not None:
+            self._record_access(document_id)
         if entity_id:
+            self._learn_document_number(entity_id, document_id)
             logging.info(f"Document Found : {entity_id}")
         else:
             logging.info(f"Document not Found : {entity_id}")
         
         return entity_id
     
-    def get_document_relationships(self, document_id: str) -> Dict[str, Any]:
+    def _fetch_relationships(self, document_id: str) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
         """
-        Get relationships for a document.
+        Fetch the raw relationships of a document from the Query API.
         
         Args:
             document_id: Document entity ID
             
         Returns:
-            List of relationships with document numbers, or error information
+            Tuple of (relationships, error information or None)
         """
-        relationship_response = self.api_client.get_entity_relations(document_id)
+        self._record_access(self._resolve_locally(document_id))
+        relationship_response = self._get_entity_relations(document_id)
+        
+        if relationship_response is None:
+            logging.error("Error getting relationships: no response from Query API")
+            return [], {"error": "Unable to fetch relationships"}
         
         if "error" in relationship_response:
             logging.error(f"Error getting relationships: {relationship_response['error']}")
-            return relationship_response["error"]
+            return [], relationship_response["error"]
         
-        # Filter and enrich relationships
+        # Keep only the fields the frontend uses
         filtered_relationship_response = [
             {
                 "relatedEntityId": relationship["relatedEntityId"],
@@ -64,13 +234,215 @@ class DocumentService:
             for relationship in relationship_response
         ]
         
-        # Fetch document names for each relationship
+        return filtered_relationship_response, None
+    
+    def get_document_relationships(self, document_id: str) -> Dict[str, Any]:
+        """
+        Get relationships for a document.
+        
+        Args:
+            document_id: Document entity ID
+            
+        Returns:
+            List of relationships with document numbers, or error information
+        """
+        filtered_relationship_response, error = self._fetch_relationships(document_id)
+        if error is not None:
+            return error
+        
+        # Resolve document numbers from the metadata store first, then the Query API
+        document_numbers = self.resolve_document_numbers(
+            relationship["relatedEntityId"] for relationship in filtered_relationship_response
+        )
         for relationship in filtered_relationship_response:
-            document_name = self.api_client.get_entity_by_id(relationship["relatedEntityId"])
-            if document_name:
-                relationship["document_number"] = document_name
-            else:
-                relationship["document_number"] = False
+            document_number = document_numbers.get(relationship["relatedEntityId"])
+            relationship["document_number"] = document_number or False
+            relationship.update(self._document_details(document_number))
         
         return filtered_relationship_response
-
+    
+    def iter_document_relationships(self, document_id: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream relationships for a document as their document numbers resolve.
+        
+        Yields the raw relationship list first, then one enrichment event per related
+        entity: entities known to the metadata store immediately, the rest in the order
+        their Query API lookups complete.
+        
+        Args:
+            document_id: Document entity ID
+            
+        Yields:
+            Tuples of (event name, data): "relationships", "relationship", "error" and "end"
+        """
+        relationships, error = self._fetch_relationships(document_id)
+        if error is not None:
+            yield "error", error
+            return
+        
+        yield "relationships", relationships
+        
+        def enrichment(entity_id: str, document_number: Optional[str]) -> Dict[str, Any]:
+            return {
+                "relatedEntityId": entity_id,
+                "document_number": document_number or False,
+                **self._document_details(document_number)
+            }
+        
+        pending = []
+        for entity_id in dict.fromkeys(relationship["relatedEntityId"] for relationship in relationships):
+            document_number = self._resolve_locally(entity_id)
+            if document_number:
+                yield "relationship", enrichment(entity_id, document_number)
+            else:
+                pending.append(entity_id)
+        
+        futures = {
+            self._submit(self.api_client.get_entity_by_id, entity_id): entity_id
+            for entity_id in pending
+        }
+        for future in as_completed(futures):
+            entity_id = futures[future]
+            try:
+                document_number = future.result()
+            except Exception as e:
+                logging.error(f"Error resolving {entity_id}: {e}")
+                document_number = None
+            if document_number:
+                self._learn_document_number(entity_id, document_number)
+            yield "relationship", enrichment(entity_id, document_number)
+        
+        yield "end", {"count": len(relationships)}
+    
+    def get_relationship_graph(self, document_id: str, max_depth: int = 2, max_nodes: int = 50) -> Dict[str, Any]:
+        """
+        Expand the relationship graph around a document breadth-first.
+        
+        Every frontier level is fetched concurrently, each entity is visited once,
+        and the document numbers of all collected nodes are resolved in one batch.
+        
+        Args:
+            document_id: Document entity ID to start from (ex: 2153-12_doc_34)
+            max_depth: Maximum number of hops from the starting document
+            max_nodes: Maximum number of nodes in the returned graph
+            
+        Returns:
+            Dictionary with nodes, edges and whether the traversal was truncated,
+            or error information if the starting document relations can't be fetched
+        """
+        self._record_access(self._resolve_locally(document_id))
+        max_depth = max(1, min(max_depth, settings.graph_max_depth))
+        max_nodes = max(1, min(max_nodes, settings.graph_max_nodes))
+        
+        depths = {document_id: 0}
+        edges = []
+        seen_edges = set()
+        truncated = False
+        frontier = [document_id]
+        
+        for depth in range(1, max_depth + 1):
+            if not frontier:
+                break
+            
+            relations_by_entity = self._fetch_concurrently(self._get_entity_relations, frontier)
+            
+            root_relations = relations_by_entity.get(document_id)
+            if depth == 1 and not isinstance(root_relations, list):
+                error = root_relations.get("error") if isinstance(root_relations, dict) else None
+                logging.error(f"Error getting relationships: {error}")
+                return {"error": error or "Unable to fetch relationships"}
+            
+            next_frontier = []
+            for entity_id in frontier:
+                relations = relations_by_entity.get(entity_id)
+                if not isinstance(relations, list):
+                    continue
+                
+                for relationship in relations:
+                    related_entity_id = relationship.get("relatedEntityId")
+                    if not related_entity_id:
+                        continue
+                    
+                    if related_entity_id not in depths:
+                        if len(depths) >= max_nodes:
+                            truncated = True
+                            continue
+                        depths[related_entity_id] = depth
+                        next_frontier.append(related_entity_id)
+                    
+                    # The same relation is reported by both of its ends, keep it once
+                    if relationship.get("direction") == "INCOMING":
+                        source, target = related_entity_id, entity_id
+                    else:
+                        source, target = entity_id, related_entity_id
+                    edge_key = (source, target, relationship.get("name"))
+                    if edge_key in seen_edges:
+                        continue
+                    seen_edges.add(edge_key)
+                    edges.append({
+                        "source": source,
+                        "target": target,
+                        "name": relationship.get("name")
+                    })
+            
+            frontier = next_frontier
+        
+        document_numbers = self.resolve_document_numbers(depths)
+        
+        nodes = [
+            {
+                "id": entity_id,
+                "document_number": document_numbers.get(entity_id) or False,
+                "depth": depth,
+                **self._document_details(document_numbers.get(entity_id))
+            }
+            for entity_id, depth in depths.items()
+        ]
+        
+        return {
+            "root": document_id,
+            "max_depth": max_depth,
+            "nodes": nodes,
+            "edges": edges,
+            "truncated": truncated
+        }
+    
+    def prefetch_document(self, document_id: str, before_request: Optional[Callable[[], None]] = None) -> int:
+        """
+        Pre-resolve a document's entity, relations and related names into the caches.
+        
+        Args:
+            document_id: Document number (ex: 2153-12)
+            before_request: Optional callable invoked before every Query API request,
+                used by the warmer to respect its rate budget
+            
+        Returns:
+            Number of Query API requests made
+        """
+        requests_made = 0
+        
+        def request() -> None:
+            nonlocal requests_made
+            requests_made += 1
+            if before_request:
+                before_request()
+        
+        entity_id = self._search_entity(document_id, request)
+        if not entity_id:
+            return requests_made
+        self._learn_document_number(entity_id, document_id)
+        
+        relations = self._get_entity_relations(entity_id, request)
+        if not isinstance(relations, list):
+            return requests_made
+        
+        for relationship in relations:
+            related_entity_id = relationship.get("relatedEntityId")
+            if not related_entity_id or self._resolve_locally(related_entity_id):
+                continue
+            request()
+            document_number = self.api_client.get_entity_by_id(related_entity_id)
+            if document_number:
+                self._learn_document_number(related_entity_id, document_number)
+        
+        return requests_made
@@ -1,17 +1,78 @@
 import requests
 import json
-from typing import List, Dict, Any, Optional
+import time
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Callable, Mapping
 from config.settings import settings
 import logging
-from database.models import Docs
+from database.records import RecordEncoder
+from core.text_index import SuggestIndex, TermIndex
 
 logger = logging.getLogger(__name__)
 
+
+def compute_aggregates(docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute corpus statistics in a single pass over the documents.
+    
+    Args:
+        docs: Documents to aggregate
+        
+    Returns:
+        Dictionary with totals, per-type, per-year and per-month counts,
+        availability by year and the range of years covered
+    """
+    total_docs = 0
+    available_docs = 0
+    type_counts: Dict[str, int] = {}
+    year_counts: Dict[str, int] = {}
+    month_counts: Dict[str, int] = {}
+    availability_by_year: Dict[str, Dict[str, int]] = {}
+    
+    for doc in docs:
+        total_docs += 1
+        available = doc.get("availability") == "Available"
+        if available:
+            available_docs += 1
+        
+        document_type = doc.get("document_type")
+        if document_type:
+            type_counts[document_type] = type_counts.get(document_type, 0) + 1
+        
+        date_str = doc.get("document_date") or ""
+        if len(date_str) >= 4 and date_str[:4].isdigit():
+            year = date_str[:4]
+            year_counts[year] = year_counts.get(year, 0) + 1
+            by_year = availability_by_year.setdefault(year, {"available": 0, "unavailable": 0})
+            by_year["available" if available else "unavailable"] += 1
+            if len(date_str) >= 7 and date_str[5:7].isdigit():
+                month = date_str[:7]
+                month_counts[month] = month_counts.get(month, 0) + 1
+    
+    years = sorted(year_counts)
+    return {
+        "total_docs": total_docs,
+        "available_docs": available_docs,
+        "document_types": list(type_counts),
+        "type_counts": type_counts,
+        "year_counts": {year: year_counts[year] for year in years},
+        "month_counts": {month: month_counts[month] for month in sorted(month_counts)},
+        "availability_by_year": {year: availability_by_year[year] for year in years},
+        "years_covered": {"from": int(years[0]), "to": int(years[-1])} if years else {}
+    }
+
 class MetadataStore:
     """Service to fetch and store global metadata"""
     
     _instance = None
-    _data: List[Dict[str, Any]] = []
+    _data: List[Mapping[str, Any]] = []
+    _derived_lock = threading.RLock()
+    _derived_source: Optional[List[Dict[str, Any]]] = None
+    _derived: Dict[str, Any] = {}
+    _refresh_listeners: List[Callable[[], None]] = []
+    refreshed_at: float = time.time()
     
     def __new__(cls):
         if cls._instance is None:
@@ -30,33 +91,173 @@ class MetadataStore:
             if not url:
                 logger.warning("GLOBAL_METADATA_URL is not set. Using empty dataset.")
                 self._data = []
+                self.refreshed_at = time.time()
                 return
 
             response = requests.get(url, timeout=settings.request_timeout)
             response.raise_for_status()
             
-            raw_data = response.json()
-            validated_data = []
-            
-            for item in raw_data:
-                try:
-                    # Validate and clean data using Pydantic model
-                    # This ensures our single source of truth (Docs model) is respected
-                    doc = Docs(**item)
-                    validated_data.append(doc.model_dump())
-                except Exception as validation_error:
-                    logger.warning(f"Skipping invalid document: {validation_error}")
-            
-            self._data = validated_data
+            self.load_documents(response.json())
             logger.info(f"Successfully loaded and validated {len(self._data)} documents.")
             
         except Exception as e:
             logger.error(f"Failed to fetch global metadata: {e}")
             if not self._data:
                 self._data = []
+            return
+        
+        for listener in list(self._refresh_listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Metadata refresh listener failed: {e}")
+    
+    def load_documents(self, raw_data: List[Any]) -> None:
+        """
+        Replace the documents with raw metadata, validated and indexed.
+        
+        Args:
+            raw_data: Raw documents, as decoded from the global metadata JSON
+        """
+        validated_data = []
+        encoder = RecordEncoder()
+        
+        for item in raw_data:
+            try:
+                # Validate against the Docs model fields, our single source of truth,
+                # and store compactly with categorical values shared between records
+                validated_data.append(encoder.encode(item))
+            except Exception as validation_error:
+                logger.warning(f"Skipping invalid document: {validation_error}")
+        
+        self._data = validated_data
+        self.refreshed_at = time.time()
+        self._build_derived()
+    
+    def add_refresh_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback invoked after every successful refresh.
+        
+        Args:
+            listener: Callable taking no arguments
+        """
+        if listener not in self._refresh_listeners:
+            self._refresh_listeners.append(listener)
     
     @property
-    def documents(self) -> List[Dict[str, Any]]:
+    def documents(self) -> List[Mapping[str, Any]]:
         """Get all validated documents from the store"""
         return self._data
-    
+
+    def _derive(self, name: str, builder: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+        """
+        Get a structure derived from the current documents, building it once per dataset.
+        
+        Args:
+            name: Name of the derived structure
+            builder: Function building the structure from the documents
+            
+        Returns:
+            The derived structure for the current documents
+        """
+        docs = self.documents
+        with self._derived_lock:
+            if self._derived_source is not docs:
+                self._derived_source = docs
+                self._derived = {}
+            if name not in self._derived:
+                self._derived[name] = builder(docs)
+            return self._derived[name]
+
+    def _build_derived(self) -> None:
+        """Build the indexes and aggregates up front so the first requests don't pay for them."""
+        self.document_index
+        self.documents_by_date
+        self.date_keys
+        self.suggest_index
+        self.term_index
+        self.aggregates
+        self.version
+
+    @property
+    def version(self) -> str:
+        """Get a content hash identifying the current dataset"""
+        def build(docs: List[Dict[str, Any]]) -> str:
+            digest = hashlib.sha1()
+            for doc in docs:
+                digest.update(json.dumps(dict(doc), sort_keys=True, separators=(",", ":")).encode("utf-8"))
+            return digest.hexdigest()[:16]
+
+        return self._derive("version", build)
+
+    @property
+    def aggregates(self) -> Dict[str, Any]:
+        """Get dashboard aggregates computed once per dataset"""
+        return self._derive("aggregates", compute_aggregates)
+
+    @property
+    def document_index(self) -> Dict[str, Dict[str, Any]]:
+        """Get the document_id hash index of the store"""
+        def build(docs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            index = {}
+            for doc in docs:
+                index.setdefault(doc.get("document_id"), doc)
+            return index
+
+        return self._derive("document_index", build)
+
+    @property
+    def documents_by_date(self) -> List[Dict[str, Any]]:
+        """Get the documents sorted by document_date, newest first"""
+        return self._derive(
+            "documents_by_date",
+            lambda docs: sorted(docs, key=lambda doc: doc.get("document_date") or "", reverse=True)
+        )
+
+    @property
+    def date_keys(self) -> List[str]:
+        """Get the document dates in ascending order, the reverse of documents_by_date"""
+        return self._derive(
+            "date_keys",
+            lambda docs: [doc.get("document_date") or "" for doc in reversed(self.documents_by_date)]
+        )
+
+    @property
+    def suggest_index(self) -> SuggestIndex:
+        """Get the typeahead index over document numbers, types and description terms"""
+        return self._derive(
+            "suggest_index",
+            lambda docs: SuggestIndex(docs, settings.suggest_min_term_frequency)
+        )
+
+    @property
+    def term_index(self) -> TermIndex:
+        """Get the typo-tolerant inverted index over description terms"""
+        return self._derive("term_index", TermIndex)
+
+    def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a document by its exact document_id.
+        
+        Args:
+            document_id: Document number (ex: 2153-12)
+            
+        Returns:
+            The document if it exists in the store, None otherwise
+        """
+        return self.document_index.get(document_id)
+
+    def documents_between(self, low: str, high: str) -> List[Dict[str, Any]]:
+        """
+        Get the documents dated within a range, newest first, using the date index.
+        
+        Args:
+            low: Lowest document_date, inclusive
+            high: Highest document_date, inclusive
+            
+        Returns:
+            Slice of documents_by_date with low <= document_date <= high
+        """
+        keys = self.date_keys
+        count = len(keys)
+        return self.documents_by_date[count - bisect_right(keys, high) : count - bisect_left(keys, low)]
@@ -0,0 +1,120 @@
+import heapq
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from database.repository import DocumentRepository
+from services.document_service import DocumentService
+from config.settings import settings
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly to a maximum rate"""
+    
+    def __init__(self, rate: float):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            rate: Maximum calls per second. Zero or less disables limiting.
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+    
+    def wait(self) -> None:
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RelationshipWarmer:
+    """Background warmer pre-resolving relationships of likely requested gazettes"""
+    
+    def __init__(self, document_service: DocumentService, repository: DocumentRepository):
+        """
+        Initialize relationship warmer.
+        
+        Args:
+            document_service: Document service whose caches are warmed
+            repository: Document repository instance
+        """
+        self.document_service = document_service
+        self.repository = repository
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+    
+    def select_documents(self) -> List[str]:
+        """
+        Pick the document numbers to warm up.
+        
+        Returns:
+            The newest documents in the store followed by the most requested ones, without duplicates
+        """
+        newest = heapq.nlargest(
+            settings.warmup_newest,
+            self.repository.store.documents,
+            key=lambda doc: doc.get("document_date") or ""
+        )
+        document_ids = [doc.get("document_id") for doc in newest]
+        document_ids += self.document_service.most_requested_documents(settings.warmup_top)
+        return [document_id for document_id in dict.fromkeys(document_ids) if document_id]
+    
+    def warm(self) -> Dict[str, int]:
+        """
+        Warm the entity caches within the configured concurrency and rate budget.
+        
+        Returns:
+            Dictionary with the number of documents warmed and Query API requests made
+        """
+        document_ids = self.select_documents()
+        limiter = RateLimiter(settings.warmup_rate)
+        
+        def prefetch(document_id: str) -> int:
+            try:
+                return self.document_service.prefetch_document(document_id, limiter.wait)
+            except Exception as e:
+                logging.error(f"Error warming relationships for {document_id}: {e}")
+                return 0
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=max(1, settings.warmup_concurrency),
+            thread_name_prefix="relationship-warmer"
+        ) as executor:
+            requests_made = sum(executor.map(prefetch, document_ids))
+        
+        logging.info(
+            f"Warmed relationships for {len(document_ids)} documents with "
+            f"{requests_made} Query API requests in {time.monotonic() - started:.1f}s"
+        )
+        return {"documents": len(document_ids), "requests": requests_made}
+    
+    def start(self) -> bool:
+        """
+        Start warming in a background thread unless a run is already in progress.
+        
+        Returns:
+            True if a new run was started, False otherwise
+        """
+        if not settings.warmup_enabled or not self.document_service.api_client.base_url:
+            return False
+        
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return False
+            self.thread = threading.Thread(target=self.warm, name="relationship-warmer", daemon=True)
+            self.thread.start()
+            return True
+    
+    def attach(self) -> None:
+        """Warm now and again after every metadata refresh."""
+        self.repository.store.add_refresh_listener(self.start)
+        self.start()
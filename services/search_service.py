@@ -1,8 +1,28 @@
 import asyncio
-from typing import Dict, Any, List, Tuple
-from database.repository import DocumentRepository
+import contextvars
+from functools import partial
+from typing import Dict, Any, List, Tuple, Optional, Iterable, Iterator, Callable, TypeVar
+from database.models import Docs
+from database.repository import COUNT_MODES, DocumentRepository
 from core.query_parser import QueryParser
 from core.query_builder import QueryBuilder
+from config.settings import settings
+from utils.metrics import record_query, stage
+from utils.profiling import profiled
+
+T = TypeVar("T")
+
+
+# Fields returned by default in search results
+DEFAULT_RESULT_FIELDS = (
+    "document_id",
+    "description",
+    "document_date",
+    "document_type",
+    "file_path",
+    "source",
+    "availability"
+)
 
 
 class SearchService:
@@ -19,11 +39,46 @@ class SearchService:
         self.query_parser = QueryParser()
         self.query_builder = QueryBuilder()
     
+    @staticmethod
+    def resolve_fields(fields: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Validate the fields requested for search results.
+        
+        Args:
+            fields: Requested field names, or None for the default fields
+            
+        Returns:
+            List of fields to return, without duplicates
+            
+        Raises:
+            ValueError: If fields isn't a list or string, or a field isn't a document field
+        """
+        if not fields:
+            return list(DEFAULT_RESULT_FIELDS)
+        
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        elif not isinstance(fields, (list, tuple)):
+            raise ValueError("fields must be a list of field names or a comma-separated string")
+        
+        resolved = []
+        for field in fields:
+            field = str(field).strip()
+            if field not in Docs.model_fields:
+                raise ValueError(f"Unknown field: {field}")
+            if field not in resolved:
+                resolved.append(field)
+        return resolved
+    
     async def search_documents(
         self,
         query: str,
         page: int = 1,
-        limit: int = 50
+        limit: int = 50,
+        fields: Optional[Iterable[str]] = None,
+        fuzzy: bool = False,
+        count_mode: Optional[str] = None,
+        plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Search documents with pagination.
@@ -32,54 +87,336 @@ class SearchService:
             query: Search query string
             page: Page number (1-based)
             limit: Number of results per page
+            fields: Fields to include in each result, defaults to DEFAULT_RESULT_FIELDS
+            fuzzy: Also match free text words with typos or transliteration variants
+            count_mode: How total_count is computed: "exact", "estimated" or "capped".
+                Defaults to settings.search_count_mode.
+            plan: Query plan of the same query from prepare, built here if not provided
             
         Returns:
             Dictionary with results and pagination info
+            
+        Raises:
+            ValueError: If an unknown field or count mode is requested
         """
+        result_fields = self.resolve_fields(fields)
+        count_mode = count_mode or settings.search_count_mode
+        if not isinstance(count_mode, str) or count_mode.lower() not in COUNT_MODES:
+            raise ValueError(f"count_mode must be one of: {', '.join(COUNT_MODES)}")
+        count_mode = count_mode.lower()
+        
         if not query:
             return self._empty_results(page, limit)
         
-        # Parse the search query
-        metadatastore_filters, free_text = self.query_parser.parse_search_query(query)
+        # Matching is CPU bound: run it off the event loop so other requests are still served
+        return await self._run(self._search_page, query, page, limit, result_fields, fuzzy, count_mode, plan)
+    
+    async def prepare(self, query: str, fuzzy: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Build the query plan of a search and estimate its cost, off the event loop.
         
-        # Build the MongoDB-style query (which repository matches in memory)
-        search_query = self.query_builder.build_metadatastore_query(metadatastore_filters, free_text)
+        The plan can be passed back to search_documents or iter_search_results,
+        so the query isn't parsed and expanded twice.
+        
+        Args:
+            query: Search query string
+            fuzzy: Whether free text words are expanded to their variants
+            
+        Returns:
+            Query plan with its estimated cost (candidate documents times the cost of
+            testing one of them) under "cost", or None for an empty query
+            
+        Raises:
+            ValueError: If the query has an invalid or too expensive pattern
+        """
+        if not query:
+            return None
+        return await self._run(self._plan, query, fuzzy)
+    
+    def _plan(self, query: str, fuzzy: bool) -> Dict[str, Any]:
+        """Build the query plan of a search, with its estimated cost."""
+        plan = self._build_query(query, fuzzy)
+        plan["cost"] = self.repository.estimate_cost(plan["search_query"])
+        return plan
+    
+    @staticmethod
+    async def _run(func: Callable[..., T], *args: Any) -> T:
+        """Run CPU bound work in the executor, within the caller's context and request profile."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(contextvars.copy_context().run, profiled, func, *args)
+        )
+    
+    def _search_page(
+        self,
+        query: str,
+        page: int,
+        limit: int,
+        result_fields: List[str],
+        fuzzy: bool,
+        count_mode: str,
+        plan: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Run a validated search and return its page of results."""
+        plan = plan or self._build_query(query, fuzzy)
+        search_query = plan["search_query"]
+        self._record_plan(query, plan, page=page, limit=limit, count_mode=count_mode)
         
         # This specifies which fields to include in the output.
         # A value of 1 means 'include'. This simulates MongoDB's projection feature.
-        projection = {
-            "document_id": 1,
-            "description": 1,
-            "document_date": 1,
-            "document_type": 1,
-            "file_path": 1,
-            "source": 1,
-            "availability": 1
-        }
-        
-        # Get count for pagination
-        total_count = self.repository.count_documents(search_query)
+        projection = {field: 1 for field in result_fields}
         
         # Calculate offset
         offset = (page - 1) * limit
         
         # Query the repository with the constructed search query and projection.
-        # find_documents handles matching, sorting, pagination, and field filtering (projection).
-        paginated_results = self.repository.find_documents(
+        # find_page handles matching, pagination, field filtering (projection) and
+        # counting in a single newest-first scan, stopping early unless the count is exact.
+        result_page = self.repository.find_page(
             query=search_query,
             projection=projection,
             skip=offset,
             limit=limit,
+            count_mode=count_mode,
+            count_cap=settings.search_count_cap,
+            sample_size=settings.search_count_sample
+        )
+
+        return self._paginated_response(
+            query, page, limit, result_page["total_count"], result_page["documents"], plan,
+            count_exact=result_page["count_exact"], has_more=result_page["has_more"]
+        )
+    
+    async def search_many(
+        self,
+        searches: List[Dict[str, Any]],
+        prepared: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several searches, matching all of their queries in one pass over the corpus.
+        
+        Identical subqueries are evaluated once, and subqueries sharing the same query
+        (ex: different pages) share the same matches.
+        
+        Args:
+            searches: List of dictionaries with query, page, limit and optional fields and fuzzy
+            prepared: The same searches prepared by prepare_many, prepared here if not provided
+            
+        Returns:
+            List of search responses, in the same order as the searches
+            
+        Raises:
+            ValueError: If a search is malformed or requests an unknown field
+        """
+        if prepared is None:
+            prepared = await self.prepare_many(searches)
+        return await self._run(self._search_many, prepared["searches"], prepared["plans"])
+    
+    async def prepare_many(self, searches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate several searches and build the plan of each distinct query, off the event loop.
+        
+        Args:
+            searches: List of dictionaries with query, page, limit and optional fields and fuzzy
+            
+        Returns:
+            Dictionary with the normalized searches, the plans by (query, fuzzy)
+            and their total estimated cost
+            
+        Raises:
+            ValueError: If a search is malformed, requests an unknown field
+                or has an invalid or too expensive pattern
+        """
+        normalized = []
+        for search in searches:
+            if not isinstance(search, dict):
+                raise ValueError("Each search must be an object with a query")
+            page = int(search.get("page", 1))
+            limit = int(search.get("limit", 50))
+            if page < 1 or limit < 1:
+                raise ValueError("page and limit must be positive")
+            normalized.append((
+                " ".join(str(search.get("query") or "").split()),
+                page,
+                limit,
+                tuple(self.resolve_fields(search.get("fields"))),
+                bool(search.get("fuzzy", False))
+            ))
+        
+        plans = await self._run(self._plan_many, normalized)
+        return {
+            "searches": normalized,
+            "plans": plans,
+            "cost": sum(plan["cost"] for plan in plans.values())
+        }
+    
+    def _plan_many(self, normalized: List[Tuple[Any, ...]]) -> Dict[Tuple[str, bool], Dict[str, Any]]:
+        """Build the plan of each distinct (query, fuzzy) of validated searches, once."""
+        plans: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+        for query, _, _, _, fuzzy in normalized:
+            if query and (query, fuzzy) not in plans:
+                plans[(query, fuzzy)] = self._plan(query, fuzzy)
+        return plans
+    
+    def _search_many(
+        self,
+        normalized: List[Tuple[Any, ...]],
+        built_queries: Dict[Tuple[str, bool], Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Run validated (query, page, limit, fields, fuzzy) searches in one shared pass."""
+        for query, fuzzy in built_queries:
+            self._record_plan(query, built_queries[(query, fuzzy)])
+        
+        # Single shared pass over the corpus for every distinct query
+        distinct_queries = list(built_queries)
+        matches = dict(zip(distinct_queries, self.repository.find_documents_many(
+            [built_queries[query]["search_query"] for query in distinct_queries],
             sort_key="document_date",
             reverse=True  # newest first
+        )))
+        
+        responses: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for key in normalized:
+            if key in responses:
+                continue
+            query, page, limit, result_fields, fuzzy = key
+            if not query:
+                responses[key] = self._empty_results(page, limit)
+                continue
+            
+            matched_docs = matches[(query, fuzzy)]
+            offset = (page - 1) * limit
+            paginated_results = self.repository.project_documents(
+                matched_docs[offset : offset + limit],
+                {field: 1 for field in result_fields}
+            )
+            responses[key] = self._paginated_response(
+                query, page, limit, len(matched_docs), paginated_results, built_queries[(query, fuzzy)]
+            )
+        
+        return [responses[key] for key in normalized]
+    
+    def iter_search_results(
+        self,
+        query: str,
+        fields: Optional[Iterable[str]] = None,
+        fuzzy: bool = False,
+        plan: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every document matching a search query, newest first.
+        
+        The candidates are scanned as the iterator is consumed, within
+        settings.query_time_budget of scanning time.
+        
+        Args:
+            query: Search query string
+            fields: Fields to include in each result, defaults to DEFAULT_RESULT_FIELDS
+            fuzzy: Also match free text words with typos or transliteration variants
+            plan: Query plan of the same query from prepare, built here if not provided
+            
+        Returns:
+            Iterator over the matching documents
+            
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        projection = {field: 1 for field in self.resolve_fields(fields)}
+        if not query:
+            return iter(())
+        
+        plan = plan or self._build_query(query, fuzzy)
+        self._record_plan(query, plan)
+        return self.repository.iter_documents(plan["search_query"], projection, settings.query_time_budget)
+    
+    def suggest(self, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Get typeahead completions for a partially typed query.
+        
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Dictionary with the prefix and its suggestions
+        """
+        return {
+            "query": prefix,
+            "suggestions": self.repository.store.suggest_index.suggest(prefix, limit)
+        }
+    
+    def _build_query(self, query: str, fuzzy: bool = False) -> Dict[str, Any]:
+        """
+        Parse a search query and build the repository query.
+        
+        With fuzzy, the free text words are expanded through the term index into
+        the documents containing close variants, which are matched in addition
+        to the regular free text match.
+        
+        Args:
+            query: Search query string
+            fuzzy: Expand free text words to their typo-tolerant variants
+            
+        Returns:
+            Query plan with metadatastore_filters, free_text, search_query,
+            the displayable query and the fuzzy term expansions
+        """
+        # Parse the search query
+        with stage("parse"):
+            metadatastore_filters, free_text = self.query_parser.parse_search_query(query)
+        
+        # Build the MongoDB-style query (which repository matches in memory)
+        with stage("build"):
+            search_query = self.query_builder.build_metadatastore_query(metadatastore_filters, free_text)
+        display_query = search_query
+        
+        fuzzy_terms: Dict[str, List[str]] = {}
+        if fuzzy and free_text:
+            with stage("fuzzy"):
+                fuzzy_document_ids, fuzzy_terms = self.repository.store.term_index.match_text(
+                    free_text, settings.fuzzy_max_terms, settings.fuzzy_max_expansions
+                )
+                search_query = self.query_builder.build_metadatastore_query(
+                    metadatastore_filters, free_text, fuzzy_document_ids
+                )
+        
+        return {
+            "metadatastore_filters": metadatastore_filters,
+            "free_text": free_text,
+            "search_query": search_query,
+            "display_query": display_query,
+            "fuzzy_terms": fuzzy_terms
+        }
+    
+    @staticmethod
+    def _record_plan(query: str, plan: Dict[str, Any], **options: Any) -> None:
+        """Record a query and its compiled plan for the slow query log."""
+        record_query(
+            query=" ".join(query.split()),
+            plan=str(plan["search_query"]),
+            fuzzy_terms=plan["fuzzy_terms"],
+            **options
         )
-
+    
+    def _paginated_response(
+        self,
+        query: str,
+        page: int,
+        limit: int,
+        total_count: int,
+        paginated_results: List[Dict[str, Any]],
+        plan: Dict[str, Any],
+        count_exact: bool = True,
+        has_more: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Return the search response structure for a page of results."""
+        offset = (page - 1) * limit
+        
         # Pagination metadata
         total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
-        has_next = page < total_pages
+        has_next = page < total_pages if has_more is None else has_more
         has_prev = page > 1
         
-        return {
+        response = {
             "results": paginated_results,
             "pagination": {
                 "current_page": page,
@@ -89,16 +426,45 @@ class SearchService:
                 "has_next": has_next,
                 "has_prev": has_prev,
                 "start_index": offset + 1 if total_count > 0 else 0,
-                "end_index": min(offset + len(paginated_results), total_count)
+                "end_index": min(offset + len(paginated_results), total_count),
+                "count_exact": count_exact
             },
             "query_info": {
                 "parsed_query": query,
                 "target_collections": "global_metadata",
-                "filters_applied": len(metadatastore_filters),
-                "has_free_text": bool(free_text),
-                "search_query": str(search_query) 
+                "filters_applied": len(plan["metadatastore_filters"]),
+                "has_free_text": bool(plan["free_text"]),
+                "search_query": str(plan["display_query"]) 
             }
         }
+        if plan["fuzzy_terms"]:
+            response["query_info"]["fuzzy_terms"] = plan["fuzzy_terms"]
+        return response
+    
+    def get_documents(self, document_ids: List[str], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Get documents by exact document number.
+        
+        Args:
+            document_ids: Document numbers to fetch
+            fields: Fields to include in each document, defaults to DEFAULT_RESULT_FIELDS
+            
+        Returns:
+            Dictionary with the found documents in request order and the missing IDs
+            
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        projection = {field: 1 for field in self.resolve_fields(fields)}
+        document_ids = [str(document_id).strip() for document_id in document_ids]
+        documents = self.repository.get_documents(document_ids, projection)
+        
+        return {
+            "documents": [doc for doc in documents if doc is not None],
+            "missing": [
+                document_id for document_id, doc in zip(document_ids, documents) if doc is None
+            ]
+        }
     
     def _empty_results(self, page: int, limit: int) -> Dict[str, Any]:
         """Return empty results structure."""
@@ -110,6 +476,7 @@ class SearchService:
                 "total_count": 0,
                 "limit": limit,
                 "has_next": False,
-                "has_prev": False
+                "has_prev": False,
+                "count_exact": True
             }
         }
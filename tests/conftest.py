@@ -49,3 +49,64 @@ def mock_metadata_store():
 @pytest.fixture
 def client(mock_metadata_store):
     return TestClient(app)
+
+
+class FakeQueryAPIClient:
+    """In-memory stand-in for the Query API graph"""
+
+    def __init__(self):
+        self.names = {
+            "1895-18_doc_1": "1895-18",
+            "1947-44_doc_2": "1947-44",
+            "2056-34_doc_3": "2056-34",
+            "9999-99_doc_4": "9999-99",
+        }
+        self.relations = {
+            "1895-18_doc_1": [
+                {"relatedEntityId": "1947-44_doc_2", "name": "AMENDS", "direction": "OUTGOING"},
+            ],
+            "1947-44_doc_2": [
+                {"relatedEntityId": "1895-18_doc_1", "name": "AMENDS", "direction": "INCOMING"},
+                {"relatedEntityId": "2056-34_doc_3", "name": "AMENDS", "direction": "OUTGOING"},
+            ],
+            "2056-34_doc_3": [
+                {"relatedEntityId": "1947-44_doc_2", "name": "AMENDS", "direction": "INCOMING"},
+                {"relatedEntityId": "9999-99_doc_4", "name": "REFERS", "direction": "OUTGOING"},
+            ],
+            "9999-99_doc_4": [
+                {"relatedEntityId": "2056-34_doc_3", "name": "REFERS", "direction": "INCOMING"},
+            ],
+        }
+        self.calls = []
+
+    def search_entity(self, document_id, kind_major="Document", kind_minor=""):
+        self.calls.append(("search_entity", document_id))
+        for entity_id, name in self.names.items():
+            if name == document_id:
+                return entity_id
+        return None
+
+    def get_entity_by_id(self, entity_id):
+        self.calls.append(("get_entity_by_id", entity_id))
+        return self.names.get(entity_id)
+
+    def get_entity_relations(self, entity_id):
+        self.calls.append(("get_entity_relations", entity_id))
+        return self.relations.get(entity_id, [])
+
+
+@pytest.fixture
+def fake_query_api():
+    return FakeQueryAPIClient()
+
+
+@pytest.fixture
+def document_client(client, fake_query_api):
+    from api.dependencies import get_document_service, get_document_repository
+    from services.cache_service import CacheService
+    from services.document_service import DocumentService
+
+    service = DocumentService(fake_query_api, get_document_repository(), CacheService())
+    app.dependency_overrides[get_document_service] = lambda: service
+    yield client
+    app.dependency_overrides.pop(get_document_service, None)
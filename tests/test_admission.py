@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from main import app
+from api.admission import AdmissionController, AdmissionLane, AdmittedStreamingResponse, Overloaded
+from api.dependencies import get_admission_controller
+
+
+def make_lane(name, concurrency=1, queue_size=1, queue_timeout=1.0):
+    return AdmissionLane(name, concurrency, queue_size, queue_timeout, retry_after=3)
+
+
+def test_lane_queues_then_sheds():
+    async def scenario():
+        lane = make_lane("search")
+        await lane.acquire()
+
+        # One request may wait for the slot, the next is rejected at once
+        waiter = asyncio.ensure_future(lane.acquire())
+        await asyncio.sleep(0)
+        assert lane.stats()["waiting"] == 1
+        with pytest.raises(Overloaded):
+            await lane.acquire()
+
+        lane.release()
+        await waiter
+        assert lane.stats()["active"] == 1
+        lane.release()
+        return lane.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["active"], stats["waiting"], stats["admitted"], stats["rejected"]) == (0, 0, 2, 1)
+
+
+def test_lane_wait_times_out():
+    async def scenario():
+        lane = make_lane("search", queue_timeout=0.01)
+        await lane.acquire()
+        with pytest.raises(Overloaded):
+            await lane.acquire()
+        return lane.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["waiting"], stats["rejected"]) == (0, 1)
+
+
+def test_streamed_slot_released_on_disconnect():
+    async def scenario():
+        lane = make_lane("relations")
+        await lane.acquire()
+        response = AdmittedStreamingResponse(lane, iter(["first", "second"]))
+
+        async def receive():
+            await asyncio.sleep(1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # The client is gone before the first chunk
+            raise OSError("disconnected")
+
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        return lane.stats()
+
+    assert asyncio.run(scenario())["active"] == 0
+
+
+def test_export_holds_expensive_slot(client: TestClient):
+    lanes = {
+        "search": make_lane("search", concurrency=0),
+        "search_expensive": make_lane("search_expensive", queue_size=0),
+        "relations": make_lane("relations", concurrency=0),
+    }
+    app.dependency_overrides[get_admission_controller] = lambda: AdmissionController(lanes)
+    try:
+        response = client.get("/search/export", params={"query": "type:legal"})
+        assert response.status_code == 200
+        assert lanes["search_expensive"].stats()["active"] == 0
+        assert lanes["search_expensive"].stats()["admitted"] == 1
+
+        asyncio.run(lanes["search_expensive"].acquire())
+        response = client.get("/search/export", params={"query": "type:legal"})
+        assert response.status_code == 503
+        assert response.json()["lane"] == "search_expensive"
+    finally:
+        app.dependency_overrides.pop(get_admission_controller, None)
+
+
+def test_full_lane_returns_503(client: TestClient, monkeypatch):
+    from config.settings import settings
+    monkeypatch.setattr(settings, "admission_expensive_cost", 10)
+
+    lanes = {
+        "search": make_lane("search", concurrency=0),
+        "search_expensive": make_lane("search_expensive", queue_size=0),
+        "relations": make_lane("relations", concurrency=0),
+    }
+    asyncio.run(lanes["search_expensive"].acquire())
+    app.dependency_overrides[get_admission_controller] = lambda: AdmissionController(lanes)
+    try:
+        # Three candidates against three regex patterns: expensive
+        response = client.post("/search", json={"query": "type:. status:."})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert response.json()["lane"] == "search_expensive"
+
+        # An exact lookup stays in the cheap lane
+        response = client.post("/search", json={"query": 'id:"1895-18"'})
+        assert response.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_admission_controller, None)
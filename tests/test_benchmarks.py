@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import check_baseline, check_thresholds
+from benchmarks.scenarios import BenchmarkContext, run_scenarios
+from database.records import validate_fields
+from services.metadata_store import MetadataStore
+
+
+@pytest.fixture
+def restore_store():
+    store = MetadataStore()
+    documents = store.documents
+    yield
+    store.load_documents([dict(doc) for doc in documents])
+
+
+def test_corpus_is_reproducible():
+    corpus = generate_corpus(300, seed=7)
+    assert corpus == generate_corpus(300, seed=7)
+    assert corpus != generate_corpus(300, seed=8)
+    assert len({doc["document_id"] for doc in corpus}) == 300
+    for doc in corpus:
+        assert validate_fields(doc) == doc
+        assert (doc["availability"] == "Available") == (doc["document_type"] != "UNAVAILABLE")
+
+
+def test_scenarios_smoke(restore_store):
+    context = BenchmarkContext(generate_corpus(300, seed=7))
+    try:
+        results = run_scenarios(context, repeat=1, names=["search_type", "search_fuzzy", "dashboard", "memory"])
+    finally:
+        context.close()
+    assert set(results) == {"search_type", "search_fuzzy", "dashboard", "memory"}
+    assert results["search_type"]["runs"] == 1
+    assert results["memory"]["bytes_per_document"] > 0
+
+
+def test_regression_checks():
+    results = {"10000": {"search_type": {"median_ms": 30.0}, "memory": {"bytes_per_document": 900.0}}}
+    assert check_thresholds(results, {"10000": {"search_type": {"median_ms": 50}}}) == []
+    assert len(check_thresholds(results, {"10000": {"search_type": {"median_ms": 20}}})) == 1
+    # Sizes or scenarios missing from the run aren't checked
+    assert check_thresholds(results, {"100000": {"search_type": {"median_ms": 1}}}) == []
+
+    baseline = {"10000": {"search_type": {"median_ms": 20.0}, "memory": {"bytes_per_document": 880.0}}}
+    failures = check_baseline(results, baseline, tolerance=0.25)
+    assert len(failures) == 1 and failures[0].startswith("search_type at 10000 documents")
@@ -0,0 +1,155 @@
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+from services.cache_backends import SQLiteCacheBackend, create_cache_backend
+from services.cache_service import CacheService
+
+
+def test_lru_eviction_and_stats():
+    cache = CacheService(ttl=60, max_entries=2, max_bytes=0, namespace_ttls={}, sweep_interval=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" becomes least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_max_bytes_limit():
+    cache = CacheService(ttl=60, max_entries=0, max_bytes=2000, namespace_ttls={}, sweep_interval=0)
+    for i in range(10):
+        cache.set(f"key{i}", "x" * 500)
+    stats = cache.stats()
+    assert 0 < stats["bytes"] <= 2000
+    assert cache.get("key9") is not None
+    assert cache.get("key0") is None
+
+
+def test_namespace_ttls_and_sweep():
+    cache = CacheService(ttl=60, max_entries=0, max_bytes=0, namespace_ttls={"short": 1},
+                         sweep_interval=0, stale_ttl=0)
+    assert cache.ttl_for("short:key") == 1
+    assert cache.ttl_for("other:key") == 60
+    assert cache.ttl_for("dashboard_data") == 60
+
+    cache.set("short:key", "value")
+    cache.set("long:key", "value")
+    cache.backend.set("short:key", "value", time.time() - 1, time.time() - 1)
+
+    assert cache.sweep() == 1
+    assert cache.get("long:key") == "value"
+    assert cache.stats()["expirations"] == 1
+
+
+def _expire(cache: CacheService, key: str) -> None:
+    entry = cache.backend.get(key)
+    cache.backend.set(key, entry.value, time.time() - 1, entry.stale_until)
+
+
+def test_explicit_zero_ttl_expires_at_once():
+    cache = CacheService(ttl=60, max_entries=0, max_bytes=0, namespace_ttls={}, sweep_interval=0, stale_ttl=0)
+    cache.set("key", "value", ttl=0)
+    assert cache.get("key") is None
+
+
+def test_get_or_compute_single_flight():
+    cache = CacheService(ttl=60, max_entries=0, max_bytes=0, namespace_ttls={}, sweep_interval=0)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"total_docs": len(calls)}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("dashboard_data", compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"total_docs": 1}] * 8
+
+
+def test_get_or_compute_serves_stale_while_revalidating():
+    cache = CacheService(ttl=60, max_entries=0, max_bytes=0, namespace_ttls={}, sweep_interval=0, stale_ttl=60)
+    cache.set("dashboard_data", "old")
+    _expire(cache, "dashboard_data")
+    assert cache.get("dashboard_data") is None
+
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return "new"
+
+    assert cache.get_or_compute("dashboard_data", compute) == "old"
+    assert cache.get_or_compute("dashboard_data", compute) == "old"
+    release.set()
+    cache.refresh_executor.shutdown(wait=True)
+
+    assert len(calls) == 1
+    assert cache.get_or_compute("dashboard_data", compute) == "new"
+
+
+def test_sqlite_backend_shared_between_caches(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = CacheService(ttl=60, namespace_ttls={}, sweep_interval=0, backend=SQLiteCacheBackend(path, max_entries=2))
+    second = CacheService(ttl=60, namespace_ttls={}, sweep_interval=0, backend=SQLiteCacheBackend(path, max_entries=2))
+
+    first.set("dashboard_data", {"total_docs": 3, "document_types": ["Organisational"]})
+    assert second.get("dashboard_data") == {"total_docs": 3, "document_types": ["Organisational"]}
+
+    second.set("a", 1)
+    first.get("dashboard_data")
+    second.set("b", 2)  # evicts "a", the least recently used
+    assert first.get("a") is None
+    assert first.get("dashboard_data") is not None
+
+    _expire(first, "b")
+    assert second.get("b") is None
+    assert second.get_or_compute("b", lambda: 3) == 2  # stale value while revalidating
+
+
+def test_sqlite_backend_requires_private_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    backend = create_cache_backend("sqlite")
+    directory = tmp_path / "cache" / "gztarchiver"
+    assert backend.path == str(directory / "cache.sqlite3")
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(backend.path).st_mode) == 0o600
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(ValueError):
+        SQLiteCacheBackend(str(shared / "cache.sqlite3"))
+
+
+def test_sqlite_backend_hits_are_read_only(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=100)
+    for key in "abc":
+        backend.set(key, key, expires_at=2e9, stale_until=2e9)
+    connection = backend._connection()
+    changes = connection.total_changes
+    assert backend.get("c").value == "c"
+    assert backend.get("b").value == "b"
+    assert connection.total_changes == changes
@@ -1,5 +1,13 @@
+import asyncio
+import threading
+
 from fastapi.testclient import TestClient
 
+from database.repository import DocumentRepository
+from services.cache_backends import MemoryCacheBackend
+from services.cache_service import CacheService
+from services.dashboard_service import DashboardService
+
 def test_get_dashboard_status(client: TestClient):
     response = client.get("/dashboard-status")
     assert response.status_code == 200
@@ -14,3 +22,44 @@ def test_get_dashboard_status(client: TestClient):
     # Check years covered (2015, 2016, 2018) -> min 2015, max 2018
     assert data["years_covered"]["from"] == 2015
     assert data["years_covered"]["to"] == 2018
+
+
+def test_dashboard_breakdowns(client: TestClient):
+    data = client.get("/dashboard-status").json()
+
+    assert data["type_counts"] == {"Legal Regulatory": 1, "Organisational": 1, "Unavailable": 1}
+    assert data["year_counts"] == {"2015": 1, "2016": 1, "2018": 1}
+    assert data["month_counts"]["2018-02"] == 1
+    assert data["availability_by_year"]["2018"] == {"available": 0, "unavailable": 1}
+    assert data["dataset_version"]
+
+
+def test_dashboard_conditional_requests(client: TestClient):
+    response = client.get("/dashboard-status")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public")
+
+    response = client.get("/dashboard-status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/dashboard-status", headers={"If-Modified-Since": response.headers["last-modified"]})
+    assert response.status_code == 304
+
+    response = client.get("/dashboard-status", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_dashboard_computed_off_event_loop(mock_metadata_store):
+    service = DashboardService(DocumentRepository(), CacheService(sweep_interval=0, backend=MemoryCacheBackend()))
+    compute = service.compute_dashboard_status
+    threads = []
+
+    def compute_in_thread():
+        threads.append(threading.get_ident())
+        return compute()
+
+    service.compute_dashboard_status = compute_in_thread
+    data = asyncio.run(service.get_dashboard_status())
+    assert data["total_docs"] == 3
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,150 @@
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_document_graph_traversal(document_client: TestClient):
+    response = document_client.post("/document-graph/1895-18_doc_1", params={"depth": 3})
+    assert response.status_code == 200
+    data = response.json()
+
+    nodes = {node["id"]: node for node in data["nodes"]}
+    assert set(nodes) == {"1895-18_doc_1", "1947-44_doc_2", "2056-34_doc_3", "9999-99_doc_4"}
+    assert nodes["2056-34_doc_3"]["depth"] == 2
+    assert nodes["9999-99_doc_4"]["document_number"] == "9999-99"
+
+    # Relations reported from both ends are returned once
+    assert len(data["edges"]) == 3
+    assert {"source": "1895-18_doc_1", "target": "1947-44_doc_2", "name": "AMENDS"} in data["edges"]
+    assert data["truncated"] is False
+
+
+def test_document_graph_respects_limits(document_client: TestClient):
+    response = document_client.post("/document-graph/1895-18_doc_1", params={"depth": 1})
+    data = response.json()
+    assert {node["id"] for node in data["nodes"]} == {"1895-18_doc_1", "1947-44_doc_2"}
+
+    response = document_client.post("/document-graph/1895-18_doc_1", params={"depth": 3, "max_nodes": 2})
+    data = response.json()
+    assert len(data["nodes"]) == 2
+    assert len(data["edges"]) == 1
+    assert data["truncated"] is True
+
+
+def test_document_relationships_resolved_locally(document_client: TestClient, fake_query_api):
+    response = document_client.post("/document-rel/2056-34_doc_3")
+    assert response.status_code == 200
+    relationships = {rel["relatedEntityId"]: rel for rel in response.json()}
+
+    # Known gazettes are resolved and enriched from the metadata store
+    local = relationships["1947-44_doc_2"]
+    assert local["document_number"] == "1947-44"
+    assert local["document_date"] == "2016-01-01"
+    assert local["document_type"] == "LEGAL_REGULATORY"
+    assert local["availability"] == "Available"
+
+    # Only ids missing from the store go upstream
+    assert relationships["9999-99_doc_4"]["document_number"] == "9999-99"
+    name_lookups = [entity_id for call, entity_id in fake_query_api.calls if call == "get_entity_by_id"]
+    assert name_lookups == ["9999-99_doc_4"]
+
+    # ...and are remembered for later requests
+    document_client.post("/document-rel/2056-34_doc_3")
+    name_lookups = [entity_id for call, entity_id in fake_query_api.calls if call == "get_entity_by_id"]
+    assert name_lookups == ["9999-99_doc_4"]
+
+
+def test_document_relationships_stream(document_client: TestClient):
+    response = document_client.post("/document-rel/2056-34_doc_3", params={"stream": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["event"] == "relationships"
+    assert len(events[0]["data"]) == 2
+    enriched = {e["data"]["relatedEntityId"]: e["data"] for e in events if e["event"] == "relationship"}
+    assert enriched["1947-44_doc_2"]["document_type"] == "LEGAL_REGULATORY"
+    assert enriched["9999-99_doc_4"]["document_number"] == "9999-99"
+    assert events[-1] == {"event": "end", "data": {"count": 2}}
+
+    response = document_client.post("/document-rel/2056-34_doc_3", params={"stream": "sse"})
+    assert response.text.startswith("event: relationships\ndata: ")
+
+
+def test_relationship_warmer_prefetches(document_client: TestClient, fake_query_api, monkeypatch):
+    from api.dependencies import get_document_repository, get_document_service
+    from config.settings import settings
+    from services.relationship_warmer import RelationshipWarmer
+    from main import app
+
+    monkeypatch.setattr(settings, "warmup_rate", 0)
+    service = app.dependency_overrides[get_document_service]()
+    service.is_document_available("9999-99")
+    warmer = RelationshipWarmer(service, get_document_repository())
+
+    # Newest gazettes first, then the most requested ones
+    assert warmer.select_documents() == ["2056-34", "1947-44", "1895-18", "9999-99"]
+
+    summary = warmer.warm()
+    assert summary["documents"] == 4
+
+    fake_query_api.calls.clear()
+    response = document_client.post("/document-rel/2056-34_doc_3")
+    assert len(response.json()) == 2
+    assert fake_query_api.calls == []
+
+
+def test_get_document_by_id(client: TestClient):
+    response = client.get("/documents/1947-44")
+    assert response.status_code == 200
+    assert response.json()["document_type"] == "LEGAL_REGULATORY"
+
+    # Exact match only, unlike the id: search filter
+    assert client.get("/documents/1947").status_code == 404
+
+
+def test_get_documents_batch(client: TestClient):
+    payload = {"ids": ["2056-34", "0000-00", "1895-18"], "fields": ["document_id", "document_date"]}
+    response = client.post("/documents", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["documents"] == [
+        {"document_id": "2056-34", "document_date": "2018-02-01"},
+        {"document_id": "1895-18", "document_date": "2015-01-01"},
+    ]
+    assert data["missing"] == ["0000-00"]
+
+    assert client.post("/documents", json={"ids": "1895-18"}).status_code == 400
+
+
+def test_prefetch_uses_bounded_cache(fake_query_api, mock_metadata_store):
+    from api.dependencies import get_document_repository
+    from services.cache_backends import MemoryCacheBackend
+    from services.cache_service import CacheService
+    from services.document_service import DocumentService
+
+    cache = CacheService(sweep_interval=0, backend=MemoryCacheBackend())
+    service = DocumentService(fake_query_api, get_document_repository(), cache)
+    assert service.prefetch_document("2056-34") == 3
+
+    # One lookup per key: the entity, its relations and the unknown related entity
+    assert cache.misses == 3
+    assert cache.get("entity_document:9999-99_doc_4") == "9999-99"
+    assert service.prefetch_document("2056-34") == 0
+
+
+def test_access_counts_only_known_and_bounded(document_client: TestClient, monkeypatch):
+    from api.dependencies import get_document_service
+    from config.settings import settings
+    from main import app
+
+    service = app.dependency_overrides[get_document_service]()
+    for n in range(3):
+        document_client.post(f"/document/crawler-{n}")
+    assert service.most_requested_documents(10) == []
+
+    monkeypatch.setattr(settings, "warmup_tracked_documents", 2)
+    for document_id in ("1895-18", "1895-18", "1947-44", "2056-34"):
+        document_client.post(f"/document/{document_id}")
+    assert len(service.access_counts) <= 2
+    assert service.most_requested_documents(1) == ["1895-18"]
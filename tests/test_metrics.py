@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from clients.query_api_client import ENTITY_PATH
+from utils.metrics import MetricsRegistry
+
+
+def test_server_timing_header(client: TestClient):
+    response = client.post("/search", json={"query": "type:. colombo"})
+    assert response.status_code == 200
+    stages = [item.split(";")[0] for item in response.headers["Server-Timing"].split(", ")]
+    assert {"parse", "build", "find", "project", "total"} <= set(stages)
+    assert stages[-1] == "total"
+
+
+def test_metrics_endpoint(client: TestClient):
+    client.post("/search", json={"query": "colombo"})
+    client.get("/dashboard-status")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'gztarchiver_stage_duration_seconds_bucket{stage="find",le="+Inf"}' in body
+    assert 'gztarchiver_http_request_duration_seconds_count{method="POST",route="/search",status="200"}' in body
+    assert "gztarchiver_dataset_documents 3" in body
+    assert 'gztarchiver_dataset_info{version="' in body
+    assert 'gztarchiver_admission_active{lane="relations"}' in body
+    assert "gztarchiver_cache_hit_ratio" in body
+
+
+def test_histogram_rendering():
+    registry = MetricsRegistry()
+    registry.observe("example_seconds", 0.003, stage="find")
+    registry.observe("example_seconds", 20, stage="find")
+    lines = registry.render()
+    assert 'gztarchiver_example_seconds_bucket{stage="find",le="0.0025"} 0' in lines
+    assert 'gztarchiver_example_seconds_bucket{stage="find",le="0.005"} 1' in lines
+    assert 'gztarchiver_example_seconds_bucket{stage="find",le="+Inf"} 2' in lines
+    assert 'gztarchiver_example_seconds_count{stage="find"} 2' in lines
+
+
+def test_upstream_endpoint_labels():
+    assert ENTITY_PATH.sub("{id}", "/v1/entities/1895-18_doc_1/relations") == "/v1/entities/{id}/relations"
+    assert ENTITY_PATH.sub("{id}", "/v1/entities/search") == "/v1/entities/search"
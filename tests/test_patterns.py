@@ -0,0 +1,51 @@
+import pytest
+
+from core.errors import QueryError
+from core.patterns import EXACT, LITERAL, PREFIX, REGEX, SUFFIX, classify_pattern, compile_pattern
+
+
+def test_classify_pattern():
+    assert classify_pattern("Colombo Consumer") == (LITERAL, "Colombo Consumer")
+    assert classify_pattern("^2015") == (PREFIX, "2015")
+    assert classify_pattern("^2015-01-31$") == (EXACT, "2015-01-31")
+    assert classify_pattern(r"D/S\.$") == (SUFFIX, "D/S.")
+    assert classify_pattern(r"\d{4}") == (REGEX, r"\d{4}")
+    assert classify_pattern("type.") == (REGEX, "type.")
+
+
+def test_compile_pattern_literals_ignore_case():
+    pattern = compile_pattern("Colombo", ignore_case=True)
+    assert pattern.lowercase
+    assert pattern.test("port of colombo")
+    assert not compile_pattern("Colombo").test("port of colombo")
+
+
+def test_compile_pattern_guards():
+    with pytest.raises(QueryError):
+        compile_pattern("(a+)+")
+    with pytest.raises(QueryError):
+        compile_pattern(r"(\w)\1")
+    with pytest.raises(QueryError):
+        compile_pattern("[unclosed")
+    with pytest.raises(QueryError):
+        compile_pattern("a." * 200, max_length=256)
+    assert compile_pattern("a" * 400).kind == LITERAL
+
+
+@pytest.mark.parametrize("pattern", [
+    "(a|a)*$",
+    "(.*a){12}$",
+    "^(a?){25}a{25}$",
+    "(.|.)*@",
+    "(a+)+",
+    r"(\w*){2,}",
+    "(?P<x>a)(?P=x)",
+])
+def test_compile_pattern_rejects_backtracking(pattern):
+    with pytest.raises(QueryError):
+        compile_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", ["order.*act", r"\d{4}-\d{2}", "(colombo|kandy)", "(ab)+", "[a-z]+ [0-9]{2,}", "(a{2})+"])
+def test_compile_pattern_accepts_linear_patterns(pattern):
+    assert compile_pattern(pattern).kind == REGEX
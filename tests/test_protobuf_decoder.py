@@ -0,0 +1,52 @@
+import binascii
+import json
+
+from google.protobuf.wrappers_pb2 import StringValue
+
+from utils.protobuf_decoder import FAST_PATH_ENABLED, decode_many, decode_protobuf
+
+
+def _reference_decode(decoded_bytes: bytes) -> str:
+    """Original decoder behaviour, kept as the oracle for the fast path."""
+    sv = StringValue()
+    try:
+        sv.ParseFromString(decoded_bytes)
+        return sv.value.strip()
+    except Exception:
+        decoded_str = decoded_bytes.decode("utf-8", errors="ignore")
+        return ''.join(ch for ch in decoded_str if ch.isprintable()).strip()
+
+
+def _encode(raw: bytes) -> str:
+    return json.dumps({"typeUrl": "type.googleapis.com/google.protobuf.StringValue",
+                       "value": binascii.hexlify(raw).decode()})
+
+
+def test_fast_path_matches_protobuf():
+    assert FAST_PATH_ENABLED
+
+    payloads = [
+        StringValue(value=value).SerializeToString()
+        for value in ["2153-12", "  2153-12\n", "ගැසට් පත්‍රය", "வர்த்தமானி", "x" * 1000]
+    ]
+    payloads += [
+        b"\x0a\x03abc\x0a\x03xyz",    # repeated field, last one wins
+        b"\x12\x03abc",                # unknown field
+        b"\x0a\x05ab",                 # truncated
+        b"\x0a\x02\xff\xfe",           # invalid utf-8
+        b"\x0a\x80",                   # truncated varint
+    ]
+    for raw in payloads:
+        assert decode_protobuf(_encode(raw)) == _reference_decode(raw)
+
+
+def test_decode_errors_and_batch():
+    assert decode_protobuf('{"value": ""}') == ""
+    assert decode_protobuf("not json") == ""
+    assert decode_protobuf('{"value": "zz"}') == ""
+    assert decode_protobuf(None) == ""
+    assert decode_protobuf(5) == ""
+    assert decode_protobuf(["not", "hashable"]) == ""
+
+    names = [_encode(StringValue(value=v).SerializeToString()) for v in ["1895-18", "1947-44", "1895-18"]]
+    assert decode_many(names) == ["1895-18", "1947-44", "1895-18"]
@@ -0,0 +1,42 @@
+from core.query_ast import And, FieldEquals, FieldPattern, FieldPrefix, Not, Or, Phrase, Range, Term, has_relative_dates
+from core.query_parser import QueryParser
+
+
+def test_parse_syntax_tree():
+    tree = QueryParser.parse('type:"LEGAL_REGULATORY" -id:1895* "land acquisition" a OR b date:2015..2017')
+    assert tree == And((
+        FieldEquals("document_type", "LEGAL_REGULATORY"),
+        Not(FieldPrefix("document_id", "1895")),
+        Phrase("land acquisition"),
+        Or((Term("a"), Term("b"))),
+        Range("document_date", "2015", "2017"),
+    ))
+    # Parses are cached
+    assert QueryParser.parse("type:legal  x") is QueryParser.parse("type:legal x")
+
+
+def test_parse_search_query_keeps_legacy_filters():
+    assert QueryParser.parse_search_query("type:. Colombo  Consumer") == (
+        {"document_type": {"$regex": ".", "$options": "i"}},
+        "Colombo Consumer"
+    )
+    assert QueryParser.parse_search_query("date:2015-01 available:no") == (
+        {"document_date": {"$regex": "^2015-01", "$options": "i"}, "availability": {"$ne": "Available"}},
+        ""
+    )
+    assert QueryParser.parse_search_query("date:2015-01-31 unknown:x") == ({"document_date": "2015-01-31"}, "")
+    assert QueryParser.parse("status:gazette") == And((FieldPattern("availability", "gazette"),))
+
+
+def test_parse_search_query_structured_clauses():
+    filters, free_text = QueryParser.parse_search_query("colombo OR kandy date:2015..2017")
+    assert free_text == ""
+    assert filters["document_date"] == {"$gte": "2015", "$lt": "2018"}
+    assert [list(clause) for clause in filters["$and"]] == [["$or"]]
+
+
+def test_has_relative_dates():
+    assert has_relative_dates("land date:this-year")
+    assert has_relative_dates("-date:Last-7-Days")
+    assert not has_relative_dates("date:2019 last-year")
+    assert not has_relative_dates('date:"this-year" type:legal')
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from database.records import DocumentRecord, RecordEncoder, validate_fields
+
+
+@pytest.fixture
+def record_client(mock_metadata_store):
+    encoder = RecordEncoder()
+    mock_metadata_store.return_value = [encoder.encode(doc) for doc in mock_metadata_store.return_value]
+    return TestClient(app)
+
+
+def test_records_share_categorical_values(mock_metadata_store):
+    encoder = RecordEncoder()
+    first, second = (encoder.encode(doc) for doc in mock_metadata_store.return_value[:2])
+    assert isinstance(first, DocumentRecord)
+    assert first.availability is second.availability
+    assert first.source_prefix is second.source_prefix
+    assert first["source"] == "https://example.com/1895-18_E.pdf"
+    assert first.get("file_path") == "path/to/1895-18"
+    assert first.get("unknown", "default") == "default"
+    assert dict(first) == mock_metadata_store.return_value[0]
+    # Lowercased copies of the free text fields are kept on the record, not exposed as fields
+    assert first.description_lower == first.description.lower()
+    assert first.document_id_lower is first.document_id
+    assert "description_lower" not in first
+
+
+def test_validate_fields():
+    doc = {
+        "document_id": "1-1", "description": "x", "document_date": "2015-01-01",
+        "document_type": "T", "categorisation": "C", "source": "N/A", "availability": "Available",
+        "extra": "dropped"
+    }
+    assert validate_fields(doc)["file_path"] == ""
+    assert "extra" not in validate_fields(doc)
+    with pytest.raises(ValueError):
+        validate_fields({**doc, "document_date": 2015})
+    with pytest.raises(ValueError):
+        validate_fields({key: value for key, value in doc.items() if key != "description"})
+
+
+def test_search_over_records(record_client: TestClient):
+    data = record_client.post("/search", json={"query": "type:. colombo"}).json()
+    assert [doc["document_id"] for doc in data["results"]] == ["1895-18"]
+    assert data["results"][0]["source"] == "https://example.com/1895-18_E.pdf"
+
+    data = record_client.post("/search", json={"query": "HAMBANTHOTA"}).json()
+    assert [doc["document_id"] for doc in data["results"]] == ["2056-34"]
+    data = record_client.post("/search", json={"query": "type:legal"}).json()
+    assert [doc["document_id"] for doc in data["results"]] == ["1947-44"]
+
+    response = record_client.get("/documents/2056-34")
+    assert response.json()["file_path"] == "path/to/2056-34"
+
+    response = record_client.get("/dashboard-status")
+    assert response.status_code == 200
@@ -1,3 +1,6 @@
+import json
+import time
+
 from fastapi.testclient import TestClient
 
 def test_search_all(client: TestClient):
@@ -56,3 +59,237 @@ def test_search_pagination(client: TestClient):
     data = response.json()
     assert len(data["results"]) == 1
     assert data["pagination"]["current_page"] == 2
+
+def test_search_get_conditional_requests(client: TestClient):
+    response = client.get("/search", params={"query": "type:LEGAL_REGULATORY"})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+    etag = response.headers["etag"]
+
+    # Whitespace differences normalize to the same representation
+    response = client.get("/search", params={"query": " type:LEGAL_REGULATORY "}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/search", params={"query": "type:LEGAL_REGULATORY", "page": 2},
+                          headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+def test_search_relative_dates_revalidate_daily(client: TestClient, monkeypatch):
+    import datetime
+    import api.routes.search
+
+    response = client.get("/search", params={"query": "date:last-30-days"})
+    etag = response.headers["etag"]
+    assert client.get("/search", params={"query": "date:last-30-days"},
+                      headers={"If-None-Match": etag}).status_code == 304
+    # The dataset didn't change, but the results may have since midnight
+    assert client.get("/search", params={"query": "date:last-30-days"},
+                      headers={"If-Modified-Since": response.headers["last-modified"]}).status_code == 200
+
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date.today() + datetime.timedelta(days=1)
+
+    monkeypatch.setattr(api.routes.search, "date", Tomorrow)
+    response = client.get("/search", params={"query": "date:last-30-days"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    # Other queries still revalidate with If-Modified-Since
+    plain = client.get("/search", params={"query": "date:2016"})
+    assert client.get("/search", params={"query": "date:2016"},
+                      headers={"If-Modified-Since": plain.headers["last-modified"]}).status_code == 304
+
+
+def test_search_response_compression(client: TestClient):
+    payload = {"query": "type:."}
+    response = client.post("/search", json=payload, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["results"]) == 3
+
+    response = client.post("/search", json=payload, headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+
+    response = client.post("/search", json=payload, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["results"]) == 3
+
+
+def test_search_compressed_etags(client: TestClient):
+    params = {"query": "type:."}
+    plain = client.get("/search", params=params, headers={"Accept-Encoding": "identity"})
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+    compressed = client.get("/search", params=params, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    # Each copy revalidates with its own tag
+    response = client.get("/search", params=params,
+                          headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["etag"] == compressed.headers["etag"]
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    response = client.get("/search", params=params,
+                          headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["etag"] == plain.headers["etag"]
+
+def test_search_selected_fields(client: TestClient):
+    payload = {"query": "type:.", "fields": ["document_id", "document_date", "description"]}
+    response = client.post("/search", json=payload)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert all(set(result) == {"document_id", "document_date", "description"} for result in results)
+
+    response = client.get("/search", params={"query": "type:.", "fields": "document_id"})
+    assert response.json()["results"][0] == {"document_id": "2056-34"}
+
+    response = client.post("/search", json={"query": "type:.", "fields": ["password"]})
+    assert response.status_code == 400
+    assert client.post("/search", json={"query": "type:.", "fields": 5}).status_code == 400
+    assert client.post("/search/batch", json={"queries": [{"query": "a", "fields": {"x": 1}}]}).status_code == 400
+
+def test_search_batch(client: TestClient):
+    queries = [
+        {"query": "type:.", "limit": 1, "page": 2},
+        {"query": "date:2015"},
+        {"query": ""},
+        {"query": "type:.", "limit": 1, "page": 2},
+    ]
+    response = client.post("/search/batch", json={"queries": queries})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 4
+
+    single = client.post("/search", json=queries[0]).json()
+    assert results[0] == single
+    assert results[3] == single
+    assert results[1]["results"][0]["document_id"] == "1895-18"
+    assert results[2]["pagination"]["total_count"] == 0
+
+    response = client.post("/search/batch", json={"queries": [{"query": "x", "page": 0}]})
+    assert response.status_code == 400
+
+def test_search_export(client: TestClient):
+    response = client.get("/search/export", params={"query": "type:.", "fields": "document_id,document_date"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {"document_id": "2056-34", "document_date": "2018-02-01"},
+        {"document_id": "1947-44", "document_date": "2016-01-01"},
+        {"document_id": "1895-18", "document_date": "2015-01-01"},
+    ]
+
+    response = client.get("/search/export", params={"query": "available:yes", "format": "csv",
+                                                     "fields": "document_id,description"})
+    lines = response.text.splitlines()
+    assert lines[0] == "document_id,description"
+    assert len(lines) == 3
+    assert lines[1].startswith("1947-44,")
+
+def test_search_export_budget_excludes_client_time(client: TestClient, monkeypatch):
+    import database.repository
+    monkeypatch.setattr(database.repository, "BUDGET_CHECK_INTERVAL", 1)
+
+    # Reading the rows takes longer than the budget, scanning them doesn't
+    rows = database.repository.DocumentRepository().iter_documents({}, {"document_id": 1}, time_budget=0.05)
+    document_ids = []
+    for row in rows:
+        time.sleep(0.03)
+        document_ids.append(row["document_id"])
+    assert document_ids == ["2056-34", "1947-44", "1895-18"]
+
+
+def test_search_suggest(client: TestClient):
+    response = client.get("/search/suggest", params={"q": "1"})
+    assert response.status_code == 200
+    suggestions = response.json()["suggestions"]
+    assert [s["value"] for s in suggestions] == ["1947-44", "1895-18"]
+    assert all(s["kind"] == "document_id" for s in suggestions)
+
+    suggestions = client.get("/search/suggest", params={"q": "leg"}).json()["suggestions"]
+    assert suggestions[0] == {"value": "LEGAL_REGULATORY", "kind": "document_type", "weight": 1}
+
+    # Only terms appearing in at least two descriptions are suggested
+    suggestions = client.get("/search/suggest", params={"q": "hamb"}).json()["suggestions"]
+    assert suggestions == []
+    suggestions = client.get("/search/suggest", params={"q": "an"}).json()["suggestions"]
+    assert suggestions == [{"value": "and", "kind": "term", "weight": 2}]
+
+def test_search_fuzzy(client: TestClient):
+    payload = {"query": "Hambantota Distrct"}
+    data = client.post("/search", json=payload).json()
+    assert data["results"] == []
+
+    data = client.post("/search", json={**payload, "fuzzy": True}).json()
+    assert [doc["document_id"] for doc in data["results"]] == ["2056-34"]
+    assert data["query_info"]["fuzzy_terms"]["hambantota"] == ["hambanthota"]
+
+    response = client.get("/search", params={"query": "Hambantota", "fuzzy": "true"})
+    assert response.json()["pagination"]["total_count"] == 1
+
+def test_search_rejects_expensive_patterns(client: TestClient):
+    response = client.post("/search", json={"query": "type:(a+)+$"})
+    assert response.status_code == 400
+    assert "too complex" in response.json()["detail"]
+
+    response = client.get("/search", params={"query": "id:" + "." * 300})
+    assert response.status_code == 400
+
+    response = client.get("/search/export", params={"query": "type:(a+)+$"})
+    assert response.status_code == 400
+
+def test_search_date_range_narrowing(client: TestClient):
+    data = client.post("/search", json={"query": "date:2016-01-01"}).json()
+    assert [doc["document_id"] for doc in data["results"]] == ["1947-44"]
+
+    data = client.post("/search", json={"query": "date:2016 colombo"}).json()
+    assert data["results"] == []
+
+def test_search_query_syntax(client: TestClient):
+    def ids(query):
+        response = client.post("/search", json={"query": query})
+        assert response.status_code == 200
+        return [doc["document_id"] for doc in response.json()["results"]]
+
+    assert ids('type:"LEGAL_REGULATORY"') == ["1947-44"]
+    assert ids('type:"legal_regulatory"') == []
+    assert ids("id:1895*") == ["1895-18"]
+    assert ids("date:2015..2016") == ["1947-44", "1895-18"]
+    assert ids("date:2016..") == ["2056-34", "1947-44"]
+    assert ids("colombo OR hambanthota") == ["2056-34", "1895-18"]
+    assert ids("type:. -colombo") == ["2056-34", "1947-44"]
+    assert ids('type:. NOT "Land Acquisition"') == ["1947-44", "1895-18"]
+    assert ids('id:"1947-44"') == ["1947-44"]
+    # Phrases are literal, regex metacharacters included
+    assert ids('"(S only)"') == ["2056-34"]
+
+def test_search_count_modes(client: TestClient, monkeypatch):
+    from config.settings import settings
+    monkeypatch.setattr(settings, "search_count_cap", 1)
+
+    def pagination(count_mode):
+        payload = {"query": "type:.", "limit": 1, "count_mode": count_mode}
+        return client.post("/search", json=payload).json()["pagination"]
+
+    exact = pagination("exact")
+    assert (exact["total_count"], exact["count_exact"], exact["has_next"]) == (3, True, True)
+
+    # Stops after the second match: at least one more than the cap
+    capped = pagination("capped")
+    assert (capped["total_count"], capped["count_exact"], capped["has_next"]) == (1, False, True)
+
+    estimated = pagination("estimated")
+    assert (estimated["total_count"], estimated["count_exact"], estimated["has_next"]) == (3, False, True)
+
+    assert client.post("/search", json={"query": "x", "count_mode": "rough"}).status_code == 400
+    assert client.post("/search", json={"query": "x", "count_mode": 5}).status_code == 400
+    assert client.get("/search", params={"query": "x", "count_mode": "rough"}).status_code == 422
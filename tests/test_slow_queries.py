@@ -0,0 +1,84 @@
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_slow_query_log
+from config.settings import settings
+
+ADMIN_TOKEN = "secret-token"
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    """Slow query log logging every request, with admin access enabled"""
+    log = get_slow_query_log()
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    monkeypatch.setattr(log, "threshold", 0)
+    log.clear()
+    yield log
+    log.clear()
+
+
+def test_admin_endpoints_require_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.get("/admin/slow-queries").status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    assert client.get("/admin/slow-queries").status_code == 401
+    assert client.get("/admin/slow-queries", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get("/admin/slow-queries", headers={"X-Admin-Token": ADMIN_TOKEN}).status_code == 200
+
+
+def test_slow_query_entry(client: TestClient, slow_log):
+    client.post("/search", json={"query": "  type:legal   central ", "limit": 10})
+
+    response = client.get("/admin/slow-queries", headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert response.status_code == 200
+    entry = next(entry for entry in response.json()["entries"] if entry["route"] == "/search")
+    assert entry["method"] == "POST"
+    assert entry["status"] == 200
+    assert entry["counters"] == {"rows_scanned": 3, "rows_matched": 1}
+    assert {"parse", "build", "find"} <= set(entry["stages_ms"])
+    assert entry["queries"][0]["query"] == "type:legal central"
+    assert "document_type" in entry["queries"][0]["plan"]
+    assert entry["profile_id"] is None
+
+
+def test_profile_header(client: TestClient, slow_log, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+
+    # Without the admin token the header is ignored
+    response = client.post("/search", json={"query": "colombo"}, headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+
+    response = client.post(
+        "/search", json={"query": "colombo"}, headers={"X-Profile": "1", "X-Admin-Token": ADMIN_TOKEN}
+    )
+    profile_id = response.headers["X-Profile-Id"]
+    assert slow_log.recent(1)[0]["profile_id"] == profile_id
+
+    download = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert download.status_code == 200
+    path = tmp_path / "download.prof"
+    path.write_bytes(download.content)
+    functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+    assert "_search_page" in functions
+
+    missing = client.get("/admin/profiles/..%2Fsecrets", headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert missing.status_code == 404
+
+
+def test_profiles_require_private_directory(client: TestClient, slow_log, monkeypatch, tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    monkeypatch.setattr(settings, "profile_dir", str(shared))
+
+    response = client.post(
+        "/search", json={"query": "colombo"}, headers={"X-Profile": "1", "X-Admin-Token": ADMIN_TOKEN}
+    )
+    assert response.status_code == 200
+    assert list(shared.iterdir()) == []
+    profile_id = response.headers.get("X-Profile-Id", "missing")
+    assert client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": ADMIN_TOKEN}).status_code == 404
@@ -0,0 +1,37 @@
+from core.text_index import MAX_SUGGESTIONS, SortedPrefixIndex, TermIndex
+
+DOCS = [
+    {"document_id": "2101-12", "description": "Land Acquisition - Thalawa, Hambanthota D/S Division, Hambanthota District"},
+    {"document_id": "2154-40", "description": "Appointment of Justice of the Peace for the Hambantota District"},
+    {"document_id": "2190-3", "description": "Consumer Price Index for the Month of March 2019 was 131.5"},
+]
+
+
+def test_match_text_allows_typos():
+    index = TermIndex(DOCS)
+    document_ids, expansions = index.match_text("hambantotta district")
+    assert document_ids == {"2101-12", "2154-40"}
+    assert "hambantota" in expansions["hambantotta"]
+
+
+def test_match_text_skips_short_words():
+    index = TermIndex(DOCS)
+    assert index.match_text("Hambantota D/S")[0] == {"2101-12", "2154-40"}
+    assert index.match_text("Hambantota of")[0] == {"2101-12", "2154-40"}
+    assert index.match_text("of D/S")[0] == set()
+
+
+def test_match_text_numbers_are_exact():
+    index = TermIndex(DOCS)
+    assert index.match_text("index 2019 131.5")[0] == {"2190-3"}
+    assert index.match_text("index 2018")[0] == set()
+
+
+def test_short_prefix_completions_keep_best_weights():
+    entries = [(f"a{n:05d}", f"a{n:05d}", 1) for n in range(5000)] + [("azzz", "azzz", 1000)]
+    index = SortedPrefixIndex(entries)
+    for limit in (10, 11, 50):
+        completions = index.complete("a", limit)
+        assert len(completions) == limit
+        assert completions[0] == ("azzz", 1000)
+    assert len(index.complete("a", 100)) == MAX_SUGGESTIONS
@@ -1,4 +1,4 @@
-from .protobuf_decoder import decode_protobuf
-
-__all__ = ["decode_protobuf"]
+from .protobuf_decoder import decode_protobuf, decode_many
+from .metrics import metrics, stage
 
+__all__ = ["decode_protobuf", "decode_many", "metrics", "stage"]
@@ -0,0 +1,252 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "gztarchiver_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def format_labels(labels: Labels) -> str:
+    """
+    Format labels in the Prometheus text format.
+
+    Args:
+        labels: (name, value) pairs
+
+    Returns:
+        {name="value",...}, or an empty string without labels
+    """
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render_samples(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, Any], float]]) -> List[str]:
+    """
+    Render a gauge or counter in the Prometheus text format.
+
+    Args:
+        name: Metric name, without METRIC_PREFIX
+        kind: "gauge" or "counter"
+        help_text: Metric description
+        samples: (labels, value) pairs
+
+    Returns:
+        Lines of the exposition
+    """
+    name = METRIC_PREFIX + name
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(tuple(labels.items()))} {value}")
+    return lines
+
+
+class Histogram:
+    """Cumulative histogram of observed durations"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize a histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record a value. Caller must hold the registry lock."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide histograms, keyed by metric name and labels"""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """
+        Set the description of a histogram.
+
+        Args:
+            name: Metric name, without METRIC_PREFIX
+            help_text: Metric description
+        """
+        self.help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+
+        Args:
+            name: Metric name, without METRIC_PREFIX
+            value: Observed value, in seconds
+            labels: Label values identifying the series
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def render(self) -> List[str]:
+        """
+        Render every histogram in the Prometheus text format.
+
+        Returns:
+            Lines of the exposition
+        """
+        lines = []
+        with self.lock:
+            for name in sorted(self.histograms):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {self.help.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for labels, histogram in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{full_name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {histogram.count}")
+        return lines
+
+
+metrics = MetricsRegistry()
+metrics.describe("stage_duration_seconds", "Time spent in each stage of request handling")
+metrics.describe("http_request_duration_seconds", "HTTP request duration by route")
+metrics.describe("upstream_request_duration_seconds", "Query API request duration by endpoint")
+
+
+class StageTimer:
+    """Durations of the stages of one request"""
+
+    def __init__(self):
+        """Initialize a timer starting now."""
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.queries: List[Dict[str, Any]] = []
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Add time spent in a stage; repeated stages accumulate.
+
+        Args:
+            name: Stage name
+            seconds: Duration
+        """
+        with self.lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int) -> None:
+        """
+        Add to a counter of the request, ex: rows scanned.
+
+        Args:
+            name: Counter name
+            amount: Value to add
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_query(self, **details: Any) -> None:
+        """
+        Record a query run by the request, ex: its normalized text and plan.
+
+        Args:
+            details: Description of the query
+        """
+        with self.lock:
+            self.queries.append(details)
+
+    def elapsed(self) -> float:
+        """Get the seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Format the stages as a Server-Timing header value.
+
+        Returns:
+            ex: "parse;dur=0.08, find;dur=2.31, total;dur=3.02" (milliseconds)
+        """
+        with self.lock:
+            stages = list(self.stages.items())
+        stages.append(("total", self.elapsed()))
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages)
+
+
+# Timer of the request being handled, if any
+current_timer: ContextVar[Optional[StageTimer]] = ContextVar("current_timer", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a stage of request handling.
+
+    The duration is added to the current request's timer and to the
+    stage_duration_seconds histogram.
+
+    Args:
+        name: Stage name (ex: parse, find, serialize)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        timer = current_timer.get()
+        if timer is not None:
+            timer.add(name, seconds)
+        metrics.observe("stage_duration_seconds", seconds, stage=name)
+
+
+def count(name: str, amount: int) -> None:
+    """
+    Add to a counter of the current request, if any.
+
+    Args:
+        name: Counter name (ex: rows_scanned, rows_matched)
+        amount: Value to add
+    """
+    timer = current_timer.get()
+    if timer is not None:
+        timer.count(name, amount)
+
+
+def record_query(**details: Any) -> None:
+    """
+    Record a query run by the current request, if any, for the slow query log.
+
+    Args:
+        details: Description of the query (ex: query, plan)
+    """
+    timer = current_timer.get()
+    if timer is not None:
+        timer.add_query(**details)
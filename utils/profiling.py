@@ -0,0 +1,119 @@
+import cProfile
+import os
+import pstats
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Extension of the profile artifacts, readable with pstats or snakeviz
+PROFILE_SUFFIX = ".prof"
+
+
+class RequestProfile:
+    """
+    cProfile data of one request.
+
+    cProfile only sees the thread it runs in, so each call made through
+    profiled() gets its own profiler; the results are merged when dumped.
+    """
+
+    def __init__(self, profile_id: str):
+        """
+        Initialize an empty request profile.
+
+        Args:
+            profile_id: Identifier of the profile, used as its file name
+        """
+        self.profile_id = profile_id
+        self.lock = threading.Lock()
+        self.profilers: List[cProfile.Profile] = []
+
+    def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call a function under a new profiler.
+
+        Args:
+            func: Function to call
+            args: Positional arguments
+
+        Returns:
+            The function's result
+        """
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.profilers.append(profiler)
+        return profiler.runcall(func, *args)
+
+    def dump(self, directory: str, max_files: int = 0) -> Optional[str]:
+        """
+        Write the merged profile to a file, removing the oldest profiles past max_files.
+
+        Args:
+            directory: Directory to write the profile to
+            max_files: Number of profiles kept in the directory, 0 for unlimited
+
+        Returns:
+            Path of the profile file, or None if nothing was profiled
+        """
+        with self.lock:
+            profilers = [profiler for profiler in self.profilers if profiler.getstats()]
+        if not profilers:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.profile_id + PROFILE_SUFFIX)
+        pstats.Stats(*profilers).dump_stats(path)
+
+        if max_files:
+            names = sorted(
+                (name for name in os.listdir(directory) if name.endswith(PROFILE_SUFFIX)),
+                key=lambda name: os.path.getmtime(os.path.join(directory, name))
+            )
+            for name in names[:-max_files]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return path
+
+
+# Profile of the request being handled, if it is profiled
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def profiled(func: Callable[..., T], *args: Any) -> T:
+    """
+    Call a function, under the current request's profile if it is profiled.
+
+    Used for the work handed to worker threads, where the request's CPU time is spent.
+
+    Args:
+        func: Function to call
+        args: Positional arguments
+
+    Returns:
+        The function's result
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return func(*args)
+    return profile.run(func, *args)
+
+
+def profile_path(directory: str, profile_id: str) -> Optional[str]:
+    """
+    Get the path of a dumped profile.
+
+    Args:
+        directory: Directory profiles are written to
+        profile_id: Identifier of the profile
+
+    Returns:
+        Path of the profile file, or None if it doesn't exist or the identifier isn't a plain name
+    """
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(directory, profile_id + PROFILE_SUFFIX)
+    return path if os.path.isfile(path) else None
@@ -1,18 +1,100 @@
 import json
+import logging
 import binascii
-from google.protobuf.wrappers_pb2 import StringValue
+from functools import lru_cache
+from typing import Iterable, List, Optional
 
+try:
+    from google.protobuf.wrappers_pb2 import StringValue
+except ImportError:  # pragma: no cover - protobuf is a declared dependency
+    StringValue = None
 
-def decode_protobuf(name: str) -> str:
+# Number of distinct encoded names kept by the decode memo
+DECODE_CACHE_SIZE = 4096
+
+# Tag of StringValue.value: field number 1, wire type 2 (length-delimited)
+STRING_VALUE_TAG = 0x0A
+
+
+def _parse_string_value(decoded_bytes: bytes) -> Optional[str]:
     """
-    Decode protobuf encoded string from JSON format.
+    Parse a serialized StringValue holding exactly one field 1 directly from the bytes.
     
     Args:
-        name: JSON string containing hex-encoded protobuf data
+        decoded_bytes: Serialized protobuf message
         
     Returns:
-        Decoded string value, or empty string on error
+        The string value, or None if the message isn't in that simple form
     """
+    if not decoded_bytes:
+        return ""
+    if decoded_bytes[0] != STRING_VALUE_TAG:
+        return None
+
+    # Varint length prefix
+    length = 0
+    shift = 0
+    position = 1
+    while True:
+        if position >= len(decoded_bytes) or shift > 28:
+            return None
+        byte = decoded_bytes[position]
+        position += 1
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+
+    if position + length != len(decoded_bytes):
+        return None
+
+    try:
+        return decoded_bytes[position:].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _decode_with_protobuf(decoded_bytes: bytes) -> str:
+    """
+    Decode a serialized StringValue with the protobuf runtime.
+    
+    Args:
+        decoded_bytes: Serialized protobuf message
+        
+    Returns:
+        Decoded string value, or its printable characters if parsing fails
+    """
+    try:
+        if StringValue is None:
+            raise ImportError("protobuf is not installed")
+        sv = StringValue()
+        sv.ParseFromString(decoded_bytes)
+        return sv.value.strip()
+    except Exception:
+        decoded_str = decoded_bytes.decode("utf-8", errors="ignore")
+        cleaned = ''.join(ch for ch in decoded_str if ch.isprintable())
+        return cleaned.strip()
+
+
+def _fast_path_matches_protobuf() -> bool:
+    """Check once at import time that the fast path agrees with the protobuf runtime."""
+    if StringValue is None:
+        return True
+    try:
+        for sample in ("", "2153-12", " 2153-12 ", "ගැසට් පත්‍රය", "x" * 300):
+            encoded = StringValue(value=sample).SerializeToString()
+            if _parse_string_value(encoded).strip() != _decode_with_protobuf(encoded):
+                return False
+        return True
+    except Exception:
+        return False
+
+
+FAST_PATH_ENABLED = _fast_path_matches_protobuf()
+
+
+def _decode(name: str) -> str:
+    """Decode a protobuf encoded string from JSON format, returning an empty string on error."""
     try:
         data = json.loads(name)
         hex_value = data.get("value")
@@ -20,15 +102,45 @@ def decode_protobuf(name: str) -> str:
             return ""
 
         decoded_bytes = binascii.unhexlify(hex_value)
-        sv = StringValue()
-        try:
-            sv.ParseFromString(decoded_bytes)
-            return sv.value.strip()
-        except Exception:
-            decoded_str = decoded_bytes.decode("utf-8", errors="ignore")
-            cleaned = ''.join(ch for ch in decoded_str if ch.isprintable())
-            return cleaned.strip()
+        if FAST_PATH_ENABLED:
+            value = _parse_string_value(decoded_bytes)
+            if value is not None:
+                return value.strip()
+        return _decode_with_protobuf(decoded_bytes)
     except Exception as e:
         logging.error(f"Error decoding protobuf: {e}")
         return ""
 
+
+# Decoded names by encoded name, kept up to DECODE_CACHE_SIZE entries
+_decode_cached = lru_cache(maxsize=DECODE_CACHE_SIZE)(_decode)
+
+
+def decode_protobuf(name: str) -> str:
+    """
+    Decode protobuf encoded string from JSON format.
+    
+    Args:
+        name: JSON string containing hex-encoded protobuf data
+        
+    Returns:
+        Decoded string value, or empty string on error (including a name that
+        isn't a string)
+    """
+    if isinstance(name, str):
+        return _decode_cached(name)
+    # Other values (ex: None, unhashable JSON objects) aren't cached, and decode to ""
+    return _decode(name)
+
+
+def decode_many(names: Iterable[str]) -> List[str]:
+    """
+    Decode several protobuf encoded strings.
+    
+    Args:
+        names: JSON strings containing hex-encoded protobuf data
+        
+    Returns:
+        Decoded string values in the same order, empty strings for failures
+    """
+    return [decode_protobuf(name) for name in names]
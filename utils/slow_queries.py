@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from utils.metrics import StageTimer
+
+
+class SlowQueryLog:
+    """Ring buffer of the most recent requests slower than a threshold"""
+
+    def __init__(self, capacity: int, threshold: float):
+        """
+        Initialize an empty slow query log.
+
+        Args:
+            capacity: Number of entries kept, 0 to disable the log
+            threshold: Request duration, in seconds, from which requests are logged
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max(capacity, 1))
+        self.recorded = 0
+
+    def is_slow(self, duration: float) -> bool:
+        """Check whether a request duration, in seconds, qualifies for the log."""
+        return self.capacity > 0 and duration >= self.threshold
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        query_string: str,
+        route: str,
+        status: int,
+        timer: StageTimer,
+        profile_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Log a request if it was slow.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            query_string: Raw query string of the request
+            route: Route template the request matched
+            status: Response status code
+            timer: The request's timer, with its stages, counters and queries
+            profile_id: Identifier of the request's profile, if one was written
+
+        Returns:
+            The logged entry, or None if the request wasn't slow
+        """
+        duration = timer.elapsed()
+        if not self.is_slow(duration):
+            return None
+
+        with timer.lock:
+            stages = {name: round(seconds * 1000, 3) for name, seconds in timer.stages.items()}
+            counters = dict(timer.counters)
+            queries = list(timer.queries)
+        entry = {
+            "timestamp": time.time(),
+            "method": method,
+            "path": path,
+            "query_string": query_string,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "stages_ms": stages,
+            "counters": counters,
+            "queries": queries,
+            "profile_id": profile_id
+        }
+        with self.lock:
+            self.entries.append(entry)
+            self.recorded += 1
+        return entry
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the logged requests, most recent first.
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            List of entries
+        """
+        with self.lock:
+            entries = list(self.entries)
+        entries.reverse()
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self.lock:
+            self.entries.clear()